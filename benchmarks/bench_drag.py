@@ -0,0 +1,190 @@
+"""拖动/调整大小基准：向悬浮窗和快捷键详情窗口回放合成的鼠标移动事件流，统计每个事件的处理耗时和窗口几何/光标的实际更新次数
+
+用法（Linux下自动使用offscreen平台，无需显示器）：
+    python benchmarks/bench_drag.py --moves 2000 --rate 1000 --output drag.json
+
+事件按 --rate（Hz，高回报率鼠标为500~1000）的间隔发送，间隔内照常处理事件循环，
+窗口几何的更新次数应接近 时长 × 屏幕刷新率，而不是事件数。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from PyQt6.QtCore import Qt, QEvent, QPoint, QPointF, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication
+
+from main import DataManager, FloatShortcutMain, ShortcutDetailWindow
+
+SOFTWARE = "DragBench"
+# 统计调用次数的窗口方法
+COUNTED_METHODS = ("move", "resize", "setGeometry", "setCursor", "unsetCursor")
+
+# ===================== 事件回放 =====================
+class CallCounter:
+    """用实例属性遮住窗口方法，统计调用次数（只统计Python代码里的调用）"""
+    def __init__(self, widget):
+        self.widget = widget
+        self.counts = dict.fromkeys(COUNTED_METHODS, 0)
+        for name in COUNTED_METHODS:
+            setattr(widget, name, self.wrap(name, getattr(widget, name)))
+
+    def wrap(self, name, method):
+        def counted(*args):
+            self.counts[name] += 1
+            return method(*args)
+        return counted
+
+    def reset(self):
+        self.counts = dict.fromkeys(COUNTED_METHODS, 0)
+
+def send_mouse(widget, etype, local, global_pos, buttons):
+    button = Qt.MouseButton.NoButton if etype == QEvent.Type.MouseMove else Qt.MouseButton.LeftButton
+    event = QMouseEvent(etype, QPointF(local), QPointF(global_pos), button, buttons,
+                        Qt.KeyboardModifier.NoModifier)
+    QApplication.sendEvent(widget, event)
+
+def replay(app, widget, points, rate, press):
+    """按固定间隔发送一串鼠标事件（points为窗口内的坐标），返回每个移动事件的处理耗时（秒）和总耗时；
+    press为True时先按下左键、最后松开，全局坐标以按下时的窗口位置为准（窗口移动后鼠标在屏幕上的轨迹不变）"""
+    origin = widget.mapToGlobal(QPoint(0, 0))
+    interval = 1.0 / rate
+    buttons = Qt.MouseButton.LeftButton if press else Qt.MouseButton.NoButton
+    samples = []
+    start = time.perf_counter()
+    if press:
+        send_mouse(widget, QEvent.Type.MouseButtonPress, points[0], origin + points[0], buttons)
+    for i, point in enumerate(points):
+        # 两个事件之间照常处理事件循环（按帧合并的定时器在这里触发）
+        deadline = start + i * interval
+        while time.perf_counter() < deadline:
+            app.processEvents()
+        began = time.perf_counter()
+        send_mouse(widget, QEvent.Type.MouseMove, point, origin + point, buttons)
+        samples.append(time.perf_counter() - began)
+    if press:
+        send_mouse(widget, QEvent.Type.MouseButtonRelease, points[-1], origin + points[-1], Qt.MouseButton.NoButton)
+    app.processEvents()
+    return samples, time.perf_counter() - start
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "events": len(samples),
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+        "p95_us": round(p95 * 1e6, 2),
+        "max_us": round(samples[-1] * 1e6, 2),
+    }
+
+def line(start, delta, moves):
+    return [QPoint(start.x() + delta.x() * i // moves, start.y() + delta.y() * i // moves) for i in range(1, moves + 1)]
+
+def run_stream(app, widget, counter, points, rate, press, repeat):
+    results = []
+    for _ in range(repeat):
+        counter.reset()
+        geometry = widget.geometry()
+        samples, elapsed = replay(app, widget, points, rate, press)
+        results.append((samples, elapsed, dict(counter.counts)))
+        # 还原位置和高度，每轮条件相同
+        widget.setGeometry(geometry)
+        app.processEvents()
+    samples = [s for run in results for s in run[0]]
+    elapsed = statistics.fmean(run[1] for run in results)
+    counts = {name: round(statistics.fmean(run[2][name] for run in results), 1) for name in COUNTED_METHODS}
+    report = summarize(samples)
+    report["duration_ms"] = round(elapsed * 1000, 1)
+    report["calls"] = counts
+    geometry_updates = counts["move"] + counts["resize"] + counts["setGeometry"]
+    report["geometry_updates_per_second"] = round(geometry_updates / elapsed, 1) if elapsed else None
+    return report
+
+# ===================== 场景 =====================
+def bench_streams(app, moves, rate, repeat):
+    results = {}
+    main_win = FloatShortcutMain(app)
+    main_win.show()
+    main_win.move(200, 200)
+    detail_win = ShortcutDetailWindow(SOFTWARE, main_win)
+    detail_win.show()
+    detail_win.move(600, 200)
+    app.processEvents()
+    main_counter = CallCounter(main_win)
+    detail_counter = CallCounter(detail_win)
+    frame_ms = detail_win.drag_controller.frame_interval()
+
+    results["main_drag"] = run_stream(app, main_win, main_counter, line(QPoint(10, 10), QPoint(300, 150), moves),
+                                      rate, True, repeat)
+    middle = QPoint(detail_win.width() // 2, detail_win.height() // 2)
+    results["detail_drag"] = run_stream(app, detail_win, detail_counter, line(middle, QPoint(-300, 200), moves),
+                                        rate, True, repeat)
+    bottom = QPoint(detail_win.width() // 2, detail_win.height() - 3)
+    results["detail_resize_bottom"] = run_stream(app, detail_win, detail_counter, line(bottom, QPoint(0, -200), moves),
+                                                 rate, True, repeat)
+    top = QPoint(detail_win.width() // 2, 3)
+    results["detail_resize_top"] = run_stream(app, detail_win, detail_counter, line(top, QPoint(0, 150), moves),
+                                              rate, True, repeat)
+    # 不按键在窗口上来回移动，穿过上下边缘：光标只应在进出边缘区域时设置
+    height = detail_win.height()
+    sweep = [QPoint(detail_win.width() // 2, abs((i * 7) % (2 * height) - height)) for i in range(moves)]
+    results["detail_hover"] = run_stream(app, detail_win, detail_counter, sweep, rate, False, repeat)
+
+    detail_win.close()
+    main_win.close()
+    return frame_ms, results
+
+def main_entry():
+    parser = argparse.ArgumentParser(description="ShortcutKeyHelper 拖动/调整大小基准")
+    parser.add_argument("--moves", type=int, default=2000, help="每个事件流的鼠标移动事件数")
+    parser.add_argument("--rate", type=int, default=1000, help="事件发送频率（Hz）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个事件流重复次数")
+    parser.add_argument("--output", help="结果JSON文件，不指定则输出到标准输出")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    data_dir = tempfile.mkdtemp(prefix="skh-drag-")
+    try:
+        DataManager.configure(data_dir=data_dir)
+        DataManager.save_software(SOFTWARE, [{"操作": f"操作{i}", "快捷键": "Ctrl+C"} for i in range(30)])
+        DataManager.flush()
+        frame_ms, results = bench_streams(app, args.moves, args.rate, args.repeat)
+    finally:
+        DataManager.configure()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "moves": args.moves,
+            "rate": args.rate,
+            "repeat": args.repeat,
+            "frame_interval_ms": frame_ms,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main_entry()
@@ -0,0 +1,137 @@
+"""内存基准：测量快捷键库读入内存后的占用，对比JSON解析出的dict列表和缓存中的紧凑记录
+
+用法（不需要PyQt）：
+    python benchmarks/bench_memory.py --shortcuts 1000000 --output memory.json
+
+默认生成1000个软件、合计100万条快捷键，操作名称按常见词汇重复出现；
+加 --unique 让每条操作名称都不同（字符串去重失效的最坏情况）。
+"""
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from storage import JsonDirBackend
+from repository import ShortcutRepository
+
+OPERATIONS = ["复制", "粘贴", "剪切", "撤销", "重做", "查找", "替换", "保存", "打开", "关闭",
+              "新建", "格式化代码", "运行", "调试", "命令面板", "切换标签页", "全选", "注释"]
+KEYS = ["A", "B", "C", "D", "E", "F", "K", "N", "P", "S", "V", "X", "Z", "F5", "F9", "Enter", "Tab"]
+MODIFIERS = ["Ctrl", "Shift", "Alt"]
+
+# ===================== 模拟数据生成 =====================
+def generate_data_dir(path, softwares, total, unique, seed=1):
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    per_software, extra = divmod(total, softwares)
+    serial = 0
+    for i in range(softwares):
+        shortcuts = []
+        for _ in range(per_software + (1 if i < extra else 0)):
+            suffix = serial if unique else rng.randrange(50)
+            serial += 1
+            mods = rng.sample(MODIFIERS, rng.randint(1, 3))
+            shortcuts.append({"操作": f"{rng.choice(OPERATIONS)}{suffix}",
+                              "快捷键": "+".join(mods + [rng.choice(KEYS)])})
+        name = f"Soft{i:06d}"
+        with open(os.path.join(path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"software_name": name, "shortcut_list": shortcuts}, f, ensure_ascii=False, indent=2)
+
+def dir_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+# ===================== 测量 =====================
+def measure_retained(load):
+    """load() 返回要保留在内存里的对象，测量它额外占用的字节数和峰值"""
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    retained = load()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    gc.collect()
+    return {"retained_bytes": current - base, "peak_bytes": peak - base, "load_s": round(elapsed, 3)}
+
+def load_dicts(data_dir):
+    """原来的内存表示：每个软件一个JSON解析出的dict列表"""
+    library = {}
+    for entry in os.scandir(data_dir):
+        with open(entry.path, "r", encoding="utf-8") as f:
+            library[entry.name[:-5]] = json.load(f)["shortcut_list"]
+    return library
+
+def load_repository(data_dir):
+    """现在的内存表示：仓库缓存中的 ShortcutRecord 列表，返回的副本用完即丢"""
+    backend = JsonDirBackend(data_dir)
+    names = backend.list_names()
+    repository = ShortcutRepository(backend, max_details=len(names), async_writes=False)
+    for name in names:
+        repository.get_detail(name)
+    return repository
+
+def summarize(result, total, raw_bytes):
+    result["bytes_per_shortcut"] = round(result["retained_bytes"] / total, 1)
+    result["x_raw_size"] = round(result["retained_bytes"] / raw_bytes, 2)
+    return result
+
+# ===================== 入口 =====================
+def main_entry():
+    parser = argparse.ArgumentParser(description="ShortcutKeyHelper 内存基准")
+    parser.add_argument("--shortcuts", type=int, default=1000000, help="快捷键总条数")
+    parser.add_argument("--softwares", type=int, default=1000, help="软件数量")
+    parser.add_argument("--unique", action="store_true", help="每条操作名称都不同")
+    parser.add_argument("--work-dir", help="模拟数据目录（默认临时目录，结束后删除）")
+    parser.add_argument("--output", help="结果JSON文件，不指定则输出到标准输出")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="skh-mem-")
+    data_dir = os.path.join(work_dir, f"data_{args.softwares}_{args.shortcuts}{'_unique' if args.unique else ''}")
+    try:
+        if not os.path.isdir(data_dir):
+            start = time.perf_counter()
+            generate_data_dir(data_dir, args.softwares, args.shortcuts, args.unique)
+            print(f"生成数据耗时 {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        raw_bytes = dir_bytes(data_dir)
+        report = {
+            "meta": {
+                "python": sys.version.split()[0],
+                "shortcuts": args.shortcuts,
+                "softwares": args.softwares,
+                "unique": args.unique,
+                "raw_bytes": raw_bytes,
+            },
+            "results": {
+                "dict_lists": summarize(measure_retained(lambda: load_dicts(data_dir)), args.shortcuts, raw_bytes),
+                "repository_records": summarize(measure_retained(lambda: load_repository(data_dir)),
+                                                args.shortcuts, raw_bytes),
+            },
+        }
+        results = report["results"]
+        report["meta"]["reduction"] = round(results["dict_lists"]["retained_bytes"]
+                                            / results["repository_records"]["retained_bytes"], 2)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main_entry()
@@ -0,0 +1,278 @@
+"""无界面基准测试：生成不同规模的模拟数据，测量 DataManager 和悬浮窗热点路径的耗时
+
+用法（Linux下自动使用offscreen平台，无需显示器）：
+    python benchmarks/run_benchmarks.py --sizes 10 1000 10000 100000 --output bench.json
+
+结果为JSON，可与其他提交的结果对比。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import subprocess
+import statistics
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from PyQt6.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+import data_manager
+from main import DataManager, FloatShortcutMain, ShortcutDetailWindow
+from storage import migrate_json_to_sqlite, BACKEND_KINDS
+from groups import GROUPS_FILENAME
+
+OPERATIONS = ["复制", "粘贴", "剪切", "撤销", "重做", "查找", "替换", "保存", "打开", "关闭",
+              "新建", "格式化代码", "运行", "调试", "命令面板", "切换标签页", "全选", "注释"]
+KEYS = ["A", "B", "C", "D", "E", "F", "K", "N", "P", "S", "V", "X", "Z", "F5", "F9", "Enter", "Tab"]
+MODIFIERS = ["Ctrl", "Shift", "Alt"]
+BIG_SOFTWARE = "BigKeymap"
+# 按分组显示时把软件平均分到多少个分组
+BENCH_GROUPS = 20
+
+# ===================== 模拟数据生成 =====================
+def make_shortcuts(count, rng):
+    shortcuts = []
+    for i in range(count):
+        mods = rng.sample(MODIFIERS, rng.randint(1, 3))
+        shortcuts.append({"操作": f"{rng.choice(OPERATIONS)}{i}", "快捷键": "+".join(mods + [rng.choice(KEYS)])})
+    return shortcuts
+
+def generate_data_dir(path, size, per_software, seed=1):
+    """size个软件，每个per_software条快捷键，外加一个有size条快捷键的大软件"""
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    entries = [(f"Soft{i:06d}", make_shortcuts(per_software, rng)) for i in range(size)]
+    entries.append((BIG_SOFTWARE, make_shortcuts(size, rng)))
+    for name, shortcuts in entries:
+        with open(os.path.join(path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"software_name": name, "shortcut_list": shortcuts}, f, ensure_ascii=False, indent=2)
+
+# ===================== 计时工具 =====================
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "runs": len(samples),
+        "min_ms": round(samples[0] * 1000, 3),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+def measure(func, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def cold_repository(snapshot=False):
+    """丢弃内存缓存，下一次访问重新读取磁盘；默认不用快照（也不在后台写快照），各项耗时不受它影响"""
+    data_manager.SNAPSHOT_ENABLED = snapshot
+    DataManager.configure()
+
+# ===================== 各项基准 =====================
+def bench_data_manager(repeat):
+    results = {}
+    results["get_all_software_cold"] = measure(DataManager.get_all_software, repeat, setup=cold_repository)
+    DataManager.get_all_software()
+    results["get_all_software_warm"] = measure(DataManager.get_all_software, repeat * 10)
+
+    name = DataManager.get_all_software()[0]
+    results["get_software_detail_cold"] = measure(lambda: DataManager.get_software_detail(name), repeat,
+                                                  setup=cold_repository)
+    results["get_software_detail_warm"] = measure(lambda: DataManager.get_software_detail(name), repeat * 10)
+    results["get_software_detail_big_cold"] = measure(lambda: DataManager.get_software_detail(BIG_SOFTWARE),
+                                                      repeat, setup=cold_repository)
+
+    shortcuts = DataManager.get_software_detail(name)
+    results["save_software_enqueue"] = measure(lambda: DataManager.save_software(name, shortcuts), repeat * 10)
+    DataManager.flush()
+
+    def save_and_flush():
+        DataManager.save_software(name, shortcuts)
+        DataManager.flush()
+    results["save_software_durable"] = measure(save_and_flush, repeat)
+
+    big = DataManager.get_software_detail(BIG_SOFTWARE)
+    results["save_software_big_durable"] = measure(lambda: (DataManager.save_software(BIG_SOFTWARE, big),
+                                                            DataManager.flush()), max(1, repeat // 2))
+    results["search_index_build"] = measure(
+        DataManager.search_index, 1, setup=lambda: setattr(DataManager, "_index", None))
+    # 冷启动建索引：逐个解析JSON / 从二进制快照解码
+    results["search_index_build_cold"] = measure(DataManager.search_index, 1, setup=cold_repository)
+    cold_repository(snapshot=True)
+    DataManager.save_snapshot()
+    results["search_index_build_cold_snapshot"] = measure(DataManager.search_index, 1,
+                                                          setup=lambda: cold_repository(snapshot=True))
+    cold_repository()
+    return results
+
+def bench_widgets(app, repeat):
+    results = {}
+    window = FloatShortcutMain(app)
+    window.show()
+    # 启动时分批加载：分别记录第一批名称出现和全部加载完成的耗时
+    cold_repository()
+    start = time.perf_counter()
+    window.load_library()
+    while window.library_task is not None and window.soft_model.rowCount() == 0:
+        app.processEvents()
+    results["load_library_first_rows"] = summarize([time.perf_counter() - start])
+    while window.library_task is not None:
+        app.processEvents()
+    results["load_library_all"] = summarize([time.perf_counter() - start])
+    app.processEvents()
+
+    def reload_list():
+        window.load_software_list()
+        app.processEvents()
+    results["load_software_list"] = measure(reload_list, repeat)
+
+    # 按分组显示：软件平均分到若干分组、全部折叠，列表里只有分组标题行；再测展开/折叠一个分组
+    groups_path = os.path.join(DataManager.data_dir(), GROUPS_FILENAME)
+    names = list(window.soft_model.names)
+    with open(groups_path, "w", encoding="utf-8") as f:
+        json.dump({"groups": {f"Group{i:02d}": names[i::BENCH_GROUPS] for i in range(BENCH_GROUPS)},
+                   "expanded": []}, f, ensure_ascii=False)
+    DataManager.groups().load()
+    results["load_software_list_grouped"] = measure(reload_list, repeat)
+    def toggle_first_group():
+        window.on_soft_item_clicked(window.soft_model.index(0, 0))
+        app.processEvents()
+    results["toggle_group"] = measure(toggle_first_group, repeat * 2)
+    os.remove(groups_path)
+    DataManager.groups().load()
+    window.load_software_list()
+
+    # 模拟逐字输入：每个按键一次 search_software + 事件处理（包括重绘）
+    keystrokes = []
+    for query in ("soft00012", "复制", "ctrl+shift+p"):
+        window.search_edit.clear()
+        app.processEvents()
+        for i in range(1, len(query) + 1):
+            start = time.perf_counter()
+            window.search_edit.setText(query[:i])
+            app.processEvents()
+            keystrokes.append(time.perf_counter() - start)
+    window.search_edit.clear()
+    app.processEvents()
+    results["typing_session_per_keystroke"] = summarize(keystrokes)
+
+    def open_detail():
+        dialog = ShortcutDetailWindow(BIG_SOFTWARE, window)
+        dialog.show()
+        app.processEvents()
+        dialog.close()
+        dialog.deleteLater()
+    results["open_shortcut_detail_big"] = measure(open_detail, repeat)
+
+    # 复用池中的弹窗：首次之后只重新绑定软件，轮流打开普通软件和大软件
+    small = window.all_soft_list[0]
+    def open_pooled(name):
+        dialog = window.dialog_pool.acquire(ShortcutDetailWindow, window, name)
+        dialog.show()
+        app.processEvents()
+        dialog.close()
+    open_pooled(small)
+    results["open_shortcut_detail_pooled"] = measure(lambda: open_pooled(small), repeat * 4)
+    results["open_shortcut_detail_big_pooled"] = measure(lambda: open_pooled(BIG_SOFTWARE), repeat,
+                                                         setup=lambda: open_pooled(small))
+
+    # 缓存为空时打开大软件：数据较大时在后台分块加载，分别记录第一屏和全部行出现的耗时
+    def open_big_cold(wait_all):
+        cold_repository()
+        start = time.perf_counter()
+        dialog = window.dialog_pool.acquire(ShortcutDetailWindow, window, BIG_SOFTWARE)
+        dialog.show()
+        app.processEvents()
+        while dialog.load_task is not None and (wait_all or dialog.detail_model.rowCount() == 0):
+            app.processEvents()
+        elapsed = time.perf_counter() - start
+        dialog.close()
+        return elapsed
+    results["open_shortcut_detail_big_cold_first_rows"] = summarize([open_big_cold(False) for _ in range(repeat)])
+    results["open_shortcut_detail_big_cold_all_rows"] = summarize([open_big_cold(True) for _ in range(repeat)])
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return results
+
+# ===================== 入口 =====================
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main_entry():
+    parser = argparse.ArgumentParser(description="ShortcutKeyHelper 基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000],
+                        help="数据规模（软件数量，同时也是大软件的快捷键条数）")
+    parser.add_argument("--per-software", type=int, default=3, help="每个普通软件的快捷键条数")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+    parser.add_argument("--storage", default="json", choices=BACKEND_KINDS, help="存储后端")
+    parser.add_argument("--work-dir", help="模拟数据目录（默认临时目录，结束后删除）")
+    parser.add_argument("--output", help="结果JSON文件，不指定则输出到标准输出")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="skh-bench-")
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "storage": args.storage,
+            "per_software": args.per_software,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    try:
+        for size in args.sizes:
+            data_dir = os.path.join(work_dir, f"data_{size}")
+            if not os.path.isdir(data_dir):
+                start = time.perf_counter()
+                generate_data_dir(data_dir, size, args.per_software)
+                print(f"生成 {size} 规模数据耗时 {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            db_path = os.path.join(data_dir, "shortcuts.db")
+            if args.storage == "sqlite" and not os.path.exists(db_path):
+                migrate_json_to_sqlite(data_dir, db_path)
+            data_manager.SNAPSHOT_ENABLED = False
+            DataManager.configure(data_dir=data_dir, storage=args.storage)
+            results = bench_data_manager(args.repeat)
+            results.update(bench_widgets(app, args.repeat))
+            report["results"][str(size)] = results
+            print(f"完成 {size} 规模", file=sys.stderr)
+    finally:
+        DataManager.configure()
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main_entry()
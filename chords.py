@@ -0,0 +1,230 @@
+import re
+from functools import lru_cache
+
+# ===================== 快捷键组合归一化【写法不同的同一组合编码成同一个整数】 =====================
+# "Ctrl+Shift+A"、"shift+ctrl+a"、"Ctrl + Shift + A" 都编码为 MOD_CTRL | MOD_SHIFT | ord("A")。
+# 修饰键位和按键码取 Qt 的 Qt.KeyboardModifier / Qt.Key 数值，与 QKeySequence(...)[0].toCombined() 一致。
+# 多段组合（如 VS Code 的 "Ctrl+K, Ctrl+S"）每段占32位依次拼接，仍是一个整数。
+
+MOD_SHIFT = 0x02000000
+MOD_CTRL = 0x04000000
+MOD_ALT = 0x08000000
+MOD_META = 0x10000000
+MOD_MASK = MOD_SHIFT | MOD_CTRL | MOD_ALT | MOD_META
+
+CHORD_BITS = 32
+CHORD_MASK = (1 << CHORD_BITS) - 1
+# 一个绑定最多几段组合
+MAX_CHORDS = 4
+
+MODIFIER_NAMES = {
+    "ctrl": MOD_CTRL, "control": MOD_CTRL, "ctl": MOD_CTRL, "⌃": MOD_CTRL,
+    "shift": MOD_SHIFT, "⇧": MOD_SHIFT,
+    "alt": MOD_ALT, "option": MOD_ALT, "opt": MOD_ALT, "⌥": MOD_ALT,
+    "win": MOD_META, "meta": MOD_META, "cmd": MOD_META, "command": MOD_META, "super": MOD_META, "⌘": MOD_META,
+}
+# 修饰键顺序及显示名称
+_MODIFIER_ORDER = ((MOD_CTRL, "Ctrl"), (MOD_ALT, "Alt"), (MOD_SHIFT, "Shift"), (MOD_META, "Win"))
+
+# 具名按键（小写别名 -> Qt.Key）；第一个出现的名称用于显示
+_NAMED_KEYS = (
+    ("Esc", 0x01000000, ("escape",)),
+    ("Tab", 0x01000001, ()),
+    ("Backspace", 0x01000003, ("back", "bksp")),
+    ("Enter", 0x01000004, ("return", "回车")),
+    ("Ins", 0x01000006, ("insert",)),
+    ("Del", 0x01000007, ("delete",)),
+    ("Pause", 0x01000008, ("break",)),
+    ("Print", 0x01000009, ("printscreen", "prtsc", "prtscn")),
+    ("Home", 0x01000010, ()),
+    ("End", 0x01000011, ()),
+    ("Left", 0x01000012, ("←",)),
+    ("Up", 0x01000013, ("↑",)),
+    ("Right", 0x01000014, ("→",)),
+    ("Down", 0x01000015, ("↓",)),
+    ("PgUp", 0x01000016, ("pageup",)),
+    ("PgDown", 0x01000017, ("pagedown", "pgdn")),
+    ("Shift", 0x01000020, ()),
+    ("Ctrl", 0x01000021, ("control",)),
+    ("Win", 0x01000022, ("meta",)),
+    ("Alt", 0x01000023, ()),
+    ("CapsLock", 0x01000024, ("caps",)),
+    ("NumLock", 0x01000025, ()),
+    ("ScrollLock", 0x01000026, ()),
+    ("Menu", 0x01000055, ("apps",)),
+    ("Space", 0x20, ("空格",)),
+)
+KEY_NAMES = {}
+_KEY_DISPLAY = {}
+for _display, _code, _aliases in _NAMED_KEYS:
+    _KEY_DISPLAY[_code] = _display
+    for _alias in (_display.lower(),) + _aliases:
+        KEY_NAMES[_alias] = _code
+for _i in range(1, 36):
+    KEY_NAMES[f"f{_i}"] = 0x0100002F + _i
+    _KEY_DISPLAY[0x0100002F + _i] = f"F{_i}"
+
+# "+" 两侧的空白、多段组合之间的分隔（逗号或空白）、多种写法之间的分隔（"/"、"或"、"、"等）。
+# 紧跟在 "+" 后面的 "," "/" "|" ";" 是按键本身，不当作分隔符
+_PLUS_SPACES = re.compile(r"\s*\+\s*")
+_CHORD_SEP = re.compile(r"(?<!\+)\s*,\s*|\s+")
+_ALTERNATIVE_SEP = re.compile(r"(?<!\+)\s*(?:/|／|\||;|；|、|或)\s*")
+
+
+def _key_code(name):
+    code = KEY_NAMES.get(name.lower())
+    if code is not None:
+        return code
+    # 单个可见ASCII字符：字母按大写记
+    if len(name) == 1 and "!" <= name <= "~":
+        return ord(name.upper())
+    return None
+
+
+def parse_chord(text):
+    """解析单段组合，如 "Ctrl+Shift+A"、"ctrl-a"、"Ctrl++"，无法识别时返回None"""
+    text = text.strip()
+    if not text:
+        return None
+    parts = text.split("+")
+    if len(parts) == 1 and len(text) > 1 and "-" in text:
+        # "Ctrl-Shift-A" 写法：只有前面几段都是修饰键时才按 "-" 拆分
+        dash_parts = text.split("-")
+        if text.endswith("--"):
+            dash_parts = dash_parts[:-2] + ["-"]
+        if all(part.lower() in MODIFIER_NAMES for part in dash_parts[:-1]) and dash_parts[-1]:
+            parts = dash_parts
+    elif text.endswith("+") and (len(parts) == 2 or not parts[-2]):
+        # 最后一个键就是 "+"："Ctrl++"、"+"
+        parts = parts[:-2] + ["+"]
+    modifiers = 0
+    for part in parts[:-1]:
+        modifier = MODIFIER_NAMES.get(part.strip().lower())
+        if modifier is None:
+            return None
+        modifiers |= modifier
+    key = _key_code(parts[-1].strip())
+    if key is None:
+        return None
+    return modifiers | key
+
+
+def parse_sequence(text):
+    """解析一个绑定（可能是多段组合 "Ctrl+K, Ctrl+S"），编码为一个整数，无法识别时返回None"""
+    pieces = [piece for piece in _CHORD_SEP.split(_PLUS_SPACES.sub("+", text.strip())) if piece]
+    if not pieces or len(pieces) > MAX_CHORDS:
+        return None
+    code = 0
+    for i, piece in enumerate(pieces):
+        chord = parse_chord(piece)
+        if chord is None:
+            return None
+        code |= chord << (CHORD_BITS * i)
+    return code
+
+
+@lru_cache(maxsize=65536)
+def parse_bindings(text):
+    """解析快捷键文本中的全部写法（"Ctrl+C / Ctrl+Insert"），返回编码元组，识别不了的写法跳过"""
+    codes = []
+    for alternative in _ALTERNATIVE_SEP.split(str(text).strip()):
+        code = parse_sequence(alternative) if alternative else None
+        if code is not None and code not in codes:
+            codes.append(code)
+    return tuple(codes)
+
+
+def parse_query(text):
+    """搜索框输入整体是快捷键组合时返回编码元组，否则返回空元组；
+    单个字母、数字不算（那是普通关键词），至少要有修饰键或是F5、Enter这类具名按键"""
+    codes = parse_bindings(text)
+    for code in codes:
+        chord = code & CHORD_MASK
+        if not chord & MOD_MASK and chord not in _KEY_DISPLAY:
+            return ()
+    return codes
+
+
+def format_chord(chord):
+    names = [name for modifier, name in _MODIFIER_ORDER if chord & modifier]
+    key = chord & ~MOD_MASK
+    names.append(_KEY_DISPLAY.get(key) or chr(key))
+    return "+".join(names)
+
+
+def format_sequence(code):
+    """编码还原为规范写法，如 "Ctrl+Shift+A"、"Ctrl+K, Ctrl+S" """
+    chords = []
+    while code:
+        chords.append(format_chord(code & CHORD_MASK))
+        code >>= CHORD_BITS
+    return ", ".join(chords)
+
+
+# ===================== 组合 -> 软件/操作 反查表 =====================
+class ChordIndex:
+    """快捷键组合编码 -> 哪些软件的哪些操作在用，按软件增量更新，反查是一次字典查找"""
+
+    def __init__(self):
+        # 编码 -> {软件名: [(操作, 原始快捷键文本)]}
+        self._by_code = {}
+        # 软件名 -> 该软件用到的编码
+        self._soft_codes = {}
+
+    def __len__(self):
+        """不同的快捷键组合个数"""
+        return len(self._by_code)
+
+    def update_software(self, soft_name, shortcut_list):
+        self.remove_software(soft_name)
+        codes = set()
+        for oper, key, code in self._entries(shortcut_list):
+            self._by_code.setdefault(code, {}).setdefault(soft_name, []).append((oper, key))
+            codes.add(code)
+        if codes:
+            self._soft_codes[soft_name] = codes
+
+    def remove_software(self, soft_name):
+        for code in self._soft_codes.pop(soft_name, ()):
+            users = self._by_code[code]
+            del users[soft_name]
+            if not users:
+                del self._by_code[code]
+
+    @staticmethod
+    def _entries(shortcut_list):
+        for item in shortcut_list:
+            try:
+                oper = str(item.get("操作", ""))
+                key = str(item.get("快捷键", ""))
+            except AttributeError:
+                continue
+            for code in parse_bindings(key):
+                yield oper, key, code
+
+    def lookup(self, code):
+        """返回使用该组合的 [(软件名, 操作, 快捷键)]"""
+        return [(soft_name, oper, key)
+                for soft_name, entries in self._by_code.get(code, {}).items()
+                for oper, key in entries]
+
+    def conflicts(self, soft_name, shortcut_list):
+        """保存前检查冲突，返回 (重复, 共用)：
+        重复 [(编码, [操作])]：同一软件里一个组合绑定了不同的操作；
+        共用 [(编码, 操作, [(其他软件, 操作)])]：本次新增的组合在其他软件里也有（已保存过的不再提示）"""
+        saved = self._soft_codes.get(soft_name, set())
+        opers_by_code = {}
+        for oper, _, code in self._entries(shortcut_list):
+            opers = opers_by_code.setdefault(code, [])
+            if oper not in opers:
+                opers.append(oper)
+        duplicates = [(code, opers) for code, opers in opers_by_code.items() if len(opers) > 1]
+        shared = []
+        for code, opers in opers_by_code.items():
+            if code in saved:
+                continue
+            others = [(other, oper) for other, entries in self._by_code.get(code, {}).items()
+                      if other != soft_name for oper, _ in entries]
+            if others:
+                shared.append((code, opers[0], others))
+        return duplicates, shared
@@ -0,0 +1,193 @@
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+import data_manager
+from data_manager import DataManager
+from groups import UNGROUPED, UNGROUPED_LABEL
+from storage import BACKEND_KINDS
+
+# ===================== 命令行【不创建界面，供脚本、编辑器插件调用】 =====================
+# 用法：python cli.py <子命令> ...，打包后的程序也可以直接带子命令运行（main.py 在导入PyQt之前分派）。
+# 加 --json 输出JSON（UTF-8），出错时输出 {"error": 错误信息}；成功返回0，出错或找不到返回1。
+# 界面程序正在运行时，list/get/query/groups/reindex 交给它执行（见 ipc.py），直接用它已加载的数据和索引，加 --local 强制读取数据目录。
+
+class CommandError(Exception):
+    """命令执行失败，消息直接展示给用户"""
+
+
+# ===================== 子命令 =====================
+def cmd_list(args):
+    names = DataManager.get_all_software()
+    groups = DataManager.groups()
+    # 旧版本的命令行转发过来的请求没有这两个参数
+    group = getattr(args, "group", None)
+    tag = getattr(args, "tag", None)
+    if group is not None:
+        group = UNGROUPED if group == UNGROUPED_LABEL else group
+        names = [name for name in names if groups.group_of(name) == group]
+    if tag is not None:
+        names = [name for name in names if tag in groups.tags_of(name)]
+    return names, "\n".join(names)
+
+
+def cmd_get(args):
+    soft_name = DataManager.safe_name(args.name)
+    if soft_name not in DataManager.get_all_software():
+        raise CommandError(f"未找到软件：{args.name}")
+    shortcut_list = DataManager.get_software_detail(soft_name)
+    groups = DataManager.groups()
+    result = {
+        "software": soft_name,
+        "group": groups.group_of(soft_name),
+        "tags": groups.tags_of(soft_name),
+        "shortcut_list": [{"操作": item.get("操作", ""), "快捷键": item.get("快捷键", "")} for item in shortcut_list],
+    }
+    return result, "\n".join(f"{item['操作']}\t{item['快捷键']}" for item in result["shortcut_list"])
+
+
+def cmd_query(args):
+    hits = DataManager.search(" ".join(args.keywords), limit=args.limit)
+    software = [soft_name for soft_name, oper, _ in hits if oper is None]
+    shortcuts = [{"software": soft_name, "操作": oper, "快捷键": key} for soft_name, oper, key in hits if oper is not None]
+    lines = [f"[软件] {soft_name}" for soft_name in software]
+    lines.extend(f"{hit['software']}\t{hit['操作']}\t{hit['快捷键']}" for hit in shortcuts)
+    return {"software": software, "shortcuts": shortcuts}, "\n".join(lines)
+
+
+def cmd_groups(args):
+    """各分组的软件数，只读分组索引和目录，不打开软件数据"""
+    counts = DataManager.groups().counts(DataManager.get_all_software())
+    result = [{"group": group, "count": count} for group, count in counts.items()]
+    return result, "\n".join(f"{item['group'] or UNGROUPED_LABEL}\t{item['count']}" for item in result)
+
+
+def cmd_import(args):
+    from transfer import import_library
+    imported, skipped, bad_lines = import_library(args.file, DataManager.import_batch)
+    DataManager.save_snapshot()
+    message = f"已导入 {imported} 条快捷键"
+    if skipped:
+        message += f"，跳过 {skipped} 条无效记录（行号：{', '.join(map(str, bad_lines))}…）"
+    return {"imported": imported, "skipped": skipped, "bad_lines": bad_lines}, message
+
+
+def cmd_export(args):
+    from transfer import export_library
+    names = DataManager.get_all_software()
+    count = export_library(args.file, names, DataManager.get_software_detail)
+    return {"software": len(names), "shortcuts": count}, f"已导出 {len(names)} 个软件，共 {count} 条快捷键"
+
+
+def cmd_reindex(args):
+    start = time.perf_counter()
+    index = DataManager.rebuild_index()
+    result = {
+        "software": len(DataManager.get_all_software()),
+        "shortcuts": len(index),
+        "chords": len(index.chords),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    message = (f"已重建索引：{result['software']} 个软件，{result['shortcuts']} 条快捷键，"
+               f"{result['chords']} 种快捷键组合，用时 {result['elapsed_ms']} ms")
+    return result, message
+
+
+HANDLERS = {
+    "list": cmd_list,
+    "get": cmd_get,
+    "query": cmd_query,
+    "groups": cmd_groups,
+    "import": cmd_import,
+    "export": cmd_export,
+    "reindex": cmd_reindex,
+}
+# 可以交给正在运行的界面程序执行的子命令（导入/导出读写大量文件，仍在本进程执行）
+SERVED_COMMANDS = ("list", "get", "query", "groups", "reindex")
+# 只在本进程使用、不发给界面程序的参数
+LOCAL_OPTIONS = ("command", "json", "data_dir", "storage", "local")
+
+
+def request_running(args):
+    """交给正在运行的界面程序执行，返回 (结果, 文本)；没有程序在运行时返回None"""
+    import ipc
+    served_args = {key: value for key, value in vars(args).items() if key not in LOCAL_OPTIONS}
+    response = ipc.request(ipc.server_name(data_manager.DATA_DIR), args.command, served_args)
+    if response is None:
+        return None
+    if "error" in response:
+        raise CommandError(response["error"])
+    return response.get("result"), response.get("text", "")
+
+
+# ===================== 参数解析与输出 =====================
+def build_parser():
+    # 公共选项放在每个子命令上，写在子命令前后都可以：cli.py query ctrl+k --json
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="输出JSON")
+    common.add_argument("--data-dir", help=f"数据目录（默认 {data_manager.DATA_DIR}）")
+    common.add_argument("--storage", choices=BACKEND_KINDS, help="存储后端（默认同界面程序）")
+    common.add_argument("--local", action="store_true", help="不连接正在运行的程序，直接读取数据目录")
+
+    parser = argparse.ArgumentParser(prog="ShortcutKeyHelper", description="快捷键助手命令行")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="命令")
+    list_cmd = sub.add_parser("list", parents=[common], help="列出全部软件")
+    list_cmd.add_argument("--group", help=f"只列出该分组的软件（「{UNGROUPED_LABEL}」为不在任何分组中的软件）")
+    list_cmd.add_argument("--tag", help="只列出带该标签的软件")
+    get = sub.add_parser("get", parents=[common], help="查看一个软件的快捷键")
+    get.add_argument("name", help="软件名称")
+    query = sub.add_parser("query", parents=[common], help="搜索软件名称、操作、快捷键（可输入组合反查，如 ctrl+shift+p）")
+    query.add_argument("keywords", nargs="+", help="关键词，多个关键词需同时匹配")
+    query.add_argument("--limit", type=int, default=50, help="最多返回多少条快捷键")
+    sub.add_parser("groups", parents=[common], help="列出分组及各分组的软件数")
+    import_cmd = sub.add_parser("import", parents=[common], help="导入快捷键（.jsonl / .csv）")
+    import_cmd.add_argument("file")
+    export = sub.add_parser("export", parents=[common], help="导出全部快捷键（.jsonl / .csv）")
+    export.add_argument("file")
+    sub.add_parser("reindex", parents=[common], help="重新读取全部数据并重建搜索索引")
+    return parser
+
+
+def emit(result, text, as_json):
+    if as_json:
+        # 给插件读取：固定UTF-8，不受控制台编码影响
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(encoding="utf-8")
+        print(json.dumps(result, ensure_ascii=False))
+    elif text:
+        print(text)
+
+
+def main_entry(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.data_dir or args.storage:
+        DataManager.configure(data_dir=args.data_dir, storage=args.storage)
+    # 数据层的提示信息（迁移、读取失败等）改写到标准错误，标准输出只有结果，方便脚本解析
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            served = None
+            if args.command in SERVED_COMMANDS and not args.local:
+                served = request_running(args)
+            if served is not None:
+                result, text = served
+            else:
+                result, text = HANDLERS[args.command](args)
+        except (CommandError, OSError, ValueError) as e:
+            result, text = None, str(e)
+        finally:
+            # 写入在后台线程进行，退出前必须等它写完
+            DataManager.flush()
+    if result is None:
+        if args.json:
+            emit({"error": text}, None, True)
+        else:
+            print(f"错误：{text}", file=sys.stderr)
+        return 1
+    emit(result, text, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_entry())
@@ -0,0 +1,437 @@
+import os
+import sys
+import ctypes
+import threading
+
+from repository import ShortcutRepository
+from records import to_records
+from storage import open_backend
+from search_index import ShortcutIndex
+from chords import parse_bindings
+from history import HistoryStore, HISTORY_DIRNAME
+from snapshot import LibrarySnapshot, SNAPSHOT_FILENAME
+from groups import GroupIndex, GROUPS_FILENAME
+from tracing import traced
+
+# 数据层不依赖PyQt：界面（main.py）和命令行（cli.py）共用同一套读写、缓存、索引和历史。
+
+# ===================== 全局配置 =====================
+# 修复打包后路径问题
+if getattr(sys, 'frozen', False):
+    # 运行在打包后的环境中
+    if sys.platform.startswith('win'):
+        # Windows系统获取实际执行路径
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        buf = ctypes.create_unicode_buffer(1024)
+        kernel32.GetModuleFileNameW(None, buf, 1024)
+        BASE_DIR = os.path.dirname(buf.value)
+    else:
+        # 其他系统
+        BASE_DIR = os.path.dirname(os.path.abspath(sys.executable))
+else:
+    # 正常开发环境
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATA_DIR = os.path.join(BASE_DIR, "data")
+# 存储后端：json（默认，每个软件一个JSON文件）、journal（JSON文件 + 追加写的修改日志，适合经常编辑的大软件）
+# 或 sqlite（data/shortcuts.db 单文件，首次使用自动迁移）
+STORAGE_BACKEND = os.environ.get("SHORTCUT_HELPER_STORAGE", "json")
+# 保存JSON时是否fsync到磁盘（设为1开启，更安全但在慢盘上更慢）
+FSYNC_ON_SAVE = os.environ.get("SHORTCUT_HELPER_FSYNC", "0") == "1"
+# 是否使用整个库的二进制快照加快冷启动（设为0关闭），只用于JSON目录和日志后端
+SNAPSHOT_ENABLED = os.environ.get("SHORTCUT_HELPER_SNAPSHOT", "1") == "1"
+SNAPSHOT_BACKENDS = ("json", "journal")
+# 退出时等待后台写入完成的最长时间（秒）
+FLUSH_TIMEOUT = 10
+# 快捷键数据超过这个大小（字节）且不在缓存中时，详情窗口改为后台分块加载，先显示第一屏
+DETAIL_STREAM_BYTES = 256 * 1024
+# 分块加载时第一块的条数（略多于一屏）和之后每块的条数
+DETAIL_FIRST_CHUNK = 50
+DETAIL_CHUNK = 5000
+# data目录不在导入时创建（命令行和启动时的单实例检查只读不写），由各处写入前按需创建
+
+# ===================== 数据持久化工具类【单软件单文件，JSON格式】 =====================
+class DataManager:
+    # 内存缓存仓库，所有读取都走缓存，写入交给后台线程
+    _repository = None
+    # 全文倒排索引，首次使用时构建，保存/删除时增量更新
+    _index = None
+    # 版本历史（data/.history），每次保存/删除记一个版本，支持撤销/重做和恢复已删除的软件
+    _history = None
+    # 分组和标签（data/.library.groups），悬浮窗按分组折叠显示
+    _groups = None
+    # 界面启动时后台分批加载期间被修改过的软件（保存、删除、回退），加载线程读到的旧数据不能覆盖它们；None表示不在加载中
+    _loading_touched = None
+    # 建完索引后是否在后台更新快照：只有界面程序打开（main_entry 设为True），命令行的读取命令不写数据目录
+    write_snapshots = False
+    # 后台写入失败时回调 on_write_error(软件名, 错误信息)，在写入线程中调用；界面程序把它转成Qt信号
+    on_write_error = None
+
+    @staticmethod
+    def repository():
+        if DataManager._repository is None:
+            backend = open_backend(STORAGE_BACKEND, DATA_DIR, fsync=FSYNC_ON_SAVE)
+            snapshot = None
+            if SNAPSHOT_ENABLED and backend.kind in SNAPSHOT_BACKENDS:
+                snapshot = LibrarySnapshot(os.path.join(DATA_DIR, SNAPSHOT_FILENAME), backend.kind)
+            repository = ShortcutRepository(backend, snapshot=snapshot)
+            repository.on_write_error = DataManager._write_failed
+            DataManager._repository = repository
+        return DataManager._repository
+
+    @staticmethod
+    def configure(data_dir=None, storage=None):
+        """切换数据目录/存储后端（基准测试、命令行使用），先写完并关闭当前后端，再清空缓存和索引"""
+        global DATA_DIR, STORAGE_BACKEND
+        if DataManager._repository is not None:
+            DataManager._repository.close()
+        if DataManager._history is not None:
+            # 关闭记录线程，不然每切换一次数据目录就留下一个线程
+            DataManager._history.close()
+        DataManager._repository = None
+        DataManager._index = None
+        DataManager._history = None
+        DataManager._groups = None
+        DataManager._loading_touched = None
+        if data_dir is not None:
+            DATA_DIR = data_dir
+        if storage is not None:
+            STORAGE_BACKEND = storage
+
+    @staticmethod
+    def history():
+        if DataManager._history is None:
+            DataManager._history = HistoryStore(os.path.join(DATA_DIR, HISTORY_DIRNAME))
+        return DataManager._history
+
+    @staticmethod
+    def groups():
+        if DataManager._groups is None:
+            DataManager._groups = GroupIndex(os.path.join(DATA_DIR, GROUPS_FILENAME))
+        return DataManager._groups
+
+    @staticmethod
+    def poll_groups():
+        """分组文件被外部改动时重新读取，返回是否有变化"""
+        return DataManager.groups().refresh()
+
+    @staticmethod
+    def data_dir():
+        return DATA_DIR
+
+    @staticmethod
+    def _write_failed(name, error):
+        if DataManager.on_write_error is not None:
+            DataManager.on_write_error(name, error)
+
+    @staticmethod
+    def _touch(names):
+        if DataManager._loading_touched is not None:
+            DataManager._loading_touched.update(names)
+
+    @staticmethod
+    def resync_index(soft_name, error=None):
+        """写入失败后内存数据回退到磁盘版本，索引也要跟着回退"""
+        if DataManager._index is None:
+            return
+        DataManager._touch([soft_name])
+        if soft_name in DataManager.get_all_software():
+            DataManager._index.update_software(soft_name, DataManager.get_software_detail(soft_name))
+        else:
+            DataManager._index.remove_software(soft_name)
+
+    @staticmethod
+    @traced
+    def flush(timeout=FLUSH_TIMEOUT):
+        """等待后台写入全部落盘，退出程序前调用"""
+        if DataManager._history is not None:
+            DataManager._history.flush()
+        if DataManager._repository is None:
+            return True
+        flushed = DataManager._repository.flush(timeout)
+        if not flushed:
+            print("等待保存数据超时，部分修改可能未写入磁盘")
+        return flushed
+
+    @staticmethod
+    @traced
+    def save_snapshot():
+        """等待后台写入完成后更新快照（退出程序、批量导入之后调用），返回快照中的软件数；失败只提示，不影响使用"""
+        DataManager.flush()
+        try:
+            return DataManager.repository().save_snapshot()
+        except (OSError, ValueError) as e:
+            print(f"写入快照失败: {e}")
+            return 0
+
+    @staticmethod
+    def save_snapshot_later():
+        """在后台线程更新快照；不是守护线程，命令行进程退出前会等它写完"""
+        threading.Thread(target=DataManager.save_snapshot, name="ShortcutSnapshot").start()
+
+    @staticmethod
+    @traced
+    def search_index():
+        if DataManager._index is None:
+            index = ShortcutIndex()
+            repository = DataManager.repository()
+            # 个别软件读取或建索引失败时跳过它，用其余软件建好索引，之后的搜索不再重新扫描
+            for name, shortcut_list in repository.iter_all():
+                try:
+                    index.update_software(name, shortcut_list)
+                except Exception as e:
+                    print(f"建立索引失败，已跳过: {name} {e}")
+            DataManager._index = index
+            # 有软件是读原文件建的索引：（界面程序）在后台更新快照，下次启动直接用
+            if DataManager.write_snapshots and repository.snapshot_stale():
+                DataManager.save_snapshot_later()
+        return DataManager._index
+
+    @staticmethod
+    @traced
+    def rebuild_index():
+        """丢弃缓存和索引，重新读取全部数据并建立索引，返回新索引（正在分批加载时，之后到达的批次不再使用）"""
+        DataManager.repository().invalidate()
+        DataManager._index = None
+        DataManager._loading_touched = None
+        return DataManager.search_index()
+
+    # ===================== 分批加载【界面启动时，后台读取、界面线程建索引】 =====================
+    # 以下方法和保存、删除一样只在界面线程调用，索引始终只被一个线程修改。
+    @staticmethod
+    def begin_loading():
+        """开始分批加载：先放一个空索引，搜索立即可用，只是只能搜到已加载的部分；已有完整索引时返回False"""
+        if DataManager._index is not None:
+            return False
+        DataManager._index = ShortcutIndex()
+        DataManager._loading_touched = set()
+        return True
+
+    @staticmethod
+    @traced
+    def add_loaded(batch):
+        """把后台读到的一批 [(软件名, 快捷键列表)] 加入索引，返回加入的软件名；
+        加载期间被修改过的软件以索引里已有的新数据为准，不再加入"""
+        touched = DataManager._loading_touched
+        if touched is None:
+            return []
+        names = []
+        for name, shortcut_list in batch:
+            if name not in touched:
+                DataManager._index.update_software(name, shortcut_list)
+                names.append(name)
+        return names
+
+    @staticmethod
+    def finish_loading(complete=True):
+        """分批加载结束；没有完整加载（读取失败）时丢弃不完整的索引，下次搜索时重新建立"""
+        if DataManager._loading_touched is None:
+            return
+        DataManager._loading_touched = None
+        if not complete:
+            DataManager._index = None
+            return
+        if DataManager.write_snapshots and DataManager.repository().snapshot_stale():
+            DataManager.save_snapshot_later()
+
+    @staticmethod
+    @traced
+    def search(keyword, limit=200):
+        """在软件名称、操作、快捷键中搜索，返回[(软件名, 操作, 快捷键)]，操作为None表示软件名称命中"""
+        return DataManager.search_index().search(keyword, limit)
+
+    @staticmethod
+    def lookup_chord(key_text):
+        """反查快捷键组合（任意写法）被哪些软件的哪些操作使用，返回[(软件名, 操作, 快捷键)]"""
+        index = DataManager.search_index()
+        hits = []
+        for code in parse_bindings(key_text):
+            hits.extend(index.chords.lookup(code))
+        return hits
+
+    @staticmethod
+    @traced
+    def find_chord_conflicts(soft_name, shortcut_list):
+        """保存前检查快捷键冲突，返回 (本软件内重复, 与其他软件共用)，格式见 ChordIndex.conflicts"""
+        return DataManager.search_index().chords.conflicts(DataManager.safe_name(soft_name), shortcut_list)
+
+    @staticmethod
+    @traced
+    def poll_changes():
+        """检查外部改动（同步工具、手动编辑），只重新读取变化的软件，返回 (新增, 修改, 删除)"""
+        added, changed, removed = DataManager.repository().poll_changes()
+        if DataManager._index is not None:
+            DataManager._touch(added + changed + removed)
+            for name in added + changed:
+                DataManager._index.update_software(name, DataManager.get_software_detail(name))
+            for name in removed:
+                DataManager._index.remove_software(name)
+        # 外部改动也记为当前版本（不进入撤销栈）；之后撤销时 HistoryStore 发现当前版本不是上一步的结果，
+        # 会先把外部改动记成一次修改再撤销它，外部版本仍可重做找回
+        history = DataManager.history()
+        repository = DataManager.repository()
+        for name in added + changed:
+            history.record_later(name, lambda name=name: repository.get_detail(name), kind="sync")
+        for name in removed:
+            history.record_later(name, None, kind="sync")
+        return added, changed, removed
+
+    @staticmethod
+    def safe_name(soft_name):
+        """过滤Windows文件名非法字符，得到对应的JSON文件名（不含扩展名）"""
+        invalid_chars = r'\/:*?"<>|'
+        for char in invalid_chars:
+            soft_name = soft_name.replace(char, '_')
+        return soft_name.strip()
+
+    @staticmethod
+    @traced
+    def save_software(soft_name, shortcut_list):
+        if not soft_name.strip():
+            return False
+        return DataManager.save_many([(soft_name, shortcut_list)])
+
+    @staticmethod
+    @traced
+    def save_many(items):
+        """批量保存 [(软件名, 快捷键列表)]，作为一批写入（SQLite后端为一个事务）"""
+        items = [(DataManager.safe_name(name), to_records(shortcut_list)) for name, shortcut_list in items]
+        items = [(name, shortcut_list) for name, shortcut_list in items if name]
+        # 修改前的数据：该软件还没有历史版本时作为第一个版本
+        existing = set(DataManager.get_all_software())
+        baselines = [DataManager.repository().get_detail(name) if name in existing else None for name, _ in items]
+        if not DataManager._write_many(items):
+            return False
+        history = DataManager.history()
+        for (name, shortcut_list), baseline in zip(items, baselines):
+            history.record_later(name, shortcut_list, baseline)
+        return True
+
+    @staticmethod
+    def _write_many(items):
+        """写入仓库并更新索引，不记录历史（撤销/重做直接调用）"""
+        try:
+            DataManager.repository().save_many(items)
+        except Exception as e:
+            print(f"保存数据失败: {e}")
+            return False
+        if DataManager._index is not None:
+            DataManager._touch(name for name, _ in items)
+            for name, shortcut_list in items:
+                DataManager._index.update_software(name, shortcut_list)
+        return True
+
+    @staticmethod
+    @traced
+    def import_batch(grouped):
+        """合并导入的一批快捷键 {软件名: [快捷键]}：追加到已有列表，跳过完全相同的行；
+        返回实际新增的条数（保存失败时为0），没有新增的软件不重写"""
+        items = []
+        added = 0
+        for soft_name, new_items in grouped.items():
+            shortcut_list = DataManager.get_software_detail(soft_name)
+            count = len(shortcut_list)
+            seen = {(item.get("操作"), item.get("快捷键")) for item in shortcut_list}
+            for item in new_items:
+                pair = (item["操作"], item["快捷键"])
+                if pair not in seen:
+                    seen.add(pair)
+                    shortcut_list.append(item)
+            if len(shortcut_list) > count:
+                added += len(shortcut_list) - count
+                items.append((soft_name, shortcut_list))
+        if not items:
+            return 0
+        return added if DataManager.save_many(items) else 0
+
+    @staticmethod
+    @traced
+    def get_all_software():
+        return DataManager.repository().list_names()
+
+    @staticmethod
+    @traced
+    def get_software_detail(soft_name):
+        return DataManager.repository().get_detail(DataManager.safe_name(soft_name))
+
+    @staticmethod
+    def detail_needs_streaming(soft_name):
+        """快捷键数据较大且不在缓存中时，应在后台分块加载，避免阻塞界面"""
+        repository = DataManager.repository()
+        safe_name = DataManager.safe_name(soft_name)
+        return not repository.is_cached(safe_name) and repository.detail_size(safe_name) >= DETAIL_STREAM_BYTES
+
+    @staticmethod
+    def iter_software_detail(soft_name, chunk_size=DETAIL_CHUNK, first_chunk=DETAIL_FIRST_CHUNK):
+        """分块读取快捷键列表，生成 (记录列表, 进度0~1)，可在后台线程调用"""
+        return DataManager.repository().iter_detail(DataManager.safe_name(soft_name), chunk_size, first_chunk)
+
+    @staticmethod
+    @traced
+    def delete_software(soft_name):
+        """删除软件及对应本地数据（删除前的版本保留在历史中，可以恢复）"""
+        safe_name = DataManager.safe_name(soft_name)
+        baseline = DataManager.repository().get_detail(safe_name)
+        if not DataManager._remove(safe_name):
+            return False
+        DataManager.history().record_later(safe_name, None, baseline)
+        return True
+
+    @staticmethod
+    def _remove(safe_name):
+        try:
+            if not DataManager.repository().delete(safe_name):
+                return False
+        except Exception as e:
+            print(f"删除数据失败: {e}")
+            return False
+        if DataManager._index is not None:
+            DataManager._touch([safe_name])
+            DataManager._index.remove_software(safe_name)
+        return True
+
+    # ===================== 版本历史【撤销/重做/恢复已删除的软件】 =====================
+    @staticmethod
+    @traced
+    def undo():
+        """撤销最近一次保存或删除，返回涉及的软件名，没有可撤销的修改时返回None"""
+        return DataManager._apply_history(DataManager.history().undo)
+
+    @staticmethod
+    @traced
+    def redo():
+        return DataManager._apply_history(DataManager.history().redo)
+
+    @staticmethod
+    def _apply_history(step_func):
+        try:
+            step = step_func()
+        except (OSError, ValueError) as e:
+            print(f"读取历史版本失败: {e}")
+            return None
+        if step is None:
+            return None
+        name, shortcut_list = step
+        if shortcut_list is None:
+            DataManager._remove(name)
+        else:
+            DataManager._write_many([(name, shortcut_list)])
+        return name
+
+    @staticmethod
+    def deleted_software():
+        """可以恢复的已删除软件，最近删除的在前"""
+        return DataManager.history().deleted_names()
+
+    @staticmethod
+    @traced
+    def restore_software(soft_name):
+        """恢复已删除的软件（恢复本身也是一次修改，可以撤销）"""
+        try:
+            shortcut_list = DataManager.history().deleted_version(soft_name)
+        except (OSError, ValueError) as e:
+            print(f"读取历史版本失败: {e}")
+            return False
+        if shortcut_list is None:
+            return False
+        return DataManager.save_many([(soft_name, shortcut_list)])
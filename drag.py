@@ -0,0 +1,142 @@
+from PyQt6.QtCore import Qt, QObject, QEvent, QPoint, QRect, QTimer
+from PyQt6.QtGui import QCursor
+
+# ===================== 无边框窗口拖动/调整高度【一个事件过滤器，按帧合并移动】 =====================
+# 悬浮窗和快捷键详情窗口都没有系统标题栏，拖动和调整高度统一交给 DragResizeController：
+#   - 只在窗口（及指定的按钮）上装一个事件过滤器，一次鼠标移动只处理一次；
+#   - 悬停时只在所处区域（上边缘/下边缘/其他）变化时才设置光标，光标对象全程序共用；
+#   - 拖动中的鼠标移动只记下最新位置，每帧最多调用一次 move()/setGeometry()，
+#     新位置按按下时的窗口位置 + 鼠标全局位移计算，跳过的中间事件不影响结果。
+
+# 按下后移动不超过这个距离（像素）再松开，算作点击按钮而不是拖动
+CLICK_DISTANCE = 5
+# 取不到屏幕刷新率时按60Hz合并
+DEFAULT_REFRESH_RATE = 60
+
+ZONE_TOP = "top"
+ZONE_BOTTOM = "bottom"
+
+_CURSORS = {}
+
+
+def cached_cursor(shape):
+    """同一种光标只创建一次"""
+    cursor = _CURSORS.get(shape)
+    if cursor is None:
+        cursor = _CURSORS[shape] = QCursor(shape)
+    return cursor
+
+
+class DragResizeController(QObject):
+    """拖动窗口空白处移动窗口；edge_size大于0时，拖动上/下边缘调整高度（受窗口最小/最大高度限制）。
+    click_widgets 中的按钮按下后也可以拖动窗口，几乎没有移动就松开时照常触发点击"""
+
+    def __init__(self, window, edge_size=0, click_widgets=()):
+        super().__init__(window)
+        self.window = window
+        self.edge_size = edge_size
+        self.click_widgets = tuple(click_widgets)
+        # 按下时的状态：区域（None表示拖动）、鼠标全局位置、窗口几何
+        self.pressed = False
+        self.press_zone = None
+        self.press_global = QPoint()
+        self.press_geometry = QRect()
+        # 最新的鼠标全局位置，等下一帧再应用
+        self.latest_global = QPoint()
+        self.dirty = False
+        # 当前悬停区域，变化时才换光标
+        self.hover_zone = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.on_frame)
+        if edge_size > 0:
+            # 不按键时也要收到移动事件，才能在边缘显示调整大小的光标
+            window.setMouseTracking(True)
+        window.installEventFilter(self)
+        for widget in self.click_widgets:
+            widget.installEventFilter(self)
+
+    def frame_interval(self):
+        screen = self.window.screen()
+        rate = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / (rate if rate > 0 else DEFAULT_REFRESH_RATE)))
+
+    def zone_at(self, y):
+        if self.edge_size <= 0:
+            return None
+        if y <= self.edge_size:
+            return ZONE_TOP
+        if y >= self.window.height() - 1 - self.edge_size:
+            return ZONE_BOTTOM
+        return None
+
+    def set_hover_zone(self, zone):
+        if zone == self.hover_zone:
+            return
+        self.hover_zone = zone
+        if zone is None:
+            self.window.unsetCursor()
+        else:
+            self.window.setCursor(cached_cursor(Qt.CursorShape.SizeVerCursor))
+
+    def reset(self):
+        """窗口切换内容或隐藏时清除按下/悬停状态"""
+        self.pressed = False
+        self.dirty = False
+        self.frame_timer.stop()
+        self.set_hover_zone(None)
+
+    def eventFilter(self, obj, event):
+        etype = event.type()
+        if etype == QEvent.Type.MouseMove:
+            if self.pressed:
+                self.latest_global = event.globalPosition().toPoint()
+                self.dirty = True
+                if not self.frame_timer.isActive():
+                    # 距上一次应用已超过一帧：立即应用，之后一帧内的移动合并
+                    self.on_frame()
+                return True
+            if obj is self.window and event.buttons() == Qt.MouseButton.NoButton:
+                self.set_hover_zone(self.zone_at(event.position().y()))
+            return False
+        if etype == QEvent.Type.MouseButtonPress and event.button() == Qt.MouseButton.LeftButton:
+            self.pressed = True
+            self.press_zone = self.zone_at(event.position().y()) if obj is self.window else None
+            self.press_global = event.globalPosition().toPoint()
+            self.latest_global = self.press_global
+            self.press_geometry = self.window.geometry()
+            self.dirty = False
+            return True
+        if etype == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton and self.pressed:
+            self.latest_global = event.globalPosition().toPoint()
+            self.dirty = True
+            self.on_frame()
+            self.frame_timer.stop()
+            self.pressed = False
+            if obj is not self.window and (self.latest_global - self.press_global).manhattanLength() < CLICK_DISTANCE:
+                obj.click()
+            return True
+        if etype == QEvent.Type.Leave and obj is self.window and not self.pressed:
+            self.set_hover_zone(None)
+        return False
+
+    def on_frame(self):
+        """把最新的鼠标位置应用到窗口，每帧最多一次"""
+        if not self.dirty or not self.pressed:
+            return
+        self.dirty = False
+        delta = self.latest_global - self.press_global
+        geometry = self.press_geometry
+        if self.press_zone is None:
+            self.window.move(geometry.topLeft() + delta)
+        else:
+            min_height = self.window.minimumHeight()
+            max_height = self.window.maximumHeight()
+            if self.press_zone == ZONE_BOTTOM:
+                height = min(max(geometry.height() + delta.y(), min_height), max_height)
+                self.window.resize(geometry.width(), height)
+            else:
+                # 拖上边缘：下边缘不动
+                height = min(max(geometry.height() - delta.y(), min_height), max_height)
+                self.window.setGeometry(geometry.x(), geometry.bottom() + 1 - height, geometry.width(), height)
+        self.frame_timer.start(self.frame_interval())
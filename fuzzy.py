@@ -0,0 +1,354 @@
+import re
+import heapq
+from itertools import accumulate
+from collections import Counter
+from bisect import bisect_left, bisect_right
+
+# 拼音库是可选依赖：安装 pypinyin 后支持全拼（weixin）和多音字，未安装时只用内置的GB2312首字母表（wx）
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# ===================== 软件名称模糊匹配【前缀/子串/子序列/拼音/错字容忍】 =====================
+# 每个软件名称预先生成几种检索键：名称本身、全拼、首字母（中文取拼音首字母，英文取每个单词首字母），
+# 搜索时按匹配档次从高到低依次查找，已凑够 limit 个结果时不再查找更低的档次，结果由固定大小的堆取前k个。
+
+# 匹配档次，数值越大越靠前
+TIER_EXACT = 5
+TIER_PREFIX = 4
+TIER_SUBSTRING = 3
+TIER_SUBSEQUENCE = 2
+TIER_TYPO = 1
+
+# 检索键种类及其在同档内的扣分：名称本身优先于全拼，全拼优先于首字母
+KIND_NAME = 0
+KIND_PINYIN = 1
+KIND_INITIALS = 2
+
+# GB2312一级汉字按拼音排序，每个声母的起始编码；二级汉字按部首排序，查不到首字母
+_GB2312_INITIALS = (
+    (0xB0A1, "a"), (0xB0C5, "b"), (0xB2C1, "c"), (0xB4EE, "d"), (0xB6EA, "e"), (0xB7A2, "f"),
+    (0xB8C1, "g"), (0xB9FE, "h"), (0xBBF7, "j"), (0xBFA6, "k"), (0xC0AC, "l"), (0xC2E8, "m"),
+    (0xC4C3, "n"), (0xC5B6, "o"), (0xC5BE, "p"), (0xC6DA, "q"), (0xC8BB, "r"), (0xC8F6, "s"),
+    (0xCBFA, "t"), (0xCDDA, "w"), (0xCEF4, "x"), (0xD1B9, "y"), (0xD4D1, "z"),
+)
+_GB2312_CODES = [code for code, _ in _GB2312_INITIALS]
+_GB2312_LAST = 0xD7F9
+
+# 英文按单词切分：空白/标点分隔，以及驼峰（PyCharm -> Py Charm）
+_WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+# 单个检索键中不可能出现的分隔符，用于拼接成一整段文本后整体查找
+_LINE_SEP = "\n"
+# 三元组左侧填充，让前缀也有自己的三元组
+_PAD = "\x01\x01"
+# 错字容忍只比较检索键开头这么多个字符（三元组也只取这一段），更长的查询只用开头部分比较
+TYPO_WINDOW = 16
+
+
+def is_cjk(char):
+    return "一" <= char <= "鿿"
+
+
+def gb2312_initial(char):
+    """用GB2312编码区间查汉字的拼音首字母，查不到返回None"""
+    try:
+        raw = char.encode("gb2312")
+    except UnicodeEncodeError:
+        return None
+    if len(raw) != 2:
+        return None
+    code = raw[0] << 8 | raw[1]
+    if code < _GB2312_CODES[0] or code > _GB2312_LAST:
+        return None
+    return _GB2312_INITIALS[bisect_right(_GB2312_CODES, code) - 1][1]
+
+
+def pinyin_keys(text):
+    """返回 (全拼, 首字母)：中文取拼音，英文取每个单词的首字母；没有拼音库时全拼为None"""
+    full, initials = [], []
+    for run in re.findall(r"[一-鿿]+|[^一-鿿]+", text):
+        if not is_cjk(run[0]):
+            full.append("".join(run.lower().split()))
+            initials.extend(word[0].lower() for word in _WORD_PATTERN.findall(run))
+        elif lazy_pinyin is not None:
+            # 连续的中文整段转换，多音字按词组取音
+            syllables = lazy_pinyin(run)
+            full.extend(syllables)
+            initials.extend(s[0] for s in syllables if s)
+        else:
+            initials.extend(gb2312_initial(char) or char for char in run)
+    return ("".join(full) if lazy_pinyin is not None else None), "".join(initials)
+
+
+def collation_key(keys):
+    """同分时的先后：按拼音排序（没有拼音库时用首字母），中英文名称混排，而不是英文名称总在前面。
+    keys 为名称的检索键；返回的元组越大越靠前，可以直接放进按"越大越好"比较的结果元组里"""
+    kinds = dict(keys)
+    normalized = kinds.get(KIND_NAME, "")
+    text = normalized
+    if any(is_cjk(char) for char in normalized):
+        text = kinds.get(KIND_PINYIN) or kinds.get(KIND_INITIALS) or normalized
+    # 字符取负后比较结果反过来；末尾的1让"wei"排在"weixin"之前；拼音相同时再按名称本身
+    return tuple(-ord(char) for char in text) + (1,) + tuple(-ord(char) for char in normalized) + (1,)
+
+
+def trigrams(text):
+    padded = _PAD + text
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def prefix_distance(query, key, max_distance):
+    """query与key某个前缀之间的最小编辑距离（含相邻字符交换），超过max_distance时返回None；只计算对角线附近的带状区域"""
+    n = len(query)
+    m = min(len(key), n + max_distance)
+    big = max_distance + 1
+    prev2 = None
+    prev = list(range(m + 1))
+    for i in range(1, n + 1):
+        cur = [big] * (m + 1)
+        cur[0] = i
+        lo = max(1, i - max_distance)
+        hi = min(m, i + max_distance)
+        qc = query[i - 1]
+        for j in range(lo, hi + 1):
+            best = prev[j - 1] if qc == key[j - 1] else prev[j - 1] + 1
+            if prev[j] + 1 < best:
+                best = prev[j] + 1
+            if cur[j - 1] + 1 < best:
+                best = cur[j - 1] + 1
+            if j > 1 and i > 1 and qc == key[j - 2] and query[i - 2] == key[j - 1] and prev2[j - 2] + 1 < best:
+                best = prev2[j - 2] + 1
+            cur[j] = best
+        if min(cur[lo - 1:hi + 1]) > max_distance:
+            return None
+        prev2, prev = prev, cur
+    best = min(prev[max(0, n - max_distance):m + 1], default=big)
+    return best if best <= max_distance else None
+
+
+class FuzzyNameMatcher:
+    """软件名称模糊匹配：增量增删名称，检索键和三元组倒排表在加入名称时预先算好"""
+    # 每一档最多检查 limit * SCAN_FACTOR 个候选，保证候选很多时单次搜索的耗时有上限
+    SCAN_FACTOR = 8
+
+    def __init__(self):
+        self._next_id = 0
+        self._ids = {}       # 软件名 -> ID
+        self._names = {}     # ID -> 软件名
+        self._keys = {}      # ID -> [(种类, 检索键)]
+        self._collation = {}  # ID -> 同分时的排序键（collation_key），出现在结果里时才计算
+        # 全部检索键按字典序排列（前缀用二分查找），与 _sorted_ids 一一对应；
+        # 批量加入名称时不维护顺序，第一次搜索时整体排序，之后的增删按二分插入/删除
+        self._sorted = False
+        self._sorted_keys = []
+        self._sorted_ids = []
+        self._sorted_kinds = []
+        # 检索键 -> {ID: 检索键种类}，完全相等的匹配
+        self._exact = {}
+        # 三元组 -> {ID}，以及每个名称自己的三元组集合，用于错字容忍
+        self._trigrams = {}
+        self._name_trigrams = {}
+        # 全部检索键按字典序用换行拼成一段文本，子串/子序列在C层整体查找；名称变化后下次搜索时再重建
+        self._blob = None
+        self._line_starts = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    @staticmethod
+    def _make_keys(name):
+        normalized = "".join(name.lower().split())
+        full, initials = pinyin_keys(name)
+        keys = [(KIND_NAME, normalized)]
+        if full and full != normalized:
+            keys.append((KIND_PINYIN, full))
+        if len(initials) > 1 and initials not in (normalized, full):
+            keys.append((KIND_INITIALS, initials))
+        return [(kind, key.replace(_LINE_SEP, "")) for kind, key in keys if key]
+
+    def set_names(self, names):
+        self.__init__()
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if name in self._ids:
+            return
+        name_id = self._next_id
+        self._next_id += 1
+        self._ids[name] = name_id
+        self._names[name_id] = name
+        keys = self._make_keys(name)
+        self._keys[name_id] = keys
+        grams = set()
+        for kind, key in keys:
+            if self._sorted:
+                i = bisect_right(self._sorted_keys, key)
+                self._sorted_keys.insert(i, key)
+                self._sorted_ids.insert(i, name_id)
+                self._sorted_kinds.insert(i, kind)
+            self._exact.setdefault(key, {})[name_id] = kind
+            if kind != KIND_INITIALS:
+                grams |= trigrams(key[:TYPO_WINDOW])
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(name_id)
+        self._name_trigrams[name_id] = grams
+        self._blob = None
+
+    def remove(self, name):
+        name_id = self._ids.pop(name, None)
+        if name_id is None:
+            return
+        del self._names[name_id]
+        self._collation.pop(name_id, None)
+        for kind, key in self._keys.pop(name_id):
+            if self._sorted:
+                i = bisect_left(self._sorted_keys, key)
+                while self._sorted_ids[i] != name_id:
+                    i += 1
+                del self._sorted_keys[i], self._sorted_ids[i], self._sorted_kinds[i]
+            ids = self._exact[key]
+            ids.pop(name_id, None)
+            if not ids:
+                del self._exact[key]
+        for gram in self._name_trigrams.pop(name_id):
+            ids = self._trigrams[gram]
+            ids.discard(name_id)
+            if not ids:
+                del self._trigrams[gram]
+        self._blob = None
+
+    def _ensure_sorted(self):
+        if self._sorted:
+            return
+        entries = sorted((key, name_id, kind) for name_id, keys in self._keys.items() for kind, key in keys)
+        self._sorted_keys = [key for key, _, _ in entries]
+        self._sorted_ids = [name_id for _, name_id, _ in entries]
+        self._sorted_kinds = [kind for _, _, kind in entries]
+        self._sorted = True
+
+    def _ensure_blob(self):
+        if self._blob is not None:
+            return
+        self._line_starts = list(accumulate((len(key) + 1 for key in self._sorted_keys[:-1]), initial=0))
+        self._blob = _LINE_SEP.join(self._sorted_keys)
+
+    def _collation_of(self, name_id):
+        key = self._collation.get(name_id)
+        if key is None:
+            key = self._collation[name_id] = collation_key(self._keys[name_id])
+        return key
+
+    def _line_at(self, pos):
+        return bisect_right(self._line_starts, pos) - 1
+
+    # ===================== 搜索 =====================
+    def search(self, query, limit=50):
+        """返回按相关度排序的软件名称列表（最多limit个）"""
+        query = "".join(str(query).lower().split()).replace(_LINE_SEP, "")
+        if not query or limit <= 0 or not self._ids:
+            return []
+        # [(档次, 档内得分, 排序键, 软件名)]，最多limit个，堆顶是当前最差的结果；同分时按拼音/名称排序
+        heap = []
+        seen = set()  # 已经给出过匹配的ID，档次从高到低查找，先出现的就是最好的匹配
+        scan = limit * self.SCAN_FACTOR
+
+        def offer(tier, score, name_id):
+            if name_id in seen:
+                return
+            seen.add(name_id)
+            item = (tier, score, self._collation_of(name_id), self._names[name_id])
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        self._ensure_sorted()
+        # 完全相等 + 前缀：有序检索键上二分查找，越短越接近完全相等
+        exact = self._exact.get(query, {})
+        for name_id in exact:
+            offer(TIER_EXACT, -exact[name_id], name_id)
+        keys, ids, kinds = self._sorted_keys, self._sorted_ids, self._sorted_kinds
+        i = bisect_left(keys, query)
+        end = min(len(keys), i + scan)
+        while i < end and keys[i].startswith(query):
+            offer(TIER_PREFIX, -(len(keys[i]) - len(query)) * 3 - kinds[i], ids[i])
+            i += 1
+        if len(heap) >= limit:
+            return self._ranked(heap)
+
+        self._ensure_blob()
+        blob = self._blob
+        starts = self._line_starts
+        # 子串：在拼接文本中整体查找，命中后直接跳到下一行，出现位置越靠前越好
+        pos, found = 0, 0
+        while found < scan:
+            pos = blob.find(query, pos)
+            if pos < 0:
+                break
+            line = self._line_at(pos)
+            offer(TIER_SUBSTRING, -(pos - starts[line]) * 3 - kinds[line], ids[line])
+            found += 1
+            pos = starts[line + 1] if line + 1 < len(starts) else len(blob)
+        if len(heap) >= limit:
+            return self._ranked(heap)
+
+        # 子序列：wx 匹配 weixin，pyc 匹配 PyCharm；匹配到的字符越集中越好
+        if len(query) > 1:
+            # a[^\nb]*b[^\nc]*c…：每一步直接找下一个字符的第一次出现，不会回溯
+            chars = [re.escape(char) for char in query]
+            pattern = re.compile(chars[0] + "".join(f"[^\n{char}]*{char}" for char in chars[1:]))
+            pos, found = 0, 0
+            while found < scan:
+                match = pattern.search(blob, pos)
+                if match is None:
+                    break
+                line = self._line_at(match.start())
+                gaps = match.end() - match.start() - len(query)
+                offset = min(match.start() - starts[line], 63)
+                offer(TIER_SUBSEQUENCE, -(gaps * 3 + kinds[line]) * 64 - offset, ids[line])
+                found += 1
+                pos = starts[line + 1] if line + 1 < len(starts) else len(blob)
+            if len(heap) >= limit:
+                return self._ranked(heap)
+
+        self._search_typos(query, limit, offer)
+        return self._ranked(heap)
+
+    def _search_typos(self, query, scan, offer):
+        """错字容忍：与检索键开头比较，4个字符起允许1处错误，8个字符起允许2处（错字、漏字、多字、相邻颠倒）
+
+        一处编辑最多破坏3个三元组，符合条件的检索键开头至少与查询共享 三元组数 - 3*距离 个三元组，
+        先用倒排表数出每个名称共享的三元组个数过滤，只对共享最多的scan个名称计算编辑距离。
+        """
+        max_distance = 2 if len(query) >= 8 else 1 if len(query) >= 4 else 0
+        if not max_distance:
+            return
+        query = query[:TYPO_WINDOW - max_distance]
+        query_grams = trigrams(query)
+        need = len(query_grams) - 3 * max_distance
+        if need <= 0:
+            return
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._trigrams.get(gram, ()))
+        candidates = heapq.nlargest(scan, ((count, name_id) for name_id, count in shared.items() if count >= need))
+        for _, name_id in candidates:
+            scores = []
+            for kind, key in self._keys[name_id]:
+                if kind == KIND_INITIALS:
+                    continue
+                distance = prefix_distance(query, key, max_distance)
+                if distance is not None:
+                    # 距离相同时，长度与查询越接近越好（pychram 更像 PyCharm 而不是 PyChrome）
+                    scores.append(-distance * 16 - min(abs(len(key) - len(query)), 15))
+            if scores:
+                offer(TIER_TYPO, max(scores), name_id)
+
+    @staticmethod
+    def _ranked(heap):
+        return [item[3] for item in sorted(heap, reverse=True)]
@@ -0,0 +1,220 @@
+import os
+import re
+import json
+
+# ===================== 分组与标签【一个小索引文件，不打开软件的JSON】 =====================
+# 分组、标签和分组的展开状态保存在 data/.library.groups（JSON内容，不用.json后缀，免得被当成软件）：
+#   {"version": 1, "groups": {分组名: [软件名, ...]}, "tags": {软件名: [标签, ...]}, "expanded": [展开的分组名]}
+# 每个软件最多属于一个分组，不在任何分组里的算"未分组"（键为空字符串）。悬浮窗按分组折叠显示，
+# 各分组的软件数由成员列表和目录扫描得到的软件名算出，只有展开的分组才把成员放进列表。
+# 折叠只省去列表里的行，不省读取：全文搜索要覆盖所有软件，启动时折叠分组的快捷键照样读取、建索引，
+# 只是排在展开的分组之后（见 load_priority）。
+# 删除软件时不清除它的分组和标签，恢复后回到原来的分组。
+
+GROUPS_FILENAME = ".library.groups"
+GROUPS_VERSION = 1
+# 未分组的键和显示名称
+UNGROUPED = ""
+UNGROUPED_LABEL = "未分组"
+# 标签之间的分隔符：中英文逗号、空白
+_TAG_SEPARATORS = re.compile(r"[,，\s]+")
+
+
+def parse_tags(text):
+    """把"python, 编辑器 #常用"这样的输入拆成去重后的标签列表"""
+    tags = []
+    for tag in _TAG_SEPARATORS.split(text):
+        tag = tag.strip().lstrip("#")
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+class GroupIndex:
+    """分组/标签索引的读写；只在界面线程或命令行进程中使用，每次修改立即写回文件"""
+
+    def __init__(self, path):
+        self.path = path
+        # 分组名 -> 成员软件名列表（字典顺序即显示顺序）
+        self.members = {}
+        # 软件名 -> 标签列表
+        self.tags = {}
+        # 展开的分组，默认只展开未分组
+        self.expanded = {UNGROUPED}
+        # 软件名 -> 分组名，由 members 生成
+        self._group_of = {}
+        # 上次读取/写入时文件的 (mtime, 大小)，外部修改后重新读取
+        self._stamp = None
+        self.load()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self):
+        self.members, self.tags, self.expanded, self._group_of = {}, {}, {UNGROUPED}, {}
+        self._stamp = self._file_stamp()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"读取分组失败: {self.path} {e}")
+            return
+        if not isinstance(data, dict):
+            print(f"读取分组失败: {self.path} 格式错误")
+            return
+        for group, names in (data.get("groups") or {}).items():
+            group = str(group).strip()
+            if not group:
+                continue
+            self.members.setdefault(group, [])
+            for name in names or []:
+                name = str(name)
+                if name not in self._group_of:
+                    self._group_of[name] = group
+                    self.members[group].append(name)
+        for name, tags in (data.get("tags") or {}).items():
+            tags = parse_tags(" ".join(map(str, tags or [])))
+            if tags:
+                self.tags[str(name)] = tags
+        if "expanded" in data:
+            self.expanded = {str(group) for group in data["expanded"] or []}
+
+    def refresh(self):
+        """文件被外部改动（同步工具、手动编辑）时重新读取，返回是否有变化"""
+        if self._file_stamp() == self._stamp:
+            return False
+        self.load()
+        return True
+
+    def save(self):
+        """先写临时文件再原子替换；失败只提示，内存中的修改保留"""
+        data = {
+            "version": GROUPS_VERSION,
+            "groups": self.members,
+            "tags": self.tags,
+            "expanded": sorted(self.expanded),
+        }
+        temp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"保存分组失败: {e}")
+            return False
+        self._stamp = self._file_stamp()
+        return True
+
+    # ===================== 查询 =====================
+    def group_names(self):
+        return list(self.members)
+
+    def group_of(self, name):
+        return self._group_of.get(name, UNGROUPED)
+
+    def tags_of(self, name):
+        return self.tags.get(name, [])
+
+    def is_expanded(self, group):
+        return group in self.expanded
+
+    def counts(self, names):
+        """{分组名: 软件数}，只数 names（当前存在的软件）里的成员；有未分组的软件时包含未分组"""
+        existing = set(names)
+        counts = {group: sum(1 for name in members if name in existing) for group, members in self.members.items()}
+        ungrouped = len(existing) - sum(counts.values())
+        if ungrouped:
+            counts[UNGROUPED] = ungrouped
+        return counts
+
+    def members_of(self, group, names):
+        """分组中当前存在的软件；未分组按 names 的顺序"""
+        if group == UNGROUPED:
+            return [name for name in names if name not in self._group_of]
+        existing = set(names)
+        return [name for name in self.members.get(group, []) if name in existing]
+
+    def layout(self, names):
+        """悬浮窗列表的分组布局：[(分组名, 软件数, 展开时的成员列表或None)]，未分组在最后；没有任何分组时返回None"""
+        if not self.members:
+            return None
+        sections = []
+        for group, count in self.counts(names).items():
+            members = self.members_of(group, names) if group in self.expanded else None
+            sections.append((group, count, members))
+        return sections
+
+    def with_tag(self, prefix, names):
+        """标签以prefix开头（不区分大小写）的软件，按 names 的顺序；prefix为空时返回所有有标签的软件"""
+        prefix = prefix.lower()
+        return [name for name in names
+                if any(tag.lower().startswith(prefix) for tag in self.tags.get(name, ()))]
+
+    def load_priority(self):
+        """启动加载的先后顺序：返回 软件名 -> 0（在展开的分组里，先读）/1 的函数；
+        只用调用时的状态，可以交给后台线程使用"""
+        group_of = dict(self._group_of)
+        expanded = frozenset(self.expanded)
+        return lambda name: 0 if group_of.get(name, UNGROUPED) in expanded else 1
+
+    # ===================== 修改【每次修改立即写回】 =====================
+    def _detach(self, name):
+        group = self._group_of.pop(name, None)
+        if group is not None:
+            self.members[group].remove(name)
+
+    def set_software(self, name, group, tags):
+        """设置软件的分组（UNGROUPED表示移出分组，新名称自动创建分组）和标签"""
+        group = group.strip()
+        self._detach(name)
+        if group:
+            self.members.setdefault(group, []).append(name)
+            self._group_of[name] = group
+        tags = parse_tags(" ".join(tags))
+        if tags:
+            self.tags[name] = tags
+        else:
+            self.tags.pop(name, None)
+        return self.save()
+
+    def set_expanded(self, group, expanded):
+        if expanded:
+            self.expanded.add(group)
+        else:
+            self.expanded.discard(group)
+        return self.save()
+
+    def rename_group(self, group, new_group):
+        """重命名分组；与已有分组同名时合并进去"""
+        new_group = new_group.strip()
+        if not new_group or new_group == group or group not in self.members:
+            return False
+        moved = self.members[group]
+        if new_group in self.members:
+            del self.members[group]
+            self.members[new_group].extend(moved)
+        else:
+            # 新名称留在原来的位置
+            self.members = {(new_group if key == group else key): value for key, value in self.members.items()}
+        for name in moved:
+            self._group_of[name] = new_group
+        if group in self.expanded:
+            self.expanded.discard(group)
+            self.expanded.add(new_group)
+        return self.save()
+
+    def remove_group(self, group):
+        """删除分组，成员回到未分组"""
+        if group not in self.members:
+            return False
+        for name in self.members.pop(group):
+            self._group_of.pop(name, None)
+        self.expanded.discard(group)
+        return self.save()
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+
+from records import ShortcutRecord
+
+# ===================== 版本历史【按内容寻址的对象库 + 撤销/重做】 =====================
+# 每次保存/删除都记一个版本，数据放在 data/.history 下：
+#   objects/ab/cdef…   按内容的sha256存放的对象（zlib压缩），内容相同只存一份
+#   log.jsonl          追加写的操作日志，每行 {"t", "kind", "name", "before", "after"}
+# 快捷键列表按内容切成若干块（某条快捷键的crc32满足条件处断开），块的哈希列表再按同样的方法逐层分组，
+# 版本就是最上层节点的哈希。改一条快捷键只产生一个新块和从它到根的几个小节点，中间插入/删除也只影响所在的块，
+# 历史占用随改动大小增长，而不是随保存次数或列表长度。
+# kind：edit 普通修改（进入撤销栈）、undo/redo 撤销/重做、sync 外部改动（只更新当前版本，不进入撤销栈）。
+# 撤销/重做时若当前版本已被外部改动换掉，先把外部改动记成一次普通修改再撤销它，外部版本可以重做找回，不会被悄悄覆盖。
+
+HISTORY_DIRNAME = ".history"
+# 平均每块多少条快捷键（取crc32的余数决定断点）和每块最多多少条
+CHUNK_AVG = 32
+CHUNK_MAX = 256
+# 每个节点平均/最多引用多少个下层哈希
+FANOUT_AVG = 16
+FANOUT_MAX = 64
+# 撤销/重做最多保留多少步
+UNDO_LIMIT = 200
+# "恢复已删除的软件"最多列出多少个
+DELETED_SHOW_LIMIT = 20
+
+
+def split_chunks(shortcut_list):
+    """按内容切块：断点只由快捷键本身决定，插入或删除一条不会让后面所有块都变化"""
+    chunks = []
+    chunk = []
+    for item in shortcut_list:
+        oper = str(item.get("操作", ""))
+        key = str(item.get("快捷键", ""))
+        chunk.append([oper, key])
+        if len(chunk) >= CHUNK_MAX or zlib.crc32(f"{oper}\x00{key}".encode("utf-8")) % CHUNK_AVG == 0:
+            chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class HistoryStore:
+    """版本历史：对象库 + 操作日志；撤销栈、重做栈、每个软件的当前版本在首次使用时由日志重建"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.log_path = os.path.join(root, "log.jsonl")
+        self._lock = threading.RLock()
+        self._loaded = False
+        # 本次运行已确认存在的对象，避免重复stat
+        self._known_objects = set()
+        # 软件名 -> 当前版本（None表示已删除）
+        self._heads = {}
+        self._undo = []
+        self._redo = []
+        # 已删除的软件：软件名 -> (删除前的版本, 删除时间)
+        self._deleted = {}
+        # 日志有效长度，最后一行写到一半时追加前先截掉
+        self._log_end = 0
+        # 后台记录线程及最后提交的任务
+        self._executor = None
+        self._pending = None
+
+    # ===================== 对象库 =====================
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _put(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._known_objects:
+            return digest
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(data))
+            os.replace(tmp_path, path)
+        self._known_objects.add(digest)
+        return digest
+
+    def _get(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def _put_node(self, level, ids):
+        return self._put(json.dumps({"level": level, "ids": ids}, separators=(",", ":")).encode("utf-8"))
+
+    def put_list(self, shortcut_list):
+        """存入一个快捷键列表（已有的块和节点不重复写入），返回版本哈希"""
+        ids = [self._put(json.dumps(chunk, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+               for chunk in split_chunks(shortcut_list)]
+        level = 0
+        while len(ids) > FANOUT_MAX:
+            # 断点由哈希本身决定，与切块同理：一个块变化只影响所在的那一组
+            groups = []
+            group = []
+            for digest in ids:
+                group.append(digest)
+                if len(group) >= FANOUT_MAX or int(digest[:8], 16) % FANOUT_AVG == 0:
+                    groups.append(group)
+                    group = []
+            if group:
+                groups.append(group)
+            ids = [self._put_node(level, group) for group in groups]
+            level += 1
+        return self._put_node(level, ids)
+
+    def get_list(self, version):
+        """按版本哈希取回快捷键列表"""
+        shortcut_list = []
+        self._collect(self._get(version), shortcut_list)
+        return shortcut_list
+
+    def _collect(self, node, shortcut_list):
+        for digest in node["ids"]:
+            if node["level"]:
+                self._collect(self._get(digest), shortcut_list)
+            else:
+                shortcut_list.extend(ShortcutRecord(oper, key) for oper, key in self._get(digest))
+
+    # ===================== 操作日志 =====================
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.log_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"读取历史记录失败: {e}")
+            return
+        end = 0
+        while True:
+            newline = data.find(b"\n", end)
+            if newline < 0:
+                break
+            try:
+                entry = json.loads(data[end:newline])
+            except ValueError:
+                break
+            end = newline + 1
+            self._apply(entry)
+        if end < len(data):
+            print(f"历史记录末尾有不完整的记录，已忽略: {self.log_path}")
+        self._log_end = end
+
+    def _apply(self, entry):
+        """按一条日志更新撤销栈、重做栈和当前版本"""
+        kind = entry.get("kind")
+        if kind == "edit":
+            self._undo.append(entry)
+            del self._undo[:-UNDO_LIMIT]
+            self._redo.clear()
+            self._set_head(entry["name"], entry.get("after"), entry.get("t"))
+        elif kind == "undo" and self._undo:
+            step = self._undo.pop()
+            self._redo.append(step)
+            self._set_head(step["name"], step.get("before"), entry.get("t"))
+        elif kind == "redo" and self._redo:
+            step = self._redo.pop()
+            self._undo.append(step)
+            self._set_head(step["name"], step.get("after"), entry.get("t"))
+        elif kind == "sync":
+            self._set_head(entry["name"], entry.get("after"), entry.get("t"))
+
+    def _set_head(self, name, version, timestamp):
+        previous = self._heads.get(name)
+        self._heads[name] = version
+        if version is None:
+            if previous is not None:
+                self._deleted[name] = (previous, timestamp)
+        else:
+            self._deleted.pop(name, None)
+
+    def _append(self, entry):
+        os.makedirs(self.root, exist_ok=True)
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.log_path, "r+b" if self._log_end else "wb") as f:
+            f.seek(self._log_end)
+            f.truncate()
+            f.write(line)
+            self._log_end = f.tell()
+        self._apply(entry)
+
+    # ===================== 记录版本 =====================
+    def record(self, name, shortcut_list, baseline=None, kind="edit"):
+        """记录一次保存（shortcut_list为None表示删除，也可以是返回列表的函数，用到时才调用）；
+        baseline 为修改前的数据（None表示原来不存在），只在还没有该软件的版本时作为基准。
+        kind为sync时只跟进已有版本的软件。内容没有变化时不记录，返回是否记录"""
+        with self._lock:
+            self._ensure_loaded()
+            if kind == "sync" and name not in self._heads:
+                return False
+            if callable(shortcut_list):
+                shortcut_list = shortcut_list()
+            after = self.put_list(shortcut_list) if shortcut_list is not None else None
+            if name in self._heads:
+                before = self._heads[name]
+            else:
+                before = self.put_list(baseline) if baseline is not None else None
+            if before == after:
+                return False
+            self._append({"t": int(time.time()), "kind": kind, "name": name, "before": before, "after": after})
+            return True
+
+    def record_later(self, name, shortcut_list, baseline=None, kind="edit"):
+        """在后台线程记录（大列表切块、计算哈希要上百毫秒），按调用顺序依次执行"""
+        if self._executor is None:
+            # 只有保存时才用到，命令行查询不必加载
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ShortcutHistory")
+        self._pending = self._executor.submit(self._record_logged, name, shortcut_list, baseline, kind)
+
+    def _record_logged(self, name, shortcut_list, baseline, kind):
+        try:
+            self.record(name, shortcut_list, baseline, kind)
+        except Exception as e:
+            print(f"记录历史版本失败: {name} {e}")
+
+    def flush(self):
+        """等待后台记录全部完成；撤销、查询之前都先调用，保证看到的是最新的历史"""
+        pending = self._pending
+        if pending is not None:
+            pending.result()
+
+    def close(self):
+        """等待后台记录全部完成并结束记录线程，切换数据目录时调用；之后再 record_later 会重新创建线程"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self._pending = None
+
+    # ===================== 撤销/重做/恢复 =====================
+    def peek_undo(self):
+        """下一步撤销涉及的软件名，没有可撤销的修改时返回None"""
+        self.flush()
+        with self._lock:
+            self._ensure_loaded()
+            return self._undo[-1]["name"] if self._undo else None
+
+    def peek_redo(self):
+        self.flush()
+        with self._lock:
+            self._ensure_loaded()
+            return self._redo[-1]["name"] if self._redo else None
+
+    def undo(self):
+        """撤销最近一次修改，返回 (软件名, 应恢复成的快捷键列表或None表示删除)，没有可撤销的修改时返回None"""
+        return self._step("undo", self._undo, "before")
+
+    def redo(self):
+        return self._step("redo", self._redo, "after")
+
+    def _step(self, kind, stack, field):
+        self.flush()
+        with self._lock:
+            self._ensure_loaded()
+            if not stack:
+                return None
+            step = stack[-1]
+            name = step["name"]
+            # 这一步执行前应处的版本：撤销从 after 出发，重做从 before 出发
+            current = step.get("before" if field == "after" else "after")
+            head = self._heads.get(name)
+            if head != current:
+                # 之后有外部改动（sync）：先记成一次普通修改（会清空重做栈），撤销的就是这次外部改动
+                self._append({"t": int(time.time()), "kind": "edit", "name": name, "before": current, "after": head})
+                if kind == "redo":
+                    return None
+                step = stack[-1]
+            version = step.get(field)
+            # 先取出数据再写日志：对象缺失时不改变撤销栈
+            shortcut_list = self.get_list(version) if version is not None else None
+            self._append({"t": int(time.time()), "kind": kind, "name": name})
+            return name, shortcut_list
+
+    def deleted_names(self):
+        """已删除且可以恢复的软件，最近删除的在前"""
+        self.flush()
+        with self._lock:
+            self._ensure_loaded()
+            names = sorted(self._deleted, key=lambda name: self._deleted[name][1] or 0, reverse=True)
+            return names[:DELETED_SHOW_LIMIT]
+
+    def deleted_version(self, name):
+        """已删除软件删除前的快捷键列表，不存在时返回None"""
+        self.flush()
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._deleted.get(name)
+            return self.get_list(entry[0]) if entry is not None else None
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import socket
+import getpass
+import hashlib
+import tempfile
+import threading
+
+# ===================== 单实例通信【本地套接字 + 一行一条JSON】 =====================
+# 界面程序启动后在本地套接字上监听（Windows为命名管道，其他系统为临时目录下的套接字文件），名称由用户名和数据目录决定，
+# 同一数据目录同时只运行一个界面程序。客户端（重复启动的 main.py、cli.py）只用到本模块，不加载PyQt。
+# 请求：{"cmd": 命令, "args": {参数}}，一行一条，UTF-8；响应：{"result": 结果, "text": 文本} 或 {"error": 错误信息}。
+# 命令：ping、activate（重复启动，显示悬浮窗）、show、hide，以及命令行的 list、get、query、groups、reindex（重新加载全部数据）。
+
+# 等待正在运行的程序回复的最长时间（秒）；request 超时返回None，ping 超时返回None（程序正忙，不当作没有运行）
+IPC_TIMEOUT = 10
+# 单次读取的字节数
+IPC_READ_SIZE = 65536
+
+
+def server_name(data_dir):
+    """本地服务名称：Windows返回管道名（Qt自动加 \\\\.\\pipe\\ 前缀），其他系统返回套接字文件的绝对路径"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = ""
+    key = f"{user}\x00{os.path.normcase(os.path.abspath(data_dir))}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    if sys.platform.startswith("win"):
+        return f"ShortcutKeyHelper-{digest}"
+    return os.path.join(tempfile.gettempdir(), f"ShortcutKeyHelper-{digest}.sock")
+
+
+def encode_message(message):
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _read_line(read):
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = read(IPC_READ_SIZE)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _pipe_exchange(path, data, timeout):
+    """Windows命名管道的一次请求/响应。管道读写不能设超时，放到守护线程里执行，主线程最多等timeout秒；
+    超时时抛出TimeoutError，留下的线程不会阻止进程退出"""
+    result = []
+
+    def exchange():
+        try:
+            with open(path, "r+b", buffering=0) as pipe:
+                pipe.write(data)
+                result.append(_read_line(pipe.read))
+        except OSError as e:
+            result.append(e)
+
+    worker = threading.Thread(target=exchange, name="ShortcutKeyHelperIpc", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if not result:
+        raise TimeoutError(f"等待 {path} 回复超时")
+    if isinstance(result[0], OSError):
+        raise result[0]
+    return result[0]
+
+
+def _exchange(name, data, timeout):
+    """一次请求/响应，返回响应的一行。连接不上时抛出 FileNotFoundError/ConnectionRefusedError，
+    连上后没有及时回复时抛出 TimeoutError 等其他 OSError"""
+    if sys.platform.startswith("win"):
+        # 管道不存在时立即失败；正在运行的程序卡住时最多等timeout秒
+        return _pipe_exchange(r"\\.\pipe" + "\\" + name, data, timeout)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(name)
+        sock.sendall(data)
+        return _read_line(sock.recv)
+
+
+def ping(name, timeout=IPC_TIMEOUT):
+    """检查是否有程序在运行：回复了返回True；连接不上（没有程序在监听，可能只剩上次异常退出留下的套接字文件）返回False；
+    连上了但没有及时回复（程序正忙或卡住）返回None"""
+    try:
+        line = _exchange(name, encode_message({"cmd": "ping", "args": {}}), timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    except OSError:
+        return None
+    return True if line else None
+
+
+def request(name, cmd, args=None, timeout=IPC_TIMEOUT):
+    """向正在运行的程序发送一条请求并等待响应；没有程序在运行、连接失败或超时返回None"""
+    data = encode_message({"cmd": cmd, "args": args or {}})
+    try:
+        response = json.loads(_exchange(name, data, timeout))
+    except (OSError, ValueError):
+        return None
+    return response if isinstance(response, dict) else None
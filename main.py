@@ -1,132 +1,433 @@
 import sys
+import time
+# 启动计时起点，尽量靠前，--startup-profile 以此为0点
+STARTUP_T0 = time.perf_counter()
+# 带子命令（query/get/list/groups/import/export/reindex）时是命令行模式：在导入PyQt之前分派，不创建界面
+if __name__ == "__main__" and len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+    from cli import main_entry
+    sys.exit(main_entry(sys.argv[1:]))
+# 同一数据目录已有程序在运行：让它显示悬浮窗后直接退出，不加载PyQt、不打开第二个窗口（--startup-profile 除外）
+if __name__ == "__main__" and "--startup-profile" not in sys.argv:
+    import ipc
+    from data_manager import DataManager
+    if ipc.request(ipc.server_name(DataManager.data_dir()), "activate", {"argv": sys.argv[1:]}) is not None:
+        sys.exit(0)
+import gc
 import json
 import os
-import ctypes
+import argparse
+from collections import namedtuple
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QDialog, QPushButton, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QListWidget, QMessageBox, QScrollArea, QMenu, QSystemTrayIcon, QListWidgetItem
+    QLabel, QLineEdit, QListWidget, QMessageBox, QMenu, QSystemTrayIcon, QListWidgetItem,
+    QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QFileDialog, QProgressDialog, QProgressBar,
+    QComboBox, QInputDialog
 )
-from PyQt6.QtCore import Qt, QPoint, QSize, QEvent
-from PyQt6.QtGui import QFont, QAction, QIcon, QPixmap, QCursor
+from PyQt6.QtCore import (
+    Qt, QPointF, QSize, QTimer, QRectF, QObject, pyqtSignal, QElapsedTimer,
+    QAbstractListModel, QModelIndex, QFileSystemWatcher, QRunnable, QThreadPool
+)
+from PyQt6.QtGui import QFont, QAction, QActionGroup, QIcon, QPixmap, QPainter, QFontMetrics, QStaticText
+from PyQt6.QtNetwork import QLocalServer
+
+import cli
+import ipc
+from data_manager import DataManager, BASE_DIR, DETAIL_CHUNK
+from chords import format_sequence
+from groups import UNGROUPED, UNGROUPED_LABEL, parse_tags
+from drag import DragResizeController
+from tracing import TRACER, span, traced
+from theme import THEME, THEMES, SIZES, COLLAPSED_SIZE, RoundedSurface
 
 # ===================== 全局配置 & 工具类 =====================
-# 修复打包后路径问题
-if getattr(sys, 'frozen', False):
-    # 运行在打包后的环境中
-    if sys.platform.startswith('win'):
-        # Windows系统获取实际执行路径
-        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-        buf = ctypes.create_unicode_buffer(1024)
-        kernel32.GetModuleFileNameW(None, buf, 1024)
-        BASE_DIR = os.path.dirname(buf.value)
-    else:
-        # 其他系统
-        BASE_DIR = os.path.dirname(os.path.abspath(sys.executable))
-else:
-    # 正常开发环境
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-DATA_DIR = os.path.join(BASE_DIR, "data")
-# 确保data目录存在
-if not os.path.exists(DATA_DIR):
-    try:
-        os.makedirs(DATA_DIR)
-    except Exception as e:
-        print(f"创建data目录失败: {e}")
-
-# 固定尺寸：宽100px，高200px，添加软件文字完全显示
-FLOAT_WIN_WIDTH = 100
-FLOAT_WIN_HEIGHT = 200
+# 性能追踪：设置SHORTCUT_HELPER_TRACE=1或加 --trace 启动参数开启，追踪文件写到程序目录下的trace文件夹
+TRACE_ENABLED = os.environ.get("SHORTCUT_HELPER_TRACE", "0") == "1"
+TRACE_DIR = os.path.join(BASE_DIR, "trace")
+# 界面事件循环被阻塞超过多少毫秒记为一次卡顿
+TRACE_STALL_MS = int(os.environ.get("SHORTCUT_HELPER_STALL_MS", "200"))
+# 主题、悬浮窗尺寸等界面设置
+SETTINGS_PATH = os.path.join(BASE_DIR, "settings.json")
+# 搜索时最多显示的快捷键命中条数
+SEARCH_HIT_LIMIT = 50
+# 保存前的快捷键冲突提示里最多列出几条
+CONFLICT_SHOW_LIMIT = 8
+# 启动时后台加载软件库：攒够多少条快捷键、或距上一批过了多少毫秒，就交给界面一批
+LIBRARY_BATCH_ROWS = 2000
+LIBRARY_BATCH_MS = 100
 
 # 字体配置 - Windows中文完美适配
 FONT_NORMAL = QFont("微软雅黑", 9)
 FONT_SMALL = QFont("微软雅黑", 8)
 FONT_TITLE = QFont("微软雅黑", 10, QFont.Weight.Bold)
 
-# ===================== 数据持久化工具类【单软件单文件，JSON格式】 =====================
-class DataManager:
-    @staticmethod
-    def save_software(soft_name, shortcut_list):
-        if not soft_name.strip():
-            return False
-        # 过滤Windows文件名非法字符
-        invalid_chars = r'\/:*?"<>|'
-        for char in invalid_chars:
-            soft_name = soft_name.replace(char, '_')
-        file_name = f"{soft_name.strip()}.json"
-        file_path = os.path.join(DATA_DIR, file_name)
-        
-        save_data = {
-            "software_name": soft_name.strip(),
-            "shortcut_list": shortcut_list
-        }
+# ===================== 数据层信号【写入线程 -> 界面线程】 =====================
+class DataSignals(QObject):
+    """后台写入结果通知，信号跨线程自动排队到界面线程"""
+    save_failed = pyqtSignal(str, str)  # 软件名, 错误信息
+
+DATA_SIGNALS = None
+
+def data_signals():
+    """首次调用须在界面线程：写入线程只负责emit，回退索引、提示用户都在界面线程执行"""
+    global DATA_SIGNALS
+    if DATA_SIGNALS is None:
+        DATA_SIGNALS = DataSignals()
+        DATA_SIGNALS.save_failed.connect(DataManager.resync_index)
+        DataManager.on_write_error = DATA_SIGNALS.save_failed.emit
+    return DATA_SIGNALS
+
+# ===================== 数据目录监听【外部改动增量刷新】 =====================
+class LibraryWatcher(QObject):
+    """监听数据目录，把一段时间内的连续改动合并成一次增量刷新"""
+    library_changed = pyqtSignal(list, list, list)  # 新增, 修改, 删除的软件名
+    groups_changed = pyqtSignal()  # 分组文件被外部改动
+
+    DEBOUNCE_MS = 300  # 最后一次改动后等待多久再刷新
+    MAX_DELAY_MS = 2000  # 持续有改动时最多延迟多久必须刷新一次
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_poll)
+        self.watcher.fileChanged.connect(self.schedule_poll)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.poll)
+        self.first_event = QElapsedTimer()
+
+    def start(self):
+        """建立基准并开始监听"""
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            os.makedirs(DataManager.data_dir(), exist_ok=True)
+        except OSError as e:
+            print(f"创建data目录失败: {e}")
+        DataManager.poll_changes()
+        self.sync_watch_paths()
+
+    def sync_watch_paths(self):
+        """补上新文件的监听（原子替换写入的文件会被系统移出监听列表）"""
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        paths = [path for path in DataManager.repository().backend.watch_paths() if path not in watched]
+        if paths:
+            self.watcher.addPaths(paths)
+
+    def schedule_poll(self, path=None):
+        if not self.timer.isActive():
+            self.first_event.start()
+        elif self.first_event.elapsed() >= self.MAX_DELAY_MS:
+            return
+        self.timer.start(self.DEBOUNCE_MS)
+
+    def poll(self):
+        added, changed, removed = DataManager.poll_changes()
+        self.sync_watch_paths()
+        if added or changed or removed:
+            self.library_changed.emit(added, changed, removed)
+        if DataManager.poll_groups():
+            self.groups_changed.emit()
+
+# ===================== 单实例服务【重复启动转发到本进程，命令行查询直接用已加载的数据】 =====================
+class InstanceServer(QObject):
+    """在本地套接字上接收请求（协议见 ipc.py），在界面线程中执行，查询走内存缓存和已建好的索引"""
+    # 可以交给正在运行的程序执行的命令行子命令
+    CLI_COMMANDS = {
+        "list": cli.cmd_list,
+        "get": cli.cmd_get,
+        "query": cli.cmd_query,
+        "groups": cli.cmd_groups,
+        "reindex": cli.cmd_reindex,
+    }
+
+    def __init__(self, main_win):
+        super().__init__(main_win)
+        self.main_win = main_win
+        self.name = ipc.server_name(DataManager.data_dir())
+        self.server = QLocalServer(self)
+        # 只允许当前用户连接
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.connections = set()
+        self.server.newConnection.connect(self.accept)
+
+    def listen(self):
+        """开始监听；已有其他实例在运行时把启动参数转给它并返回False"""
+        # 先问一次再监听：Unix上 QLocalServer.listen 会直接替换已有的套接字文件，不能用它判断有没有实例在运行
+        alive = ipc.ping(self.name)
+        if alive:
+            ipc.request(self.name, "activate", {"argv": sys.argv[1:]})
+            return False
+        if alive is None:
+            # 连上了但没有回复：另一个实例正忙，不能当作残留文件删掉，否则两个实例会同时写同一个数据目录
+            QMessageBox.warning(None, "提示", "ShortcutKeyHelper 已在运行但暂时没有响应，请稍后再试。")
+            return False
+        # 连接被拒绝或不存在：没有实例在运行，清理上次异常退出可能留下的套接字文件
+        QLocalServer.removeServer(self.name)
+        if self.server.listen(self.name):
             return True
+        print(f"单实例服务启动失败: {self.server.errorString()}")
+        return True
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            conn = self.server.nextPendingConnection()
+            # 在Python里持有连接：只靠槽函数引用的连接会被垃圾回收，收不到后续的 readyRead
+            self.connections.add(conn)
+            conn.readyRead.connect(lambda conn=conn: self.read_requests(conn))
+            conn.disconnected.connect(lambda conn=conn: self.drop_connection(conn))
+
+    def drop_connection(self, conn):
+        self.connections.discard(conn)
+        conn.deleteLater()
+
+    def read_requests(self, conn):
+        while conn.canReadLine():
+            response = self.handle(bytes(conn.readLine()))
+            conn.write(ipc.encode_message(response))
+            conn.flush()
+
+    @traced
+    def handle(self, line):
+        try:
+            message = json.loads(line)
+            cmd = message["cmd"]
+            args = message.get("args") or {}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"error": "无效的请求"}
+        if cmd == "ping":
+            return {"result": {"pid": os.getpid()}}
+        if cmd in ("activate", "show"):
+            self.main_win.show()
+            self.main_win.raise_()
+            self.main_win.activateWindow()
+            return {"result": True}
+        if cmd == "hide":
+            self.main_win.hide()
+            return {"result": True}
+        handler = self.CLI_COMMANDS.get(cmd)
+        if handler is None:
+            return {"error": f"未知命令：{cmd}"}
+        try:
+            result, text = handler(argparse.Namespace(**args))
+        except (cli.CommandError, OSError, ValueError, TypeError, AttributeError) as e:
+            return {"error": str(e)}
+        if cmd == "reindex":
+            self.main_win.reload_library()
+        return {"result": result, "text": text}
+
+# ===================== 导入/导出【后台线程 + 进度条 + 可取消】 =====================
+class TransferSignals(QObject):
+    progress = pyqtSignal(int)  # 百分比
+    batch_ready = pyqtSignal(object)  # 导入的一批 {软件名: [快捷键]}
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    done = pyqtSignal()  # 最后发出，见 start_task
+
+class TransferTask(QRunnable):
+    """在线程池里流式导入/导出；导入的每一批交回界面线程写入，保证索引和缓存只在界面线程修改"""
+    def __init__(self, mode, path):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.mode = mode  # "export" 或 "import"
+        self.path = path
+        self.signals = TransferSignals()
+        self.is_cancelled = False
+        # 导入时实际新增的条数，由界面线程在 write_batch 中累加
+        self.imported = 0
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def write_batch(self, grouped):
+        """在界面线程执行（batch_ready 以阻塞式排队连接到这里）：写入一批，累加实际新增的条数"""
+        self.imported += DataManager.import_batch(grouped)
+
+    def emit_batch(self, grouped):
+        """后台线程交出一批并等界面线程写完，返回这一批实际新增的条数"""
+        before = self.imported
+        self.signals.batch_ready.emit(grouped)
+        return self.imported - before
+
+    def report_progress(self, done, total):
+        self.signals.progress.emit(int(done * 100 / total) if total else 100)
+
+    def run(self):
+        # 导入导出用得少，用到时才加载
+        from transfer import export_library, import_library, TransferCancelled
+        try:
+            if self.mode == "export":
+                names = DataManager.get_all_software()
+                count = export_library(self.path, names, DataManager.get_software_detail,
+                                       self.report_progress, lambda: self.is_cancelled)
+                message = f"已导出 {len(names)} 个软件，共 {count} 条快捷键"
+            else:
+                imported, skipped, bad_lines = import_library(self.path, self.emit_batch,
+                                                              progress=self.report_progress,
+                                                              is_cancelled=lambda: self.is_cancelled)
+                message = f"已导入 {imported} 条快捷键"
+                if skipped:
+                    message += f"，跳过 {skipped} 条无效记录（行号：{', '.join(map(str, bad_lines))}…）"
+                # 批量导入后更新快照（在本线程等待写入完成）
+                DataManager.save_snapshot()
+            self.signals.finished.emit(message)
+        except TransferCancelled:
+            self.signals.cancelled.emit()
         except Exception as e:
-            print(f"保存数据失败: {e}")
-            return False
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit()
+
+# ===================== 快捷键详情后台加载【分块交给界面，可取消】 =====================
+class DetailLoadSignals(QObject):
+    chunk = pyqtSignal(object, float)  # 一批快捷键, 进度0~1
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+    done = pyqtSignal()
+
+class DetailLoadTask(QRunnable):
+    """在线程池里流式解析大的快捷键文件，每解析完一块就交给界面线程追加显示"""
+    def __init__(self, soft_name):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.soft_name = soft_name
+        self.signals = DetailLoadSignals()
+        self.is_cancelled = False
 
-    @staticmethod
-    def get_all_software():
-        soft_list = []
-        if os.path.exists(DATA_DIR):
-            for file in os.listdir(DATA_DIR):
-                if file.endswith(".json"):
-                    soft_list.append(os.path.splitext(file)[0])
-        return soft_list
+    def cancel(self):
+        self.is_cancelled = True
 
-    @staticmethod
-    def get_software_detail(soft_name):
-        invalid_chars = r'\/:*?"<>|'
-        for char in invalid_chars:
-            soft_name = soft_name.replace(char, '_')
-        file_name = f"{soft_name.strip()}.json"
-        file_path = os.path.join(DATA_DIR, file_name)
-        if not os.path.exists(file_path):
-            return []
+    def run(self):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get("shortcut_list", [])
-        except:
-            return []
+            for chunk, progress in DataManager.iter_software_detail(self.soft_name):
+                # 停止迭代后解析器关闭文件，读了一半的数据不会进入缓存
+                if self.is_cancelled:
+                    return
+                self.signals.chunk.emit(chunk, progress)
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit()
+
+# ===================== 启动时后台加载软件库【分批交给界面，边加载边可搜索】 =====================
+class LibraryLoadSignals(QObject):
+    batch = pyqtSignal(object)  # 一批 [(软件名, 快捷键列表)]
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+    done = pyqtSignal()
+
+class LibraryLoadTask(QRunnable):
+    """在线程池里扫描数据目录、读取每个软件（解析JSON或从快照解码），分批交给界面线程；
+    列表和搜索索引只在界面线程更新，同步盘上读得再慢也不卡界面。
+    搜索索引要包含全部软件，折叠分组里的软件也要读，priority 只决定先后（展开的分组先读、先显示）"""
+    def __init__(self, priority=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.priority = priority
+        self.signals = LibraryLoadSignals()
+        self.is_cancelled = False
 
-    @staticmethod
-    def delete_software(soft_name):
-        """删除软件及对应本地JSON文件"""
-        invalid_chars = r'\/:*?"<>|'
-        for char in invalid_chars:
-            soft_name = soft_name.replace(char, '_')
-        file_name = f"{soft_name.strip()}.json"
-        file_path = os.path.join(DATA_DIR, file_name)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                return True
-            except:
-                return False
-        return False
+    def cancel(self):
+        self.is_cancelled = True
+
+    def run(self):
+        try:
+            batch, rows = [], 0
+            last_emit = time.perf_counter()
+            for name, shortcut_list in DataManager.repository().iter_all(self.priority):
+                if self.is_cancelled:
+                    return
+                batch.append((name, shortcut_list))
+                rows += len(shortcut_list)
+                now = time.perf_counter()
+                if rows >= LIBRARY_BATCH_ROWS or (now - last_emit) * 1000 >= LIBRARY_BATCH_MS:
+                    self.signals.batch.emit(batch)
+                    batch, rows, last_emit = [], 0, now
+            if batch:
+                self.signals.batch.emit(batch)
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit()
+
+# 已启动、还没发出 done 的后台任务。任务被取消后界面不再引用它，但排队中的信号还没送达，
+# 这时信号对象若被垃圾回收，送达时程序会崩溃；所以由这里持有任务，直到最后一个信号 done 送达
+RUNNING_TASKS = set()
+
+def start_task(task):
+    RUNNING_TASKS.add(task)
+    task.signals.done.connect(lambda: RUNNING_TASKS.discard(task))
+    QThreadPool.globalInstance().start(task)
+
+def stop_tasks():
+    """退出前取消所有后台任务并等它们结束，免得工作线程在界面对象销毁后还发信号"""
+    for task in list(RUNNING_TASKS):
+        task.cancel()
+    # 导入任务可能正阻塞在 batch_ready 上等界面线程写入这一批，不能干等，边等边处理排队的事件
+    pool = QThreadPool.globalInstance()
+    while not pool.waitForDone(50):
+        QApplication.sendPostedEvents()
+    # 送达剩下的排队信号（包括 done），趁应用对象还在回收已结束的任务，不留到解释器退出时
+    QApplication.sendPostedEvents()
+    gc.collect()
+
+def exec_dialog(dialog):
+    """模态显示弹窗；开启追踪时记录弹窗从打开到关闭的耗时"""
+    with span(f"{type(dialog).__name__}.exec"):
+        return dialog.exec()
+
+# ===================== 弹窗复用池【每种弹窗只创建一次，打开时重新绑定软件】 =====================
+class DialogPool:
+    """每种弹窗只保留一个实例：首次使用时创建，之后通过 bind() 换成新选中的软件并清空上次的状态"""
+    def __init__(self):
+        self._dialogs = {}
+
+    def acquire(self, cls, parent, *args):
+        """取出cls类型的弹窗并绑定参数，args与弹窗构造函数（不含parent）及 bind() 的参数一致"""
+        dialog = self._dialogs.get(cls)
+        if dialog is not None and dialog.isVisible():
+            # 同类型弹窗正在显示（嵌套打开），临时创建一个，关闭后自动释放
+            dialog = cls(*args, parent=parent)
+            dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            return dialog
+        if dialog is None:
+            dialog = cls(*args, parent=parent)
+            self._dialogs[cls] = dialog
+            return dialog
+        if dialog.parentWidget() is not parent:
+            # 换父窗口时保留原来的窗口标志（置顶、无边框等）
+            dialog.setParent(parent, dialog.windowFlags())
+        dialog.bind(*args)
+        return dialog
 
 # ===================== 弹窗窗口-添加/编辑软件快捷键【支持删除原有行】 =====================
 class AddEditShortcutWindow(QDialog):
+    @traced
     def __init__(self, soft_name=None, shortcut_list=None, parent=None):
         super().__init__(parent)
+        self.init_ui()
+        self.bind(soft_name, shortcut_list)
+
+    @traced
+    def bind(self, soft_name=None, shortcut_list=None):
+        """切换到添加模式（soft_name为None）或编辑某个软件，清空上次留下的输入和编辑状态"""
         self.result = None
-        self.shortcut_temp = shortcut_list if shortcut_list else []
+        self.shortcut_temp = list(shortcut_list) if shortcut_list else []
         self.edit_soft_name = soft_name
-        self.init_ui()
+        self.setWindowTitle("编辑软件快捷键" if soft_name else "添加软件 & 快捷键")
+        self.save_btn.setText("✅ 确认修改并保存" if soft_name else "✅ 确认添加该软件")
         # 编辑模式：回显数据
-        if soft_name and self.shortcut_temp:
-            self.soft_name_edit.setText(soft_name)
-            self.soft_name_edit.setReadOnly(True)
-            for item in self.shortcut_temp:
-                self.shortcut_list.addItem(f"{item['操作']} → {item['快捷键']}")
+        is_edit = bool(soft_name and self.shortcut_temp)
+        self.soft_name_edit.setText(soft_name if is_edit else "")
+        self.soft_name_edit.setReadOnly(is_edit)
+        self.oper_edit.clear()
+        self.key_edit.clear()
+        self.shortcut_list.clear()
+        self.shortcut_list.addItems([f"{item['操作']} → {item['快捷键']}" for item in self.shortcut_temp])
+        self.editing_index = -1
+        self.update_btn.setEnabled(False)
 
     def init_ui(self):
-        win_title = "编辑软件快捷键" if self.edit_soft_name else "添加软件 & 快捷键"
-        self.setWindowTitle(win_title)
         self.setFixedSize(420, 400)
         self.setWindowModality(Qt.WindowModality.ApplicationModal)
         self.setFont(FONT_NORMAL)
@@ -141,8 +442,8 @@ class AddEditShortcutWindow(QDialog):
         layout.addWidget(self.soft_name_edit)
 
         layout.addWidget(QLabel("📌 操作 & 快捷键（可添加/删除/编辑多条）", font=FONT_TITLE))
-        layout.addWidget(QLabel("格式示例：复制 → Ctrl+C", font=FONT_SMALL, styleSheet="color:#666666;"))
-        layout.addWidget(QLabel("双击列表项可编辑", font=FONT_SMALL, styleSheet="color:#666666;"))
+        layout.addWidget(QLabel("格式示例：复制 → Ctrl+C", font=FONT_SMALL, objectName="hintLabel"))
+        layout.addWidget(QLabel("双击列表项可编辑", font=FONT_SMALL, objectName="hintLabel"))
         
         self.oper_edit = QLineEdit()
         self.oper_edit.setPlaceholderText("输入操作（例：全选）")
@@ -159,13 +460,13 @@ class AddEditShortcutWindow(QDialog):
         btn_layout.addWidget(add_btn)
 
         self.update_btn = QPushButton("🔄 更新该行快捷键")
-        self.update_btn.setStyleSheet("background:#F59E0B;color:white;")
+        self.update_btn.setObjectName("updateRowBtn")
         self.update_btn.clicked.connect(self.update_one_shortcut)
         self.update_btn.setEnabled(False)
         btn_layout.addWidget(self.update_btn)
 
         del_btn = QPushButton("🗑️ 删除选中行")
-        del_btn.setStyleSheet("background:#EF4444;color:white;")
+        del_btn.setObjectName("deleteRowBtn")
         del_btn.clicked.connect(self.del_one_shortcut)
         btn_layout.addWidget(del_btn)
         layout.addLayout(btn_layout)
@@ -174,11 +475,10 @@ class AddEditShortcutWindow(QDialog):
         self.shortcut_list.itemDoubleClicked.connect(self.edit_one_shortcut)
         layout.addWidget(self.shortcut_list)
 
-        btn_text = "✅ 确认修改并保存" if self.edit_soft_name else "✅ 确认添加该软件"
-        save_btn = QPushButton(btn_text)
-        save_btn.setStyleSheet("background:#27AE60;color:white;border-radius:6px;padding:6px;")
-        save_btn.clicked.connect(self.save_all)
-        layout.addWidget(save_btn)
+        self.save_btn = QPushButton()
+        self.save_btn.setObjectName("saveAllBtn")
+        self.save_btn.clicked.connect(self.save_all)
+        layout.addWidget(self.save_btn)
 
         # 记录当前编辑的行索引
         self.editing_index = -1
@@ -261,6 +561,8 @@ class AddEditShortcutWindow(QDialog):
         if not self.shortcut_temp:
             QMessageBox.warning(self, "提示", "请至少保留一条快捷键！")
             return
+        if not self.confirm_conflicts(soft_name):
+            return
         
         self.result = (soft_name, self.shortcut_temp)
         success = DataManager.save_software(soft_name, self.shortcut_temp)
@@ -271,54 +573,84 @@ class AddEditShortcutWindow(QDialog):
         else:
             QMessageBox.warning(self, "保存失败", "无法保存快捷键数据，请检查权限或目录是否存在！")
 
+    def confirm_conflicts(self, soft_name):
+        """写入前提示快捷键冲突：同一组合绑定了不同操作、新加的组合其他软件也在用；没有冲突或用户确认后返回True"""
+        duplicates, shared = DataManager.find_chord_conflicts(soft_name, self.shortcut_temp)
+        if not duplicates and not shared:
+            return True
+        lines = []
+        for code, opers in duplicates:
+            lines.append(f"⚠ {format_sequence(code)} 同时绑定了：{'、'.join(opers)}")
+        for code, oper, others in shared:
+            used_by = "、".join(f"{other}({other_oper})" for other, other_oper in others[:3])
+            if len(others) > 3:
+                used_by += f" 等{len(others)}处"
+            lines.append(f"ℹ {format_sequence(code)}（{oper}）也用于：{used_by}")
+        if len(lines) > CONFLICT_SHOW_LIMIT:
+            lines = lines[:CONFLICT_SHOW_LIMIT] + [f"……共 {len(lines)} 处冲突"]
+        confirm = QMessageBox.question(self, "快捷键冲突", "\n".join(lines) + "\n\n仍然保存吗？",
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return confirm == QMessageBox.StandardButton.Yes
+
 # ===================== 弹窗窗口-软件操作选择【编辑/查看/删除】 =====================
-class SoftwareOptionWindow(QDialog):
+class SoftwareOptionWindow(RoundedSurface, QDialog):
+    @traced
     def __init__(self, soft_name, parent=None):
         super().__init__(parent)
-        self.soft_name = soft_name
         self.parent_win = parent
-        self.opt_result = None
         self.init_ui()
+        self.bind(soft_name)
+
+    @traced
+    def bind(self, soft_name):
+        self.soft_name = soft_name
+        self.opt_result = None
+        self.title_label.setText(f"📌 {soft_name}")
+        # 与悬浮窗同样大小，尺寸设置可能在两次打开之间改变
+        self.setFixedSize(*THEME.window_size())
+        self.move(self.parent_win.pos())
 
     def init_ui(self):
-        self.setFixedSize(FLOAT_WIN_WIDTH, FLOAT_WIN_HEIGHT)
+        self.setObjectName("optionWindow")
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint |
             Qt.WindowType.WindowStaysOnTopHint |
             Qt.WindowType.Tool
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setStyleSheet("background:#1E293B;border-radius:10px;")
 
         layout = QVBoxLayout(self)
-        layout.setSpacing(10)
-        layout.setContentsMargins(8,20,8,20)
+        layout.setSpacing(6)
+        layout.setContentsMargins(8,12,8,12)
 
-        title_label = QLabel(f"📌 {self.soft_name}", font=FONT_TITLE)
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("color:white;margin-bottom:10px;")
-        layout.addWidget(title_label)
+        self.title_label = QLabel(font=FONT_TITLE, objectName="surfaceTitle")
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.title_label)
 
         view_btn = QPushButton("查看快捷键", font=FONT_NORMAL)
-        view_btn.setStyleSheet("background:#0EA5E9;color:white;border-radius:6px;padding:6px;")
+        view_btn.setObjectName("viewBtn")
         view_btn.clicked.connect(lambda : self.set_result("view"))
         layout.addWidget(view_btn)
 
         edit_btn = QPushButton("编辑快捷键", font=FONT_NORMAL)
-        edit_btn.setStyleSheet("background:#F59E0B;color:white;border-radius:6px;padding:6px;")
+        edit_btn.setObjectName("editBtn")
         edit_btn.clicked.connect(lambda : self.set_result("edit"))
         layout.addWidget(edit_btn)
 
+        group_btn = QPushButton("分组与标签", font=FONT_NORMAL)
+        group_btn.setObjectName("groupBtn")
+        group_btn.clicked.connect(lambda : self.set_result("group"))
+        layout.addWidget(group_btn)
+
         del_btn = QPushButton("删除该软件", font=FONT_NORMAL)
-        del_btn.setStyleSheet("background:#EF4444;color:white;border-radius:6px;padding:6px;")
+        del_btn.setObjectName("deleteSoftwareBtn")
         del_btn.clicked.connect(lambda : self.set_result("delete"))
         layout.addWidget(del_btn)
 
-        self.move(self.parent_win.pos())
-
     def set_result(self, opt):
         if opt == "delete":
-            confirm = QMessageBox.question(self, "确认删除", f"确定要删除【{self.soft_name}】及所有快捷键吗？",
+            confirm = QMessageBox.question(self, "确认删除", f"确定要删除【{self.soft_name}】及所有快捷键吗？\n"
+                                         "删除后可在托盘菜单「恢复已删除的软件」中找回。",
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             if confirm != QMessageBox.StandardButton.Yes:
                 return
@@ -330,81 +662,248 @@ class SoftwareOptionWindow(QDialog):
         self.opt_result = opt
         self.accept()
 
-# ===================== 弹窗窗口-快捷键详情展示 =====================
-class ShortcutDetailWindow(QDialog):
+# ===================== 弹窗窗口-分组与标签 =====================
+class GroupEditWindow(QDialog):
+    @traced
     def __init__(self, soft_name, parent=None):
         super().__init__(parent)
+        self.init_ui()
+        self.bind(soft_name)
+
+    @traced
+    def bind(self, soft_name):
+        """切换到另一个软件：回显它的分组和标签，下拉框列出当前全部分组"""
         self.soft_name = soft_name
+        groups = DataManager.groups()
+        self.setWindowTitle(f"分组与标签 - {soft_name}")
+        self.group_combo.clear()
+        self.group_combo.addItems([UNGROUPED_LABEL] + groups.group_names())
+        self.group_combo.setCurrentText(groups.group_of(soft_name) or UNGROUPED_LABEL)
+        self.tags_edit.setText(" ".join(groups.tags_of(soft_name)))
+
+    def init_ui(self):
+        self.setFixedSize(320, 240)
+        self.setWindowModality(Qt.WindowModality.ApplicationModal)
+        self.setFont(FONT_NORMAL)
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(20,20,20,20)
+
+        layout.addWidget(QLabel("📌 分组", font=FONT_TITLE))
+        # 可直接输入新名称，保存时自动创建分组
+        self.group_combo = QComboBox()
+        self.group_combo.setEditable(True)
+        self.group_combo.lineEdit().setPlaceholderText("选择或输入新分组（例：IDE、办公、设计）")
+        layout.addWidget(self.group_combo)
+
+        layout.addWidget(QLabel("📌 标签", font=FONT_TITLE))
+        self.tags_edit = QLineEdit()
+        self.tags_edit.setPlaceholderText("多个标签用空格或逗号分隔")
+        layout.addWidget(self.tags_edit)
+        layout.addWidget(QLabel("在搜索框输入 #标签 可按标签筛选", font=FONT_SMALL, objectName="hintLabel"))
+
+        save_btn = QPushButton("✅ 保存")
+        save_btn.setObjectName("saveAllBtn")
+        save_btn.clicked.connect(self.save)
+        layout.addWidget(save_btn)
+
+    def save(self):
+        group = self.group_combo.currentText().strip()
+        if group == UNGROUPED_LABEL:
+            group = UNGROUPED
+        if DataManager.groups().set_software(self.soft_name, group, parse_tags(self.tags_edit.text())):
+            self.accept()
+        else:
+            QMessageBox.warning(self, "保存失败", "无法保存分组数据，请检查权限或目录是否存在！")
+
+# ===================== 快捷键详情 Model/View【委托直接绘制，缓存文本排版】 =====================
+class ShortcutDetailModel(QAbstractListModel):
+    """快捷键详情数据模型，每行是 (操作, 快捷键)"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        oper, key = self.rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return f"{oper} → {key}"
+        return None
+
+    @staticmethod
+    def to_rows(shortcut_list):
+        return [(str(item.get("操作", "")), str(item.get("快捷键", ""))) for item in shortcut_list]
+
+    def append_rows(self, shortcut_list):
+        """分块加载时在末尾追加一批行"""
+        new_rows = self.to_rows(shortcut_list)
+        if not new_rows:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+        self.rows.extend(new_rows)
+        self.endInsertRows()
+
+    def set_rows(self, shortcut_list):
+        """按行应用变化：保留首尾相同的行，中间部分原地更新，多删少补"""
+        new_rows = self.to_rows(shortcut_list)
+        old_rows = self.rows
+        if new_rows == old_rows:
+            return
+        max_common = min(len(old_rows), len(new_rows))
+        prefix = 0
+        while prefix < max_common and old_rows[prefix] == new_rows[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < max_common - prefix and old_rows[-1 - suffix] == new_rows[-1 - suffix]:
+            suffix += 1
+        old_mid = len(old_rows) - prefix - suffix
+        new_mid = len(new_rows) - prefix - suffix
+        changed = min(old_mid, new_mid)
+        if changed:
+            old_rows[prefix:prefix + changed] = new_rows[prefix:prefix + changed]
+            self.dataChanged.emit(self.index(prefix), self.index(prefix + changed - 1))
+        start = prefix + changed
+        if old_mid > new_mid:
+            self.beginRemoveRows(QModelIndex(), start, prefix + old_mid - 1)
+            del old_rows[start:prefix + old_mid]
+            self.endRemoveRows()
+        elif new_mid > old_mid:
+            self.beginInsertRows(QModelIndex(), start, prefix + new_mid - 1)
+            old_rows[start:start] = new_rows[start:prefix + new_mid]
+            self.endInsertRows()
+
+class ShortcutItemDelegate(QStyledItemDelegate):
+    """绘制"操作 → 快捷键"行：圆角背景 + 缓存好的省略文本，替代每行一个QLabel"""
+    ROW_SPACING = 5
+    CACHE_LIMIT = 4096
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metrics = QFontMetrics(FONT_SMALL)
+        self.row_height = self.metrics.height() + 10
+        self.text_cache = {}  # 行文本 -> QStaticText
+        self.cache_width = -1
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.row_height + self.ROW_SPACING)
+
+    def static_text(self, text, width):
+        if width != self.cache_width or len(self.text_cache) > self.CACHE_LIMIT:
+            self.text_cache.clear()
+            self.cache_width = width
+        static = self.text_cache.get(text)
+        if static is None:
+            static = QStaticText(self.metrics.elidedText(text, Qt.TextElideMode.ElideRight, width))
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            static.prepare(font=FONT_SMALL)
+            self.text_cache[text] = static
+        return static
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect).adjusted(0, 0, 0, -self.ROW_SPACING)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(THEME.color("field"))
+        painter.drawRoundedRect(rect, 5, 5)
+
+        static = self.static_text(index.data(Qt.ItemDataRole.DisplayRole), int(rect.width()) - 16)
+        painter.setFont(FONT_SMALL)
+        painter.setPen(THEME.color("field_text"))
+        text_y = rect.top() + (rect.height() - static.size().height()) / 2
+        painter.drawStaticText(QPointF(rect.left() + 8, text_y), static)
+        painter.restore()
+
+# ===================== 弹窗窗口-快捷键详情展示 =====================
+class ShortcutDetailWindow(RoundedSurface, QDialog):
+    # 窗口宽度
+    WIN_WIDTH = 250
+
+    @traced
+    def __init__(self, soft_name, parent=None):
+        super().__init__(parent)
         self.parent_win = parent
-        self.is_pressing = False
-        self.last_pos = QPoint(0,0)
-        self.resizing = False  # 是否正在调整大小
-        self.edge_size = 20  # 边缘检测区域大小，增大以提高可点击性
+        self.load_task = None  # 正在后台分块加载的任务
         self.init_ui()
-        # 安装事件过滤器以处理鼠标事件
-        self.installEventFilter(self)
+        # 拖动空白处移动窗口，拖动上下边缘调整高度（边缘检测区域20像素，便于点中）
+        self.drag_controller = DragResizeController(self, edge_size=20)
+        self.bind(soft_name)
 
-    def init_ui(self):
+    @traced
+    def bind(self, soft_name):
+        """切换到另一个软件：重置拖动/调整大小状态，按新软件的快捷键数量重新计算高度"""
+        self.soft_name = soft_name
+        self.drag_controller.reset()
         # 获取屏幕高度并计算最大高度为屏幕高度的2/3
         screen_geo = QApplication.primaryScreen().geometry()
         self.max_height = int(screen_geo.height() * 2 / 3)
-        
-        # 获取快捷键列表
-        shortcut_list = DataManager.get_software_detail(self.soft_name)
-        
-        # 窗口宽度
-        width = 250
-        
-        # 初始高度
-        init_height = min(400, max(150, len(shortcut_list) * 40 + 100))
+
+        self.title_label.setText(f"📌 {soft_name}")
+        row_count = self.load_rows()
+        self.detail_view.scrollToTop()
+
+        # 初始高度；后台分块加载的都是大数据，直接取上限
+        init_height = 400 if row_count is None else min(400, max(150, row_count * 40 + 100))
         # 确保初始高度不超过最大高度
         init_height = min(init_height, self.max_height)
-        
-        self.setMinimumSize(width, 150)  # 设置最小尺寸
-        self.setMaximumSize(width, self.max_height)  # 设置最大尺寸为屏幕高度的2/3
-        self.resize(width, init_height)  # 设置初始尺寸
-        
+
+        self.setMaximumSize(self.WIN_WIDTH, self.max_height)  # 设置最大尺寸为屏幕高度的2/3
+        self.resize(self.WIN_WIDTH, init_height)  # 设置初始尺寸
+        self.move(self.parent_win.pos())
+
+    def init_ui(self):
+        self.setObjectName("detailWindow")
+        self.setMinimumSize(self.WIN_WIDTH, 150)  # 设置最小尺寸
+
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint |
             Qt.WindowType.WindowStaysOnTopHint |
             Qt.WindowType.Tool
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setStyleSheet("background:#1E293B;border-radius:10px;")
 
         layout = QVBoxLayout(self)
         layout.setSpacing(8)
         layout.setContentsMargins(10,10,10,10)
 
-        title_label = QLabel(f"📌 {self.soft_name}", font=FONT_TITLE)
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("color:white;margin-bottom:5px;")
-        layout.addWidget(title_label)
-
-        # 添加滚动区域，支持内容过多时滚动
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("border:none;")
-        layout.addWidget(scroll)
-
-        content_widget = QWidget()
-        content_layout = QVBoxLayout(content_widget)
-        content_layout.setSpacing(5)
-        content_layout.setContentsMargins(0,0,0,0)
-        scroll.setWidget(content_widget)
-
-        if not shortcut_list:
-            empty_label = QLabel("暂无快捷键数据", font=FONT_SMALL)
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_label.setStyleSheet("color:#94A3B8;")
-            content_layout.addWidget(empty_label)
-        else:
-            for item in shortcut_list:
-                # 列表式展示：操作和快捷键在同一行，更紧凑
-                key_label = QLabel(f"{item['操作']} → {item['快捷键']}", font=FONT_SMALL)
-                key_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-                key_label.setStyleSheet("color:white;background:#334155;border-radius:5px;padding:5px 8px;")
-                content_layout.addWidget(key_label)
+        self.title_label = QLabel(font=FONT_TITLE, objectName="surfaceTitle")
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.title_label)
+
+        # 后台分块加载的进度，加载完成后隐藏
+        self.load_progress = QProgressBar(objectName="detailProgress")
+        self.load_progress.setRange(0, 100)
+        self.load_progress.setTextVisible(False)
+        self.load_progress.setFixedHeight(4)
+        self.load_progress.hide()
+        layout.addWidget(self.load_progress)
+
+        # 快捷键列表：Model + 委托绘制的虚拟化ListView，只绘制可见行
+        self.detail_model = ShortcutDetailModel(self)
+        self.detail_view = QListView(objectName="detailList")
+        self.detail_view.setModel(self.detail_model)
+        self.detail_view.setItemDelegate(ShortcutItemDelegate(self.detail_view))
+        self.detail_view.setUniformItemSizes(True)
+        # 分批布局：追加一大块行时不会一次性重新排布全部行，分块加载的数万行也不卡界面
+        self.detail_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.detail_view.setBatchSize(DETAIL_CHUNK)
+        self.detail_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.detail_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.detail_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.detail_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        layout.addWidget(self.detail_view)
+
+        self.empty_label = QLabel("暂无快捷键数据", font=FONT_SMALL, objectName="emptyLabel")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.empty_label)
 
         # 按钮布局：返回、新增和收起按钮
         btn_layout = QHBoxLayout()
@@ -412,25 +911,23 @@ class ShortcutDetailWindow(QDialog):
         btn_layout.setContentsMargins(0,0,0,0)
         
         back_btn = QPushButton("← 返回", font=FONT_SMALL)
-        back_btn.setStyleSheet("background:#0EA5E9;color:white;border-radius:5px;padding:4px;")
+        back_btn.setObjectName("backBtn")
         back_btn.clicked.connect(self.back_to_main)
         btn_layout.addWidget(back_btn)
         
         # 新增快捷键按钮
         new_btn = QPushButton("➕ 新增", font=FONT_SMALL)
-        new_btn.setStyleSheet("background:#22C55E;color:white;border-radius:5px;padding:4px;")
+        new_btn.setObjectName("newShortcutBtn")
         new_btn.clicked.connect(self.new_shortcut)
         btn_layout.addWidget(new_btn)
         
         collapse_btn = QPushButton("🔽 收起", font=FONT_SMALL)
-        collapse_btn.setStyleSheet("background:#8B5CF6;color:white;border-radius:5px;padding:4px;")
+        collapse_btn.setObjectName("detailCollapseBtn")
         collapse_btn.clicked.connect(self.collapse_and_back)
         btn_layout.addWidget(collapse_btn)
         
         layout.addLayout(btn_layout)
 
-        self.move(self.parent_win.pos())
-
     def back_to_main(self):
         self.parent_win.show()
         self.accept()
@@ -449,214 +946,338 @@ class ShortcutDetailWindow(QDialog):
         # 获取当前软件的快捷键列表
         shortcut_list = DataManager.get_software_detail(self.soft_name)
         # 打开编辑窗口，传入当前软件名称和现有快捷键列表
-        edit_win = AddEditShortcutWindow(self.soft_name, shortcut_list, self)
+        edit_win = self.parent_win.dialog_pool.acquire(AddEditShortcutWindow, self, self.soft_name, shortcut_list)
         # 如果编辑成功，刷新当前界面
-        if edit_win.exec():
+        if exec_dialog(edit_win):
             self.refresh_ui()
     
     def refresh_ui(self):
-        """刷新快捷键界面"""
-        # 获取最新的快捷键列表
-        shortcut_list = DataManager.get_software_detail(self.soft_name)
-        
-        # 清空现有内容
-        content_widget = self.layout().itemAt(1).widget().widget()
-        content_layout = content_widget.layout()
-        # 清空所有现有控件
-        while content_layout.count() > 0:
-            item = content_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-        
-        # 重新添加内容
-        if not shortcut_list:
-            empty_label = QLabel("暂无快捷键数据", font=FONT_SMALL)
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_label.setStyleSheet("color:#94A3B8;")
-            content_layout.addWidget(empty_label)
-        else:
-            for item in shortcut_list:
-                # 列表式展示：操作和快捷键在同一行，更紧凑
-                key_label = QLabel(f"{item['操作']} → {item['快捷键']}", font=FONT_SMALL)
-                key_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-                key_label.setStyleSheet("color:white;background:#334155;border-radius:5px;padding:5px 8px;")
-                content_layout.addWidget(key_label)
-    
-    # 鼠标事件处理 - 支持拖动和调整大小
-    def mousePressEvent(self, event):
-        # 检查是否在调整大小区域
-        rect = self.rect()
-        bottom_edge = rect.bottom() - self.edge_size
-        top_edge = rect.top() + self.edge_size
-        
-        if event.button() == Qt.MouseButton.LeftButton:
-            # 检查是否在底部或顶部边缘
-            if event.pos().y() >= bottom_edge or event.pos().y() <= top_edge:
-                self.resizing = True
-                self.last_pos = event.pos()
-                self.setCursor(QCursor(Qt.CursorShape.SizeVerCursor))
-                event.accept()
-                return
-            
-            # 否则处理拖动
-            self.is_pressing = True
-            self.last_pos = event.pos()
-            event.accept()
-
-    def mouseMoveEvent(self, event):
-        if self.resizing:
-            # 调整窗口大小
-            delta = event.pos().y() - self.last_pos.y()
-            new_height = self.height() + delta
-            
-            # 确保高度在最小和最大范围内
-            if new_height >= self.minimumHeight() and new_height <= self.max_height:
-                self.resize(self.width(), new_height)
-                self.last_pos = event.pos()
-            event.accept()
-        elif self.is_pressing and event.buttons() == Qt.MouseButton.LeftButton:
-            # 窗口拖动
-            new_pos = self.pos() + event.pos() - self.last_pos
-            self.move(new_pos)
-            event.accept()
-
-    def mouseReleaseEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            if self.resizing:
-                self.resizing = False
-                self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
-            else:
-                self.is_pressing = False
-            event.accept()
-    
-    # 重写event方法，优先处理鼠标事件
-    def event(self, event):
-        # 处理鼠标移动事件，用于边缘检测
-        if event.type() == QEvent.Type.MouseMove:
-            rect = self.rect()
-            bottom_edge = rect.bottom() - self.edge_size
-            top_edge = rect.top() + self.edge_size
-            
-            if self.resizing:
-                # 正在调整大小时，设置调整光标
-                self.setCursor(QCursor(Qt.CursorShape.SizeVerCursor))
-            else:
-                # 检查是否在边缘区域
-                if event.pos().y() >= bottom_edge or event.pos().y() <= top_edge:
-                    self.setCursor(QCursor(Qt.CursorShape.SizeVerCursor))
-                else:
-                    self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
-        # 处理鼠标按下事件
-        elif event.type() == QEvent.Type.MouseButtonPress:
-            if event.button() == Qt.MouseButton.LeftButton:
-                rect = self.rect()
-                bottom_edge = rect.bottom() - self.edge_size
-                top_edge = rect.top() + self.edge_size
-                
-                # 检查是否在底部或顶部边缘
-                if event.pos().y() >= bottom_edge or event.pos().y() <= top_edge:
-                    self.resizing = True
-                    self.last_pos = event.pos()
-                    self.setCursor(QCursor(Qt.CursorShape.SizeVerCursor))
-                    event.accept()
-                    return True
-        # 处理鼠标释放事件
-        elif event.type() == QEvent.Type.MouseButtonRelease:
-            if event.button() == Qt.MouseButton.LeftButton and self.resizing:
-                self.resizing = False
-                self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
-                event.accept()
-                return True
-        
-        # 其他事件交给父类处理
-        return super().event(event)
-    
-    # 事件过滤器 - 处理鼠标悬停时的光标变化
-    def eventFilter(self, obj, event):
-        # 确保鼠标移动事件被正确处理
-        if event.type() == QEvent.Type.MouseMove:
-            rect = self.rect()
-            bottom_edge = rect.bottom() - self.edge_size
-            top_edge = rect.top() + self.edge_size
-            
-            if not self.resizing:
-                # 检查是否在边缘区域
-                if event.pos().y() >= bottom_edge or event.pos().y() <= top_edge:
-                    self.setCursor(QCursor(Qt.CursorShape.SizeVerCursor))
-                    # 阻止事件继续传递，确保光标正确显示
-                    return True
-        return super().eventFilter(obj, event)
+        """刷新快捷键界面：只更新发生变化的行，不重建整个布局"""
+        self.load_rows()
+
+    def load_rows(self):
+        """显示当前软件的快捷键并返回行数；数据较大且不在缓存中时改为后台分块加载，返回None"""
+        self.cancel_load()
+        if not DataManager.detail_needs_streaming(self.soft_name):
+            self.detail_model.set_rows(DataManager.get_software_detail(self.soft_name))
+            self.update_empty_state()
+            return self.detail_model.rowCount()
+        task = DetailLoadTask(self.soft_name)
+        task.signals.chunk.connect(lambda rows, progress: self.on_rows_loaded(task, rows, progress))
+        task.signals.finished.connect(lambda: self.on_load_finished(task))
+        task.signals.failed.connect(lambda message: self.on_load_finished(task, message))
+        self.load_task = task
+        self.detail_model.set_rows([])
+        self.empty_label.setText("加载中…")
+        self.update_empty_state()
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+        start_task(task)
+        return None
+
+    def on_rows_loaded(self, task, rows, progress):
+        # 已取消的任务可能还有排队中的数据块，直接丢弃
+        if task is not self.load_task:
+            return
+        self.detail_model.append_rows(rows)
+        self.load_progress.setValue(int(progress * 100))
+        if self.detail_view.isHidden() and self.detail_model.rowCount():
+            self.update_empty_state()
+
+    def on_load_finished(self, task, error=None):
+        if task is not self.load_task:
+            return
+        if error is not None:
+            print(f"加载快捷键失败: {self.soft_name} {error}")
+        self.load_task = None
+        self.load_progress.hide()
+        self.empty_label.setText("暂无快捷键数据")
+        self.update_empty_state()
+
+    def cancel_load(self):
+        """关闭窗口或切换软件时停止后台加载"""
+        if self.load_task is None:
+            return
+        self.load_task.cancel()
+        self.load_task = None
+        self.load_progress.hide()
+        self.empty_label.setText("暂无快捷键数据")
+
+    def done(self, result):
+        self.cancel_load()
+        super().done(result)
+
+    def update_empty_state(self):
+        is_empty = self.detail_model.rowCount() == 0
+        self.empty_label.setVisible(is_empty)
+        self.detail_view.setVisible(not is_empty)
+
+# ===================== 软件列表 Model/View【虚拟化列表，只绘制可见行】 =====================
+SOFT_NAME_ROLE = Qt.ItemDataRole.UserRole
+IS_HIT_ROLE = Qt.ItemDataRole.UserRole + 1
+GROUP_ROLE = Qt.ItemDataRole.UserRole + 2
+
+# 分组标题行：分组名（未分组为空字符串）、软件数、是否展开
+GroupHeader = namedtuple("GroupHeader", "group count expanded")
+
+class SoftwareListModel(QAbstractListModel):
+    """软件列表数据模型：未搜索时显示全部软件名称（有分组时显示分组标题行，只列出展开分组的软件）；
+    搜索时显示按相关度排好序的软件名称，后面追加快捷键命中行"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []      # 全部软件名称
+        self.filtered = None  # 搜索结果中的软件名称（已排序），None表示未搜索、显示全部
+        self.hits = []  # [(软件名, 操作, 快捷键)]
+        self.sections = None  # 分组布局：GroupHeader和展开分组的软件名，None表示不分组
+
+    def shown_names(self):
+        if self.filtered is not None:
+            return self.filtered
+        return self.names if self.sections is None else self.sections
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.shown_names()) + len(self.hits)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        names = self.shown_names()
+        if row < len(names):
+            item = names[row]
+            if isinstance(item, GroupHeader):
+                return self.header_data(item, role)
+            if role in (Qt.ItemDataRole.DisplayRole, SOFT_NAME_ROLE):
+                return item
+            if role == Qt.ItemDataRole.ToolTipRole:
+                tags = DataManager.groups().tags_of(item)
+                return f"{item}  #{' #'.join(tags)}" if tags else item
+            if role == IS_HIT_ROLE:
+                return False
+            return None
+        soft_name, oper, key = self.hits[row - len(names)]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{oper} → {key}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{soft_name}：{oper} → {key}"
+        if role == SOFT_NAME_ROLE:
+            return soft_name
+        if role == IS_HIT_ROLE:
+            return True
+        return None
+
+    @staticmethod
+    def header_data(header, role):
+        label = header.group or UNGROUPED_LABEL
+        if role == Qt.ItemDataRole.DisplayRole:
+            return label
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{label}：{header.count} 个软件"
+        if role == GROUP_ROLE:
+            return header
+        if role == IS_HIT_ROLE:
+            return False
+        return None
+
+    def set_names(self, names):
+        if names == self.names:
+            return
+        if self.filtered is not None or self.sections is not None:
+            # 搜索中或分组显示时只更新全部名称，结果/分组布局由调用方刷新
+            self.names = list(names)
+            return
+        self.beginResetModel()
+        self.names = list(names)
+        self.endResetModel()
+
+    def apply_changes(self, added, removed):
+        """增量增删软件名称行，不重置整个列表；搜索中只更新全部名称"""
+        removed = set(removed)
+        existing = set(self.names)
+        added = [name for name in added if name not in existing]
+        if self.filtered is not None or self.sections is not None:
+            self.names = [name for name in self.names if name not in removed] + added
+            return
+        for row in reversed(range(len(self.names))):
+            if self.names[row] in removed:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.names[row]
+                self.endRemoveRows()
+        if added:
+            start = len(self.names)
+            self.beginInsertRows(QModelIndex(), start, start + len(added) - 1)
+            self.names.extend(added)
+            self.endInsertRows()
+
+    def set_sections(self, layout):
+        """按分组显示：layout为 GroupIndex.layout() 的结果，None表示不分组；搜索中只记下，结束搜索后显示"""
+        rows = None
+        if layout is not None:
+            rows = []
+            for group, count, members in layout:
+                rows.append(GroupHeader(group, count, members is not None))
+                rows.extend(members or ())
+        if rows == self.sections:
+            return
+        if self.filtered is not None:
+            self.sections = rows
+            return
+        self.beginResetModel()
+        self.sections = rows
+        self.endResetModel()
+
+    def set_filter(self, names, hits):
+        """显示搜索结果：names为None时显示全部软件；结果未变化时不刷新，避免逐字输入时列表闪动"""
+        names = list(names) if names is not None else None
+        hits = list(hits)
+        if names == self.filtered and hits == self.hits:
+            return
+        self.beginResetModel()
+        self.filtered = names
+        self.hits = hits
+        self.endResetModel()
+
+class SoftwareItemDelegate(QStyledItemDelegate):
+    """直接绘制圆角按钮样式的列表行，替代每行一个QPushButton"""
+    ROW_HEIGHT = 26
+    ROW_SPACING = 5
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT + self.ROW_SPACING)
+
+    def paint(self, painter, option, index):
+        header = index.data(GROUP_ROLE)
+        if header is not None:
+            self.paint_header(painter, option, header, index.data(Qt.ItemDataRole.DisplayRole))
+            return
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect).adjusted(0, 0, 0, -self.ROW_SPACING)
+        is_hit = index.data(IS_HIT_ROLE)
+        color = THEME.color("field" if is_hit else "item")
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            color = color.lighter(115)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        painter.setFont(FONT_SMALL)
+        painter.setPen(THEME.color("field_text" if is_hit else "item_text"))
+        text_rect = rect.adjusted(5, 0, -5, 0)
+        text = QFontMetrics(FONT_SMALL).elidedText(
+            index.data(Qt.ItemDataRole.DisplayRole), Qt.TextElideMode.ElideRight, int(text_rect.width()))
+        align = Qt.AlignmentFlag.AlignVCenter | (Qt.AlignmentFlag.AlignLeft if is_hit else Qt.AlignmentFlag.AlignHCenter)
+        painter.drawText(text_rect, align, text)
+        painter.restore()
+
+    def paint_header(self, painter, option, header, label):
+        """分组标题行：展开/折叠箭头 + 分组名（过长省略），软件数靠右"""
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRectF(option.rect).adjusted(0, 0, 0, -self.ROW_SPACING)
+        color = THEME.color("accent")
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            color = color.lighter(115)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        painter.setFont(FONT_SMALL)
+        painter.setPen(THEME.color("on_accent"))
+        metrics = QFontMetrics(FONT_SMALL)
+        text_rect = rect.adjusted(5, 0, -5, 0)
+        count = str(header.count)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, count)
+        text_rect.setRight(text_rect.right() - metrics.horizontalAdvance(count) - 4)
+        text = metrics.elidedText(f"{'▾' if header.expanded else '▸'} {label}", Qt.TextElideMode.ElideRight,
+                                  int(text_rect.width()))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
 
 # ===================== 核心：悬浮球主窗口【✅修复列表删空闪退BUG 核心修改】 =====================
-class FloatShortcutMain(QWidget):
+class FloatShortcutMain(RoundedSurface, QWidget):
     def __init__(self, app):
         super().__init__()
         self.app = app
-        self.is_pressing = False
-        self.last_pos = QPoint(0,0)
         self.is_collapsed = False  # 收起状态标志
         self.last_state = "main"  # 记录最后状态：main或detail
         self.last_soft_name = None  # 记录最后查看的软件名称
+        self.detail_win = None  # 当前打开的快捷键详情窗口
+        self.dialog_pool = DialogPool()  # 弹窗只创建一次，之后复用
+        self.transfer_task = None  # 正在执行的导入/导出任务
+        self.all_soft_list = []
+        self.library_loaded = False  # 数据在首次绘制之后才开始加载
+        self.library_task = None  # 正在后台加载软件库的任务
         self.init_ui()
-        self.load_software_list()
-        # 安装事件过滤器，确保按钮事件不影响拖动
-        self.collapse_btn.installEventFilter(self)
+        data_signals().save_failed.connect(self.on_save_failed)
+        # 监听数据目录，外部改动增量刷新到列表和打开的详情窗口
+        self.library_watcher = LibraryWatcher(self)
+        self.library_watcher.library_changed.connect(self.on_library_changed)
+        self.library_watcher.groups_changed.connect(self.search_software)
+        # 拖动窗口任意空白处或收起按钮都能移动悬浮窗，按钮几乎没移动就松开时照常收起/展开
+        self.drag_controller = DragResizeController(self, click_widgets=(self.collapse_btn,))
 
     def init_ui(self):
         # 初始展开状态的尺寸
-        if self.is_collapsed:
-            self.setFixedSize(30, 30)
-        else:
-            self.setFixedSize(QSize(FLOAT_WIN_WIDTH, FLOAT_WIN_HEIGHT))
-        
+        self.apply_window_size()
+
+        self.setObjectName("floatWindow")
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint |
             Qt.WindowType.WindowStaysOnTopHint |
             Qt.WindowType.Tool
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setStyleSheet("background:#1E293B;border-radius:10px;")
 
         main_layout = QVBoxLayout(self)
         main_layout.setSpacing(5)
         main_layout.setContentsMargins(5,5,5,5)
 
         # 收起/展开按钮
-        self.collapse_btn = QPushButton("🔽 收起")
-        self.collapse_btn.setStyleSheet("background:#8B5CF6;color:white;border-radius:5px;padding:3px;")
+        self.collapse_btn = QPushButton("🔽 收起", objectName="collapseBtn")
         self.collapse_btn.clicked.connect(self.toggle_collapse)
         main_layout.addWidget(self.collapse_btn)
 
-        self.add_btn = QPushButton("➕ 添加软件", font=FONT_TITLE)
-        self.add_btn.setStyleSheet("background:#F97316;color:white;border-radius:8px;padding:5px;")
+        self.add_btn = QPushButton("➕ 添加软件", font=FONT_TITLE, objectName="addSoftwareBtn")
         self.add_btn.clicked.connect(self.open_add_window)
         main_layout.addWidget(self.add_btn)
 
-        self.search_edit = QLineEdit()
+        self.search_edit = QLineEdit(objectName="searchEdit")
         self.search_edit.setPlaceholderText("🔍 搜索软件")
         self.search_edit.setFont(FONT_SMALL)
-        self.search_edit.setStyleSheet("background:#334155;color:white;border-radius:5px;padding:2px;text-align:center;")
-        self.search_edit.textChanged.connect(self.search_software)
+        self.search_edit.textChanged.connect(lambda _text: self.search_software())
         main_layout.addWidget(self.search_edit)
 
-        self.exit_btn = QPushButton("❌ 退出程序", font=FONT_SMALL)
-        self.exit_btn.setStyleSheet("background:#EF4444;color:white;border-radius:5px;padding:3px;")
+        self.exit_btn = QPushButton("❌ 退出程序", font=FONT_SMALL, objectName="exitBtn")
         self.exit_btn.clicked.connect(self.exit_program)
         main_layout.addWidget(self.exit_btn)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("border:none;")
-        main_layout.addWidget(self.scroll_area)
-
-        self.soft_list_widget = QWidget()
-        self.soft_layout = QVBoxLayout(self.soft_list_widget)
-        self.soft_layout.setSpacing(5)
-        self.scroll_area.setWidget(self.soft_list_widget)
+        # 软件列表：Model + 虚拟化ListView，搜索时只显示结果行
+        self.soft_model = SoftwareListModel(self)
+        self.soft_list_view = QListView(objectName="softList")
+        self.soft_list_view.setModel(self.soft_model)
+        self.soft_list_view.setItemDelegate(SoftwareItemDelegate(self.soft_list_view))
+        self.soft_list_view.setUniformItemSizes(True)
+        self.soft_list_view.setMouseTracking(True)
+        self.soft_list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.soft_list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.soft_list_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.soft_list_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.soft_list_view.clicked.connect(self.on_soft_item_clicked)
+        # 右键：软件行设置分组/标签，分组标题行重命名/删除分组
+        self.soft_list_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.soft_list_view.customContextMenuRequested.connect(self.show_list_menu)
+        main_layout.addWidget(self.soft_list_view)
+
+        # 空状态提示，列表无可见行时显示；数据加载完成前显示加载中
+        self.empty_label = QLabel("加载中…", font=FONT_SMALL, objectName="emptyLabel")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.soft_list_view.hide()
+        main_layout.addWidget(self.empty_label)
 
         self.move_to_right_edge()
-        self.all_soft_list = DataManager.get_all_software()
 
     def toggle_collapse(self):
         """切换展开/收起状态"""
@@ -665,160 +1286,356 @@ class FloatShortcutMain(QWidget):
         
         self.is_collapsed = not self.is_collapsed
         
+        # 圆形/圆角背景由paintEvent绘制，按钮外观由样式表里的collapsed属性切换
+        self.apply_window_size()
+        self.collapse_btn.setProperty("collapsed", self.is_collapsed)
+        self.collapse_btn.style().unpolish(self.collapse_btn)
+        self.collapse_btn.style().polish(self.collapse_btn)
+
         if self.is_collapsed:
             # 收起状态：缩小为圆形，直接使用当前位置
-            self.setFixedSize(30, 30)
-            self.setStyleSheet("background:#1E293B;border-radius:15px;")
-            
             # 隐藏所有控件，只显示一个简单的指示器
             self.add_btn.hide()
             self.search_edit.hide()
             self.exit_btn.hide()
-            self.scroll_area.hide()
+            self.soft_list_view.hide()
+            self.empty_label.hide()
             self.collapse_btn.setText("⭕")
-            self.collapse_btn.setStyleSheet("background:#1E293B;color:white;border-radius:15px;padding:0;")
             
             # 直接使用当前位置，不做调整
             self.move(current_pos)
         else:
             # 展开状态：恢复正常大小，直接使用当前位置
-            self.setFixedSize(QSize(FLOAT_WIN_WIDTH, FLOAT_WIN_HEIGHT))
-            self.setStyleSheet("background:#1E293B;border-radius:10px;")
-            
             # 显示所有控件
             self.add_btn.show()
             self.search_edit.show()
             self.exit_btn.show()
-            self.scroll_area.show()
+            self.soft_list_view.show()
             self.collapse_btn.setText("🔽 收起")
-            self.collapse_btn.setStyleSheet("background:#8B5CF6;color:white;border-radius:5px;padding:3px;")
             
-            # 重新加载软件列表，确保显示正确
-            self.load_software_list()
+            # 重新加载软件列表并保留当前搜索条件，确保显示正确
+            self.soft_model.set_names(DataManager.get_all_software())
+            self.search_software()
             
             # 直接使用当前位置，不做调整
             self.move(current_pos)
 
+    def apply_window_size(self):
+        """按收起状态和尺寸设置调整窗口大小，收起时背景画成圆形"""
+        if self.is_collapsed:
+            self.surface_radius = COLLAPSED_SIZE // 2
+            self.setFixedSize(COLLAPSED_SIZE, COLLAPSED_SIZE)
+        else:
+            self.surface_radius = RoundedSurface.surface_radius
+            self.setFixedSize(QSize(*THEME.window_size()))
+
+    def set_window_size(self, size):
+        """托盘菜单切换悬浮窗尺寸，保持右上角位置不变"""
+        if not THEME.set_size(size) or self.is_collapsed:
+            return
+        right = self.x() + self.width()
+        self.apply_window_size()
+        self.move(right - self.width(), self.y())
+
     def move_to_right_edge(self):
         screen_geo = QApplication.primaryScreen().geometry()
         win_x = screen_geo.width() - self.width() - 10
         win_y = (screen_geo.height() - self.height()) // 2
         self.move(win_x, win_y)
 
-    def load_software_list(self, filter_list=None):
-        """✅ 核心修复BUG 重点：每次清空后动态创建空标签，永不复用已销毁控件"""
-        # 清空所有现有控件
-        for i in reversed(range(self.soft_layout.count())):
-            widget_item = self.soft_layout.itemAt(i).widget()
-            if widget_item:
-                widget_item.deleteLater()
-
-        # 重新读取最新数据
+    @traced
+    def load_software_list(self, filter_list=None, hit_list=None):
+        """重新读取软件名称并应用过滤；名称未变化时不会重置列表"""
         self.all_soft_list = DataManager.get_all_software()
-        soft_list = filter_list if filter_list else self.all_soft_list
-        
-        if not soft_list:
-            # ✅ 关键修复：每次列表为空时，新建一个空状态标签，不是复用旧的
-            empty_label = QLabel("暂无软件\n点击添加", font=FONT_SMALL)
-            empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            empty_label.setStyleSheet("color:#94A3B8;")
-            self.soft_layout.addWidget(empty_label)
+        self.soft_model.set_names(self.all_soft_list)
+        self.apply_filter(filter_list, hit_list)
+
+    def apply_filter(self, filter_list=None, hit_list=None):
+        """filter_list为None时显示全部软件（有分组时按分组折叠）；hit_list为快捷键命中行"""
+        if filter_list is None:
+            self.soft_model.set_sections(DataManager.groups().layout(self.soft_model.names))
+        self.soft_model.set_filter(filter_list, hit_list or [])
+        self.update_empty_state()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.library_loaded:
+            PROFILER.mark("first_paint")
+            # 先把窗口画出来，再在下一轮事件循环里加载数据
+            QTimer.singleShot(0, self.load_library)
+
+    def load_library(self):
+        """启动时在后台分批加载软件库：名称陆续出现在列表里，已加载的部分立即可以搜索；只执行一次"""
+        if self.library_loaded:
             return
-        
-        # 生成软件按钮
-        for soft_name in soft_list:
-            soft_btn = QPushButton(soft_name, font=FONT_SMALL)
-            soft_btn.setStyleSheet("background:#3B82F6;color:white;border-radius:6px;padding:5px;")
-            soft_btn.clicked.connect(lambda _, s=soft_name: self.open_software_option(s))
-            self.soft_layout.addWidget(soft_btn)
-
+        self.library_loaded = True
+        if not DataManager.begin_loading():
+            # 加载前已经建好了完整索引（如先用了搜索），直接显示
+            self.load_software_list()
+            self.on_library_loaded()
+            return
+        task = LibraryLoadTask(DataManager.groups().load_priority())
+        task.signals.batch.connect(self.on_library_batch)
+        task.signals.finished.connect(self.on_library_loaded)
+        task.signals.failed.connect(self.on_library_loaded)
+        self.library_task = task
+        start_task(task)
+
+    def on_library_batch(self, batch):
+        PROFILER.mark("first_batch")
+        names = DataManager.add_loaded(batch)
+        self.soft_model.apply_changes(names, [])
+        self.all_soft_list = list(self.soft_model.names)
+        # 加载中就输入的搜索词随着数据到达更新结果
+        self.search_software()
+
+    def on_library_loaded(self, error=None):
+        """全部加载完成（或失败）：索引转为正常的增量更新，开始监听数据目录"""
+        if error is not None:
+            print(f"加载软件库失败: {error}")
+        self.library_task = None
+        DataManager.finish_loading(complete=error is None)
+        self.empty_label.setText("暂无软件\n点击添加")
+        if error is not None:
+            # 后台读取失败时退回同步读取，至少把名称列表显示出来
+            self.load_software_list()
+        self.update_empty_state()
+        PROFILER.mark("list_loaded")
+        PROFILER.mark("index_built")
+        self.library_watcher.start()
+        PROFILER.mark("interactive")
+        PROFILER.report()
+
+    def update_empty_state(self):
+        if self.is_collapsed:
+            return
+        is_empty = self.soft_model.rowCount() == 0
+        self.empty_label.setVisible(is_empty)
+        self.soft_list_view.setVisible(not is_empty)
+
+    def on_soft_item_clicked(self, index):
+        header = index.data(GROUP_ROLE)
+        if header is not None:
+            self.toggle_group(header)
+            return
+        soft_name = index.data(SOFT_NAME_ROLE)
+        if soft_name:
+            self.open_software_option(soft_name)
+
+    def toggle_group(self, header):
+        """展开/折叠分组：展开时才把该分组的软件放进列表"""
+        DataManager.groups().set_expanded(header.group, not header.expanded)
+        self.apply_filter()
+
+    def show_list_menu(self, pos):
+        index = self.soft_list_view.indexAt(pos)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        header = index.data(GROUP_ROLE)
+        if header is not None:
+            if header.group == UNGROUPED:
+                return
+            rename_action = menu.addAction("重命名分组…")
+            rename_action.triggered.connect(lambda: self.rename_group(header.group))
+            remove_action = menu.addAction("删除分组")
+            remove_action.triggered.connect(lambda: self.remove_group(header.group))
+        else:
+            soft_name = index.data(SOFT_NAME_ROLE)
+            group_action = menu.addAction("分组与标签…")
+            group_action.triggered.connect(lambda: self.open_group_window(soft_name))
+        menu.exec(self.soft_list_view.viewport().mapToGlobal(pos))
+
+    def open_group_window(self, soft_name):
+        group_win = self.dialog_pool.acquire(GroupEditWindow, self, soft_name)
+        if exec_dialog(group_win):
+            self.search_software()
+
+    def rename_group(self, group):
+        new_group, ok = QInputDialog.getText(self, "重命名分组", "新的分组名称（与已有分组同名时合并）：", text=group)
+        if ok and DataManager.groups().rename_group(group, new_group):
+            self.search_software()
+
+    def remove_group(self, group):
+        confirm = QMessageBox.question(self, "删除分组", f"确定要删除分组【{group}】吗？\n组内的软件会移到「{UNGROUPED_LABEL}」，不会被删除。",
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if confirm == QMessageBox.StandardButton.Yes and DataManager.groups().remove_group(group):
+            self.search_software()
+
+    @traced
     def search_software(self):
+        """输入框的槽函数：异常不能逃出槽（PyQt会直接终止程序），出错时提示并保留当前列表"""
+        try:
+            self.run_search()
+        except Exception as e:
+            print(f"搜索失败: {e}")
+
+    def run_search(self):
         keyword = self.search_edit.text().strip().lower()
         if not keyword:
-            self.load_software_list()
+            self.apply_filter()
+            return
+        if keyword.startswith("#"):
+            # 按标签筛选：只查分组索引，不打开软件数据
+            self.apply_filter(DataManager.groups().with_tag(keyword[1:], self.soft_model.names))
             return
-        filter_list = [name for name in self.all_soft_list if keyword in name.lower()]
-        self.load_software_list(filter_list)
+        hits = DataManager.search(keyword, limit=SEARCH_HIT_LIMIT)
+        filter_list = [soft_name for soft_name, oper, _ in hits if oper is None]
+        hit_list = [hit for hit in hits if hit[1] is not None]
+        self.apply_filter(filter_list, hit_list)
 
     def open_add_window(self):
-        add_win = AddEditShortcutWindow(parent=self)
-        if add_win.exec():
+        add_win = self.dialog_pool.acquire(AddEditShortcutWindow, self)
+        if exec_dialog(add_win):
             if add_win.result:
                 self.search_edit.clear()
                 self.load_software_list()
 
     def open_software_option(self, soft_name):
         self.hide()
-        opt_win = SoftwareOptionWindow(soft_name, self)
-        if opt_win.exec():
+        opt_win = self.dialog_pool.acquire(SoftwareOptionWindow, self, soft_name)
+        if exec_dialog(opt_win):
             opt = opt_win.opt_result
             if opt == "view":
                 # 记录查看状态
                 self.last_state = "detail"
                 self.last_soft_name = soft_name
-                detail_win = ShortcutDetailWindow(soft_name, self)
-                detail_win.exec()
+                self.detail_win = self.dialog_pool.acquire(ShortcutDetailWindow, self, soft_name)
+                exec_dialog(self.detail_win)
+                self.detail_win = None
             elif opt == "edit":
                 shortcut_list = DataManager.get_software_detail(soft_name)
-                edit_win = AddEditShortcutWindow(soft_name, shortcut_list, self)
-                if edit_win.exec():
+                edit_win = self.dialog_pool.acquire(AddEditShortcutWindow, self, soft_name, shortcut_list)
+                if exec_dialog(edit_win):
                     self.search_edit.clear()
                     self.load_software_list()
+            elif opt == "group":
+                self.open_group_window(soft_name)
             elif opt == "delete":
                 self.search_edit.clear()
                 self.load_software_list()
         self.show()
 
+    def undo_change(self):
+        self.on_history_applied(DataManager.undo())
+
+    def redo_change(self):
+        self.on_history_applied(DataManager.redo())
+
+    def restore_software(self, soft_name):
+        if DataManager.restore_software(soft_name):
+            self.on_history_applied(soft_name)
+        else:
+            QMessageBox.warning(self, "恢复失败", f"无法恢复【{soft_name}】，历史数据可能已损坏！")
+
+    def on_history_applied(self, soft_name):
+        """撤销/重做/恢复之后刷新列表，正在查看的详情也跟着刷新"""
+        if soft_name is None:
+            return
+        self.load_software_list()
+        self.search_software()
+        if self.detail_win is not None and self.detail_win.soft_name == soft_name:
+            self.detail_win.refresh_ui()
+
+    def reload_library(self):
+        """数据重新加载之后（命令行 reindex）刷新列表和正在查看的详情"""
+        self.load_software_list()
+        self.search_software()
+        if self.detail_win is not None:
+            self.detail_win.refresh_ui()
+
+    def on_library_changed(self, added, changed, removed):
+        """外部改动：只增删变化的列表行，刷新受影响的详情窗口"""
+        self.soft_model.apply_changes(added, removed)
+        self.all_soft_list = list(self.soft_model.names)
+        self.search_software()
+        if self.detail_win is not None and self.detail_win.soft_name in set(added + changed + removed):
+            self.detail_win.refresh_ui()
+
+    def on_save_failed(self, soft_name, error):
+        """后台写入失败：提示用户并按磁盘上的实际数据刷新列表"""
+        QMessageBox.warning(self, "保存失败", f"【{soft_name}】的快捷键未能写入磁盘：\n{error}")
+        self.load_software_list()
+        self.search_software()
+
+    def start_transfer(self, mode):
+        """导出/导入快捷键：选择文件后在后台线程执行，显示进度条，可随时取消"""
+        file_filter = "JSON Lines (*.jsonl);;CSV (*.csv)"
+        if mode == "export":
+            path, _ = QFileDialog.getSaveFileName(self, "导出快捷键", "shortcuts.jsonl", file_filter)
+        else:
+            path, _ = QFileDialog.getOpenFileName(self, "导入快捷键", "", "快捷键文件 (*.jsonl *.csv);;" + file_filter)
+        if not path:
+            return
+        title = "导出快捷键" if mode == "export" else "导入快捷键"
+        progress_dialog = QProgressDialog(f"正在{title}…", "取消", 0, 100, self)
+        progress_dialog.setWindowTitle(title)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setAutoReset(False)
+
+        task = TransferTask(mode, path)
+        task.signals.progress.connect(progress_dialog.setValue)
+        # 阻塞式排队：后台线程等界面线程写完这一批再继续读取，内存里最多只有一批
+        task.signals.batch_ready.connect(task.write_batch, Qt.ConnectionType.BlockingQueuedConnection)
+        progress_dialog.canceled.connect(task.cancel)
+
+        def done(message=None, failed=False):
+            progress_dialog.close()
+            self.transfer_task = None
+            if mode == "import":
+                self.load_software_list()
+                self.search_software()
+            if failed:
+                QMessageBox.warning(self, f"{title}失败", message)
+            elif message:
+                QMessageBox.information(self, f"{title}完成", message)
+
+        task.signals.finished.connect(lambda message: done(message))
+        task.signals.failed.connect(lambda message: done(message, failed=True))
+        task.signals.cancelled.connect(lambda: done("已取消，已经导入的部分会保留" if mode == "import" else None))
+        self.transfer_task = task
+        start_task(task)
+        progress_dialog.show()
+
     def exit_program(self):
         confirm = QMessageBox.question(self, "确认退出", "确定要退出快捷键助手吗？",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if confirm == QMessageBox.StandardButton.Yes:
             self.app.quit()
 
-    # 鼠标拖动悬浮窗 - 确保在所有状态下都能正常工作
-    def mousePressEvent(self, event):
-        # 确保所有状态下都能捕获鼠标按下事件
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.is_pressing = True
-            self.last_pos = event.pos()
-            # 阻止事件传递给子控件
-            event.accept()
-
-    def mouseMoveEvent(self, event):
-        # 确保所有状态下都能捕获鼠标移动事件
-        if self.is_pressing and event.buttons() == Qt.MouseButton.LeftButton:
-            # 计算新位置
-            new_pos = self.pos() + event.pos() - self.last_pos
-            self.move(new_pos)
-            # 阻止事件传递给子控件
-            event.accept()
-
-    def mouseReleaseEvent(self, event):
-        # 确保所有状态下都能捕获鼠标释放事件
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.is_pressing = False
-            # 阻止事件传递给子控件
-            event.accept()
-    
-    # 确保子控件的鼠标事件不会干扰主窗口拖动
-    def eventFilter(self, obj, event):
-        if obj == self.collapse_btn:
-            if event.type() == event.Type.MouseButtonPress:
-                # 直接调用主窗口的鼠标按下事件
-                self.mousePressEvent(event)
-                return True
-            elif event.type() == event.Type.MouseMove:
-                # 直接调用主窗口的鼠标移动事件
-                self.mouseMoveEvent(event)
-                return True
-            elif event.type() == event.Type.MouseButtonRelease:
-                # 先处理主窗口的鼠标释放事件
-                self.mouseReleaseEvent(event)
-                # 如果是点击（移动距离很小），则触发按钮的点击事件
-                if (event.pos() - self.last_pos).manhattanLength() < 5:
-                    self.toggle_collapse()
-                return True
-        return super().eventFilter(obj, event)
+# ===================== 启动耗时统计【--startup-profile】 =====================
+class StartupProfiler:
+    """记录启动各阶段相对 STARTUP_T0 的耗时，可交互后输出报告并退出"""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.marks = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = round((time.perf_counter() - STARTUP_T0) * 1000, 1)
+
+    def report(self):
+        if not self.enabled:
+            return
+        report = {
+            "time_to_first_paint_ms": self.marks.get("first_paint"),
+            "time_to_first_batch_ms": self.marks.get("first_batch"),
+            "time_to_interactive_ms": self.marks.get("interactive"),
+            "software_count": len(DataManager.get_all_software()),
+            "marks_ms": self.marks,
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        print(text)
+        # 打包后的 -w 程序没有控制台，同时写到程序目录
+        try:
+            with open(os.path.join(BASE_DIR, "startup_profile.json"), "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            print(f"写入启动报告失败: {e}")
+        QApplication.instance().quit()
+
+PROFILER = StartupProfiler()
 
 # ===================== 系统托盘图标【✅修复无图标警告】 =====================
 def init_system_tray(app, main_win):
@@ -838,6 +1655,62 @@ def init_system_tray(app, main_win):
 
     tray_menu.addSeparator()
 
+    # 主题和悬浮窗尺寸：切换时只替换一次程序级样式表/调整一次窗口大小
+    theme_menu = tray_menu.addMenu("主题颜色")
+    theme_group = QActionGroup(theme_menu)
+    for theme, (label, _) in THEMES.items():
+        action = QAction(label, theme_group, checkable=True, checked=theme == THEME.theme)
+        action.triggered.connect(lambda _checked, theme=theme: THEME.set_theme(app, theme))
+        theme_menu.addAction(action)
+
+    size_menu = tray_menu.addMenu("悬浮窗大小")
+    size_group = QActionGroup(size_menu)
+    for size, (label, width, height) in SIZES.items():
+        action = QAction(f"{label}（{width}×{height}）", size_group, checkable=True, checked=size == THEME.size)
+        action.triggered.connect(lambda _checked, size=size: main_win.set_window_size(size))
+        size_menu.addAction(action)
+
+    tray_menu.addSeparator()
+
+    export_action = QAction("导出快捷键…", app)
+    export_action.triggered.connect(lambda: main_win.start_transfer("export"))
+    tray_menu.addAction(export_action)
+
+    import_action = QAction("导入快捷键…", app)
+    import_action.triggered.connect(lambda: main_win.start_transfer("import"))
+    tray_menu.addAction(import_action)
+
+    tray_menu.addSeparator()
+
+    # 历史版本：菜单弹出时才查询可撤销/重做的修改和已删除的软件
+    undo_action = QAction("撤销", app)
+    undo_action.triggered.connect(main_win.undo_change)
+    tray_menu.addAction(undo_action)
+
+    redo_action = QAction("重做", app)
+    redo_action.triggered.connect(main_win.redo_change)
+    tray_menu.addAction(redo_action)
+
+    restore_menu = tray_menu.addMenu("恢复已删除的软件")
+
+    def update_history_actions():
+        undo_name = DataManager.history().peek_undo()
+        undo_action.setText(f"撤销【{undo_name}】的修改" if undo_name else "撤销")
+        undo_action.setEnabled(undo_name is not None)
+        redo_name = DataManager.history().peek_redo()
+        redo_action.setText(f"重做【{redo_name}】的修改" if redo_name else "重做")
+        redo_action.setEnabled(redo_name is not None)
+        restore_menu.clear()
+        deleted = DataManager.deleted_software()
+        for soft_name in deleted:
+            action = restore_menu.addAction(soft_name)
+            action.triggered.connect(lambda _checked, soft_name=soft_name: main_win.restore_software(soft_name))
+        restore_menu.setEnabled(bool(deleted))
+
+    tray_menu.aboutToShow.connect(update_history_actions)
+
+    tray_menu.addSeparator()
+
     exit_action = QAction("退出程序", app)
     exit_action.triggered.connect(app.quit)
     tray_menu.addAction(exit_action)
@@ -849,12 +1722,44 @@ def init_system_tray(app, main_win):
 
 # ===================== 程序入口 =====================
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    argv = list(sys.argv)
+    if "--startup-profile" in argv:
+        argv.remove("--startup-profile")
+        PROFILER.enabled = True
+    if "--trace" in argv:
+        argv.remove("--trace")
+        TRACE_ENABLED = True
+    PROFILER.mark("imports")
+
+    app = QApplication(argv)
     app.setFont(QFont("微软雅黑"))
     app.setQuitOnLastWindowClosed(False)
+    THEME.load(SETTINGS_PATH)
+    THEME.apply(app)
+    # 界面程序建完索引后在后台更新快照（命令行只读，不写快照）
+    DataManager.write_snapshots = True
+    # 退出前（退出按钮、托盘退出都会走app.quit）停下后台任务、等待后台写入完成，再更新快照
+    app.aboutToQuit.connect(stop_tasks)
+    app.aboutToQuit.connect(DataManager.save_snapshot)
+    if TRACE_ENABLED:
+        TRACER.enable(TRACE_DIR, stall_ms=TRACE_STALL_MS)
+        # 界面线程心跳：看门狗线程发现心跳停了就说明事件循环被阻塞
+        trace_heartbeat = QTimer()
+        trace_heartbeat.timeout.connect(TRACER.heartbeat)
+        trace_heartbeat.start(TRACER.heartbeat_ms)
+        app.aboutToQuit.connect(TRACER.close)
+    PROFILER.mark("app_created")
 
     float_app = FloatShortcutMain(app)
+    # 同时启动了两次时只有一个能监听成功，另一个把参数转过去后退出；测量启动耗时的进程不占用服务
+    if not PROFILER.enabled:
+        instance_server = InstanceServer(float_app)
+        if not instance_server.listen():
+            sys.exit(0)
     float_app.show()
+    PROFILER.mark("window_shown")
+    # 窗口首次绘制后自动加载数据；万一收不到绘制事件（如被系统延迟显示），稍后兜底加载
+    QTimer.singleShot(500, float_app.load_library)
 
     tray = init_system_tray(app, float_app)
 
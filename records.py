@@ -0,0 +1,91 @@
+import gc
+import sys
+from collections.abc import Mapping
+
+# ===================== 快捷键记录【紧凑的内存表示】 =====================
+# JSON解析出的每条快捷键是一个dict，操作/快捷键字符串每条各一份，整个库读进内存后
+# 比原始数据大一个数量级。缓存里改用 ShortcutRecord：__slots__ 只有两个字段，
+# 字符串经 sys.intern 放进解释器的共享字符串表，"复制"、"Ctrl+C" 这类重复出现的值全库只存一份。
+# 记录实现只读的 Mapping 接口，item["操作"]、item.get("快捷键") 等原有写法不用改。
+
+OPER = sys.intern("操作")
+KEY = sys.intern("快捷键")
+FIELDS = (OPER, KEY)
+
+_intern = sys.intern
+
+
+class ShortcutRecord(Mapping):
+    """一条快捷键（操作 → 快捷键），只读；需要修改时整条替换成新的记录或dict"""
+    __slots__ = ("oper", "key")
+
+    def __init__(self, oper, key):
+        self.oper = _intern(oper)
+        self.key = _intern(key)
+
+    def __getitem__(self, field):
+        if field == OPER:
+            return self.oper
+        if field == KEY:
+            return self.key
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        if field == OPER:
+            return self.oper
+        if field == KEY:
+            return self.key
+        return default
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return 2
+
+    def __contains__(self, field):
+        return field == OPER or field == KEY
+
+    def __eq__(self, other):
+        if type(other) is ShortcutRecord:
+            return self.oper == other.oper and self.key == other.key
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def to_dict(self):
+        return {OPER: self.oper, KEY: self.key}
+
+    def __reduce__(self):
+        return (ShortcutRecord, (self.oper, self.key))
+
+    def __repr__(self):
+        return f"ShortcutRecord({self.oper!r}, {self.key!r})"
+
+
+def to_records(shortcut_list):
+    """把快捷键列表（JSON、导入文件、编辑弹窗里的dict）转换成记录列表，缺失的字段记为空字符串；
+    已经是记录的原样保留，所以可以重复调用。手动改坏的数据：不是列表时当作空列表，不是字典的条目跳过"""
+    if not isinstance(shortcut_list, (list, tuple)):
+        return []
+    # 一次创建大量小对象时暂停循环垃圾回收，否则每分配几百个对象就要扫描一遍不断变大的堆，耗时翻倍
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        try:
+            return [item if type(item) is ShortcutRecord else ShortcutRecord(str(item.get(OPER, "")), str(item.get(KEY, "")))
+                    for item in shortcut_list]
+        except AttributeError:
+            # 有条目不是字典：逐条检查（正常数据不走这里，不多花时间）
+            return [item if type(item) is ShortcutRecord else ShortcutRecord(str(item.get(OPER, "")), str(item.get(KEY, "")))
+                    for item in shortcut_list if isinstance(item, Mapping)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def to_json(obj):
+    """json.dump 的 default 参数：记录按原来的dict格式写出"""
+    if type(obj) is ShortcutRecord:
+        return {OPER: obj.oper, KEY: obj.key}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,343 @@
+import time
+import threading
+from collections import OrderedDict
+
+from writer import WriteBehindQueue
+from records import to_records
+
+_MISSING = object()
+
+# ===================== 快捷键数据仓库【内存缓存 + mtime失效】 =====================
+class ShortcutRepository:
+    """内存缓存软件名称和快捷键列表，通过存储后端的标记（JSON后端为目录/文件mtime）判断是否需要重新读取"""
+
+    def __init__(self, backend, max_details=128, revalidate_interval=1.0, async_writes=True, snapshot=None):
+        self.backend = backend
+        # 整个库的二进制快照（snapshot.LibrarySnapshot），缓存未命中时标记没变的软件从快照解码，不解析原文件
+        self.snapshot = snapshot
+        self._snapshot_lock = threading.Lock()
+        # iter_all 时读取了原文件的软件：软件名 -> (标记, 快捷键列表)，写快照时直接使用，免得再解析一遍
+        self._fresh = {}
+        # 最多缓存多少个软件的快捷键列表，超出后淘汰最久未使用的
+        self.max_details = max_details
+        # 两次检查mtime之间的最小间隔（秒），网络同步盘上stat也不便宜
+        self.revalidate_interval = revalidate_interval
+        self._lock = threading.RLock()
+        self._names = None
+        self._names_stamp = None
+        self._names_checked = 0.0
+        # 软件名 -> [后端标记, 快捷键列表(ShortcutRecord), 上次检查时间]
+        self._details = OrderedDict()
+        # 已提交但还未写入后端的数据：软件名 -> 快捷键列表（None表示待删除），读取时优先使用
+        self._pending = {}
+        self.writer = WriteBehindQueue(backend, on_done=self._write_done) if async_writes else None
+        # 后台写入失败时回调 on_write_error(软件名, 错误信息)，在写入线程中调用
+        self.on_write_error = None
+        # 上次检查外部改动时每个软件的后端标记，None表示还没有建立基准
+        self._known = None
+
+    def list_names(self):
+        """获取所有软件名称，后端标记（JSON后端为目录mtime）未变化时直接返回缓存"""
+        with self._lock:
+            now = time.monotonic()
+            if self._names is not None and now - self._names_checked < self.revalidate_interval:
+                return self._overlay_names(self._names)
+            self._names_checked = now
+            stamp = self.backend.names_stamp()
+            if self._names is not None and stamp == self._names_stamp:
+                return self._overlay_names(self._names)
+            names = self.backend.list_names()
+            self._names = names
+            self._names_stamp = stamp
+            return self._overlay_names(names)
+
+    def _overlay_names(self, names):
+        if not self._pending:
+            return list(names)
+        names = [name for name in names if self._pending.get(name, _MISSING) is not None]
+        existing = set(names)
+        names.extend(name for name, value in self._pending.items() if value is not None and name not in existing)
+        return names
+
+    def get_detail(self, name):
+        """获取软件的快捷键列表（返回副本，调用方可随意修改）"""
+        with self._lock:
+            cached = self._cached_detail(name)
+            if cached is not None:
+                return list(cached)
+            stamp = self.backend.detail_stamp(name)
+            if stamp is None:
+                self._details.pop(name, None)
+                return []
+            shortcut_list = self._snapshot_detail(name, stamp)
+            if shortcut_list is None:
+                shortcut_list = to_records(self.backend.load(name))
+            self._cache_detail(name, stamp, shortcut_list)
+            return list(shortcut_list)
+
+    def _snapshot_detail(self, name, stamp):
+        """从快照解码，快照里没有或已过期时返回None；调用方持有锁"""
+        if self.snapshot is None:
+            return None
+        return self.snapshot.get(name, stamp)
+
+    def iter_all(self, priority=None):
+        """依次生成全部软件的 (软件名, 快捷键列表)，建索引用：目录只扫描一遍取得全部标记，不逐个stat；
+        标记与快照一致的软件直接解码，其余才读取原文件。列表不放入LRU缓存（全部放进去马上又被淘汰），调用方不要修改。
+        priority(软件名) 返回排序键时按它排序（稳定排序，键相同的保持原来的顺序）。
+        读取失败的软件提示后跳过，不影响其他软件"""
+        names = self.list_names()
+        if priority is not None:
+            names = sorted(names, key=priority)
+        stamps = self.backend.list_stamps()
+        for name in names:
+            stamp = stamps.get(name)
+            with self._lock:
+                pending = self._pending.get(name, _MISSING)
+                if pending is not _MISSING:
+                    shortcut_list = pending if pending is not None else []
+                else:
+                    entry = self._details.get(name)
+                    if entry is not None and entry[0] == stamp:
+                        shortcut_list = entry[1]
+                    else:
+                        shortcut_list = self._snapshot_detail(name, stamp) if stamp is not None else None
+            if shortcut_list is None:
+                try:
+                    shortcut_list = to_records(self.backend.load(name))
+                except Exception as e:
+                    print(f"读取数据失败，已跳过: {name} {e}")
+                    continue
+                if self.snapshot is not None and stamp is not None:
+                    with self._lock:
+                        self._fresh[name] = (stamp, shortcut_list)
+            yield name, shortcut_list
+
+    def snapshot_stale(self):
+        """上次 iter_all 读取过原文件，快照需要更新"""
+        return bool(self._fresh)
+
+    def is_cached(self, name):
+        """快捷键列表已在内存中（缓存有效或有待写入的数据），get_detail不会读取磁盘"""
+        with self._lock:
+            return self._cached_detail(name) is not None
+
+    def detail_size(self, name):
+        """估算从后端读取该软件需要处理的字节数"""
+        return self.backend.detail_size(name)
+
+    def iter_detail(self, name, chunk_size, first_chunk=None):
+        """分块获取快捷键列表，生成 (记录列表, 进度0~1)，可在后台线程调用；
+        从后端完整读完才放入缓存，中途停止迭代或文件损坏时不缓存不完整的数据"""
+        with self._lock:
+            cached = self._cached_detail(name)
+            stamp = self.backend.detail_stamp(name) if cached is None else None
+            if stamp is not None:
+                cached = self._snapshot_detail(name, stamp)
+                if cached is not None:
+                    self._cache_detail(name, stamp, cached)
+        if cached is not None:
+            total = max(1, len(cached))
+            start, size = 0, first_chunk or chunk_size
+            while True:
+                end = start + size
+                yield cached[start:end], min(1.0, end / total)
+                if end >= len(cached):
+                    return
+                start, size = end, chunk_size
+        if stamp is None:
+            return
+        shortcut_list = []
+        try:
+            for chunk, progress in self.backend.iter_load(name, chunk_size, first_chunk):
+                chunk = to_records(chunk)
+                shortcut_list.extend(chunk)
+                yield chunk, progress
+        except (OSError, ValueError) as e:
+            print(f"读取数据失败: {name} {e}")
+            return
+        with self._lock:
+            # 读取期间被保存或被外部修改过，读到的数据可能已经过期，不放入缓存
+            if name not in self._pending and self.backend.detail_stamp(name) == stamp:
+                self._cache_detail(name, stamp, shortcut_list)
+
+    def _cached_detail(self, name):
+        """命中缓存时返回内存中的列表（不是副本），否则返回None；调用方持有锁"""
+        pending = self._pending.get(name, _MISSING)
+        if pending is not _MISSING:
+            return pending if pending is not None else []
+        entry = self._details.get(name)
+        if entry is None:
+            return None
+        self._details.move_to_end(name)
+        now = time.monotonic()
+        if now - entry[2] >= self.revalidate_interval:
+            if self.backend.detail_stamp(name) != entry[0]:
+                return None
+            entry[2] = now
+        return entry[1]
+
+    def _cache_detail(self, name, stamp, shortcut_list):
+        self._details[name] = [stamp, shortcut_list, time.monotonic()]
+        self._details.move_to_end(name)
+        self._evict()
+
+    def _evict(self):
+        while len(self._details) > self.max_details:
+            self._details.popitem(last=False)
+
+    def save(self, name, shortcut_list):
+        """保存软件：异步模式下立即更新内存并交给后台写入，否则同步写入后端"""
+        self.save_many([(name, shortcut_list)])
+
+    def save_many(self, items):
+        """批量保存 [(软件名, 快捷键列表)]，作为一批写入后端；缓存中统一存为紧凑的记录"""
+        items = [(name, to_records(shortcut_list)) for name, shortcut_list in items]
+        if self.writer is None:
+            self.backend.save_many(items)
+            for name, shortcut_list in items:
+                self._store(name, shortcut_list)
+            return
+        with self._lock:
+            for name, shortcut_list in items:
+                self._pending[name] = shortcut_list
+                self._details.pop(name, None)
+        self.writer.submit_many(items)
+
+    def delete(self, name):
+        """删除软件，软件不存在时返回False"""
+        if self.writer is None:
+            if not self.backend.delete(name):
+                return False
+            self._remove(name)
+            return True
+        with self._lock:
+            pending = self._pending.get(name, _MISSING)
+            if pending is None:
+                return False
+            if pending is _MISSING and self.backend.detail_stamp(name) is None:
+                return False
+            self._pending[name] = None
+            self._details.pop(name, None)
+        self.writer.submit(name, None)
+        return True
+
+    def flush(self, timeout=None):
+        """等待后台写入全部完成"""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+
+    def close(self, timeout=None):
+        """写完剩余数据，停止后台线程并关闭后端"""
+        flushed = self.writer.close(timeout) if self.writer is not None else True
+        self.backend.close()
+        if self.snapshot is not None:
+            with self._snapshot_lock, self._lock:
+                self.snapshot.close()
+        return flushed
+
+    def save_snapshot(self):
+        """把全部软件写成快照，下次冷启动直接映射；快照已是最新时不重写。
+        缓存里标记有效的软件从内存编码，快照里没变的软件直接复制数据段，都没有的才读取原文件；
+        还没写入后端的软件跳过（标记对不上），下次启动时读原文件。返回快照中的软件数"""
+        if self.snapshot is None:
+            return 0
+        with self._snapshot_lock:
+            stamps = self.backend.list_stamps()
+            items = []
+            missing = []
+            with self._lock:
+                fresh, self._fresh = self._fresh, {}
+                if self.snapshot.is_current(stamps):
+                    return len(stamps)
+                for name, stamp in stamps.items():
+                    if name in self._pending:
+                        continue
+                    entry = self._details.get(name)
+                    if entry is None or entry[0] != stamp:
+                        entry = fresh.get(name)
+                    if entry is not None and entry[0] == stamp:
+                        items.append((name, stamp, entry[1]))
+                    elif self.snapshot.has(name, stamp):
+                        items.append((name, stamp, None))
+                    else:
+                        missing.append((name, stamp))
+            # 读取原文件不占用仓库的锁，界面线程照常读取
+            for name, stamp in missing:
+                shortcut_list = self.backend.load(name)
+                if self.backend.detail_stamp(name) == stamp:
+                    items.append((name, stamp, shortcut_list))
+            with self._lock:
+                return self.snapshot.write(items)
+
+    def _write_done(self, name, value, error):
+        with self._lock:
+            # 只有写入的正是最新提交的数据时才移除待写标记，否则还有更新的数据排队
+            if self._pending.get(name, _MISSING) is not value:
+                return
+            del self._pending[name]
+            if error is not None:
+                # 写入失败：丢弃内存中的数据，以磁盘为准重新读取
+                self._details.pop(name, None)
+                self._names = None
+            elif value is None:
+                self._remove(name)
+            else:
+                self._store(name, value)
+        if error is not None:
+            print(f"保存数据失败: {name} {error}")
+            if self.on_write_error is not None:
+                self.on_write_error(name, error)
+
+    def poll_changes(self):
+        """对比后端标记找出外部新增/修改/删除的软件，只让这些软件的缓存失效；首次调用只建立基准"""
+        with self._lock:
+            current = self.backend.list_stamps()
+            known = self._known
+            # 自己还没写完的软件以内存数据为准，不算外部改动
+            for name in self._pending:
+                if known is not None and name in known:
+                    current[name] = known[name]
+                else:
+                    current.pop(name, None)
+            self._known = current
+            if known is None:
+                return [], [], []
+            added = [name for name in current if name not in known]
+            removed = [name for name in known if name not in current]
+            changed = [name for name, stamp in current.items() if name in known and known[name] != stamp]
+            for name in changed + removed:
+                self._details.pop(name, None)
+            if self._names is not None and (added or removed):
+                removed_set = set(removed)
+                self._names = [name for name in self._names if name not in removed_set]
+                self._names.extend(name for name in added if name not in self._names)
+                self._names_stamp = self.backend.names_stamp()
+            return added, changed, removed
+
+    def _store(self, name, shortcut_list):
+        with self._lock:
+            stamp = self.backend.detail_stamp(name)
+            if self._known is not None:
+                self._known[name] = stamp
+            self._details[name] = [stamp, shortcut_list, time.monotonic()]
+            self._details.move_to_end(name)
+            self._evict()
+            if self._names is not None and name not in self._names:
+                self._names.append(name)
+
+    def _remove(self, name):
+        with self._lock:
+            if self._known is not None:
+                self._known.pop(name, None)
+            self._details.pop(name, None)
+            if self._names is not None and name in self._names:
+                self._names.remove(name)
+
+    def invalidate(self):
+        """清空全部缓存，下次访问时重新读取磁盘"""
+        with self._lock:
+            self._names = None
+            self._names_stamp = None
+            self._details.clear()
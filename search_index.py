@@ -0,0 +1,146 @@
+import re
+from collections import defaultdict
+
+from fuzzy import FuzzyNameMatcher
+from chords import ChordIndex, parse_query
+
+# 分词：连续的字母数字 或 连续的非ASCII字符（中文）算一个词
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[^\x00-\x7f]+")
+# 操作与快捷键之间的分隔符，避免跨字段拼出的二元组被误匹配
+FIELD_SEP = "\x00"
+
+
+def normalize(text):
+    """统一小写并去掉空白，"Ctrl + Shift + P" 与 "ctrl+shift+p" 视为相同"""
+    return "".join(str(text).lower().split())
+
+
+# ===================== 全文倒排索引【软件名称 + 操作 + 快捷键】 =====================
+class ShortcutIndex:
+    """软件名称交给模糊匹配（拼音、首字母、错字），操作和快捷键用词项 + 二元组(bigram)倒排表，支持按软件增量更新"""
+
+    def __init__(self):
+        self._next_id = 0
+        # 文档ID -> (软件名, 操作, 快捷键)
+        self._docs = {}
+        # 文档ID -> 归一化后的检索文本
+        self._texts = {}
+        # 软件名 -> 该软件的全部文档ID
+        self._soft_docs = {}
+        self._tokens = defaultdict(set)
+        self._grams = defaultdict(set)
+        # 单个中文字符的倒排表，支持输入一个字就能搜索
+        self._chars = defaultdict(set)
+        # 软件名称：前缀/子串/子序列/拼音/错字容忍，按相关度排序
+        self._names = FuzzyNameMatcher()
+        # 快捷键组合编码 -> 软件/操作，输入 "shift+ctrl+p" 也能精确反查到 "Ctrl+Shift+P"
+        self.chords = ChordIndex()
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def _keys(text):
+        tokens = set(TOKEN_PATTERN.findall(text))
+        grams = {text[i:i + 2] for i in range(len(text) - 1)}
+        grams = {g for g in grams if FIELD_SEP not in g}
+        chars = {c for c in text if ord(c) > 0x7f}
+        return tokens, grams, chars
+
+    def _add_doc(self, soft_name, oper, key, text):
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = (soft_name, oper, key)
+        self._texts[doc_id] = text
+        tokens, grams, chars = self._keys(text)
+        for token in tokens:
+            self._tokens[token].add(doc_id)
+        for gram in grams:
+            self._grams[gram].add(doc_id)
+        for char in chars:
+            self._chars[char].add(doc_id)
+        return doc_id
+
+    def _remove_doc(self, doc_id):
+        text = self._texts.pop(doc_id)
+        del self._docs[doc_id]
+        tokens, grams, chars = self._keys(text)
+        for table, keys in ((self._tokens, tokens), (self._grams, grams), (self._chars, chars)):
+            for key in keys:
+                postings = table.get(key)
+                if postings is not None:
+                    postings.discard(doc_id)
+                    if not postings:
+                        del table[key]
+
+    def update_software(self, soft_name, shortcut_list):
+        """新增或覆盖某个软件的全部文档"""
+        self._remove_docs(soft_name)
+        self._names.add(soft_name)
+        doc_ids = []
+        for item in shortcut_list:
+            try:
+                oper = str(item.get("操作", ""))
+                key = str(item.get("快捷键", ""))
+            except AttributeError:
+                continue
+            text = normalize(oper) + FIELD_SEP + normalize(key)
+            doc_ids.append(self._add_doc(soft_name, oper, key, text))
+        self._soft_docs[soft_name] = doc_ids
+        self.chords.update_software(soft_name, shortcut_list)
+
+    def remove_software(self, soft_name):
+        self._remove_docs(soft_name)
+        self._names.remove(soft_name)
+        self.chords.remove_software(soft_name)
+
+    def _remove_docs(self, soft_name):
+        for doc_id in self._soft_docs.pop(soft_name, []):
+            self._remove_doc(doc_id)
+
+    def _candidates(self, term):
+        """返回可能包含该词的文档ID集合（需再校验），取最小的几个倒排表求交集"""
+        if len(term) == 1:
+            table = self._chars if ord(term) > 0x7f else self._tokens
+            return table.get(term, set())
+        postings = []
+        for i in range(len(term) - 1):
+            gram = self._grams.get(term[i:i + 2])
+            if not gram:
+                return set()
+            postings.append(gram)
+        # 只取最小的倒排表，剩余条件交给逐条校验（命中足够多时提前结束，比大集合求交集更快）
+        return min(postings, key=len)
+
+    def search(self, query, limit=200):
+        """返回[(软件名, 操作, 快捷键)]：先是按相关度排序的软件名称命中（操作和快捷键为None，最多limit个），
+        再是快捷键命中（最多limit个）：输入本身是快捷键组合时，组合完全相同的排在最前，
+        其余是多个关键词(空格分隔)同时匹配的"""
+        terms = [normalize(t) for t in str(query).lower().split()]
+        terms = [t for t in terms if t]
+        if not terms:
+            return []
+        # 软件名称把多个关键词连起来匹配，"visual code" 也能按子序列匹配到 Visual Studio Code
+        name_hits = [(name, None, None) for name in self._names.search("".join(terms), limit)]
+        chord_hits = []
+        for code in parse_query(query):
+            chord_hits.extend(self.chords.lookup(code))
+        chord_hits = chord_hits[:limit]
+        candidate_sets = []
+        for term in terms:
+            candidates = self._candidates(term)
+            if not candidates:
+                return name_hits + chord_hits
+            candidate_sets.append(candidates)
+        candidates = min(candidate_sets, key=len)
+        texts = self._texts
+        docs = self._docs
+        shortcut_hits = chord_hits
+        seen = set(chord_hits)
+        for doc_id in candidates:
+            if len(shortcut_hits) >= limit:
+                break
+            text = texts[doc_id]
+            if all(term in text for term in terms) and docs[doc_id] not in seen:
+                shortcut_hits.append(docs[doc_id])
+        return name_hits + shortcut_hits
@@ -0,0 +1,192 @@
+import os
+import gc
+import mmap
+import zlib
+import struct
+import marshal
+
+from records import ShortcutRecord
+
+# ===================== 二进制快照【整个库一个文件，冷启动映射后直接解码】 =====================
+# 冷启动建索引要解析每个软件的JSON，软件多了很慢。退出程序、批量导入之后把全部软件写进 data/.library.snapshot：
+#   文件头   魔数 b"SKHS"、格式版本、保留、索引长度、索引crc32（struct，小端）
+#   索引     marshal编码的 (后端类型, {软件名: (标记, 偏移, 长度, crc32)})，标记即存储后端的 detail_stamp（mtime + 大小）
+#   数据区   每个软件一段，marshal编码的 (操作元组, 快捷键元组)，偏移从数据区开头算起
+# 启动时映射文件、校验文件头和索引，与目录扫描一遍得到的标记逐个比对：相同的软件从快照解码（数据段再单独校验crc），
+# 不同或快照里没有的才解析JSON。文件缺失、版本不符或损坏时整个快照作废，按原来的方式全部读取，下次写入时重建。
+
+SNAPSHOT_FILENAME = ".library.snapshot"
+SNAPSHOT_MAGIC = b"SKHS"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+
+
+def encode_list(shortcut_list):
+    opers = tuple(str(item.get("操作", "")) for item in shortcut_list)
+    keys = tuple(str(item.get("快捷键", "")) for item in shortcut_list)
+    return marshal.dumps((opers, keys))
+
+
+def decode_list(data):
+    opers, keys = marshal.loads(data)
+    # 与 to_records 相同：大量创建小对象时暂停循环垃圾回收
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [ShortcutRecord(oper, key) for oper, key in zip(opers, keys)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+class LibrarySnapshot:
+    """快照文件的读写；不加锁，由 ShortcutRepository 在自己的锁内调用"""
+
+    def __init__(self, path, kind):
+        self.path = path
+        # 存储后端类型，不同后端的标记不能混用
+        self.kind = kind
+        self._opened = False
+        self._file = None
+        self._map = None
+        self._data_start = 0
+        # 软件名 -> (标记, 偏移, 长度, crc32)
+        self._entries = {}
+
+    def __len__(self):
+        self.open()
+        return len(self._entries)
+
+    def open(self):
+        """映射快照并读出索引，只执行一次；不存在或损坏时当作空快照"""
+        if self._opened:
+            return
+        self._opened = True
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"读取快照失败: {self.path} {e}")
+            return
+        try:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError("文件不完整")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            f.close()
+            print(f"快照已损坏，将重新读取全部数据: {self.path} {e}")
+            return
+        self._file, self._map = f, mapped
+        try:
+            self._entries = self._read_index()
+        except (ValueError, EOFError, TypeError) as e:
+            print(f"快照已损坏，将重新读取全部数据: {self.path} {e}")
+            self.close()
+
+    def _read_index(self):
+        magic, version, _, index_length, index_crc = _HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("不是快照文件")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"格式版本不符（{version}）")
+        self._data_start = _HEADER.size + index_length
+        index = self._map[_HEADER.size:self._data_start]
+        if len(index) != index_length or zlib.crc32(index) != index_crc:
+            raise ValueError("索引校验失败")
+        kind, entries = marshal.loads(index)
+        if kind != self.kind:
+            # 换了存储后端，标记含义不同，旧快照不能用
+            return {}
+        data_length = len(self._map) - self._data_start
+        for stamp, offset, length, crc in entries.values():
+            if offset < 0 or length < 0 or offset + length > data_length:
+                raise ValueError("数据区不完整")
+        return entries
+
+    def close(self):
+        """解除映射（Windows下映射中的文件不能被替换）"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._entries = {}
+
+    def has(self, name, stamp):
+        self.open()
+        entry = self._entries.get(name)
+        return entry is not None and entry[0] == stamp
+
+    def _raw(self, name):
+        """软件的数据段，校验失败时从索引中去掉并返回None"""
+        _, offset, length, crc = self._entries[name]
+        start = self._data_start + offset
+        data = self._map[start:start + length]
+        if zlib.crc32(data) != crc:
+            print(f"快照中【{name}】的数据已损坏，改为读取原文件")
+            del self._entries[name]
+            return None
+        return data
+
+    def get(self, name, stamp):
+        """标记与快照一致时返回快捷键记录列表，否则返回None"""
+        if not self.has(name, stamp):
+            return None
+        data = self._raw(name)
+        if data is None:
+            return None
+        try:
+            return decode_list(data)
+        except (ValueError, EOFError, TypeError) as e:
+            print(f"快照中【{name}】的数据已损坏，改为读取原文件: {e}")
+            del self._entries[name]
+            return None
+
+    def is_current(self, stamps):
+        """快照内容与 {软件名: 标记} 完全一致，不需要重写"""
+        self.open()
+        if len(stamps) != len(self._entries):
+            return False
+        return all(self.has(name, stamp) for name, stamp in stamps.items())
+
+    def write(self, items):
+        """写入新快照并替换旧文件：items 为 [(软件名, 标记, 快捷键列表)]，
+        快捷键列表为None表示沿用旧快照里标记相同的数据段（直接复制，不解码）"""
+        self.open()
+        entries = {}
+        blobs = []
+        offset = 0
+        for name, stamp, shortcut_list in items:
+            if shortcut_list is not None:
+                data = encode_list(shortcut_list)
+            else:
+                data = self._raw(name) if name in self._entries else None
+            if data is None:
+                continue
+            entries[name] = (stamp, offset, len(data), zlib.crc32(data))
+            blobs.append(data)
+            offset += len(data)
+        index = marshal.dumps((self.kind, entries))
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(index), zlib.crc32(index)))
+                f.write(index)
+                for data in blobs:
+                    f.write(data)
+            self.close()
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            # 下次使用时重新映射新文件（替换失败时仍是旧文件）
+            self.close()
+            self._opened = False
+        return len(entries)
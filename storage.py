@@ -0,0 +1,700 @@
+import os
+import re
+import json
+import time
+import codecs
+import threading
+from collections import OrderedDict
+
+from records import ShortcutRecord, to_json, to_records
+
+# ===================== 存储后端【JSON目录 / SQLite单文件】 =====================
+# 两个后端提供相同的接口，ShortcutRepository只通过这些方法访问数据：
+#   names_stamp() / list_names()        软件名称列表及其变化标记
+#   detail_stamp(name) / load(name)     单个软件的快捷键列表及其变化标记
+#   detail_size(name) / iter_load(...)  估算读取量（字节）、分块读取快捷键列表，供大文件在后台逐步加载
+#   save(name, list) / save_many(items) 写入（save_many在一个事务里批量写入）
+#   delete(name)                        删除，成功返回True
+#   list_stamps() / watch_paths()       全部软件的标记（用于找出外部改动）、需要监听的文件路径
+# 标记(stamp)只用于判断缓存是否过期，值相等即认为数据没有变化，None表示不存在。
+# JournalBackend 与JSON目录共用文件格式，另外把小改动追加到每个软件的日志文件里，见下文。
+
+# 流式读取时每次从文件读入的字节数
+READ_BLOCK = 64 * 1024
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+class _JsonStream:
+    """按块读取文件，用 JSONDecoder.raw_decode 一个值一个值地解析，不需要把整个文件读进内存"""
+    def __init__(self, f):
+        self.f = f
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        # scan_once 是 raw_decode 内部用的扫描函数，省去每个值一层包装
+        self._scan = json.JSONDecoder().scan_once
+
+    def _fill(self):
+        block = self.f.read(READ_BLOCK)
+        self.bytes_read += len(block)
+        if not block:
+            self.eof = True
+        self.text = self.text[self.pos:] + self._decoder.decode(block, final=self.eof)
+        self.pos = 0
+
+    def peek(self):
+        """跳过空白，返回下一个字符，文件结束时返回空字符串"""
+        while True:
+            text = self.text
+            pos = self.pos = _WHITESPACE.match(text, self.pos).end()
+            if pos < len(text):
+                return text[pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON格式错误：第{self.pos}个字符附近应为 {char!r}")
+        self.pos += 1
+
+    def value(self):
+        """解析下一个完整的JSON值；缓冲区里的内容不完整时继续读取"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._scan(self.text, self.pos)
+                # 数字等值可能刚好被块边界截断，后面还有内容才能确认解析完整
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except StopIteration:
+                if self.eof:
+                    raise json.JSONDecodeError("Expecting value", self.text, self.pos) from None
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+def iter_json_list(path, key, chunk_size, first_chunk=None):
+    """流式解析 {..., key: [元素, ...], ...} 中的数组，分块生成 (元素列表, 已读取的比例)；
+    其他字段解析后丢弃，找不到key时什么也不生成。first_chunk 为第一块的大小（先填满一屏）。
+    最后一块的进度为1.0且不会是空块；空数组与 iter_chunks 一样生成一个空块"""
+    total = max(1, os.path.getsize(path))
+    with open(path, "rb") as f:
+        stream = _JsonStream(f)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            name = stream.value()
+            stream.expect(":")
+            if name != key:
+                stream.value()
+            else:
+                stream.expect("[")
+                chunk = []
+                limit = first_chunk or chunk_size
+                if stream.peek() != "]":
+                    while True:
+                        chunk.append(stream.value())
+                        if stream.peek() != ",":
+                            break
+                        stream.pos += 1
+                        # 后面还有元素时才交出已满的块，最后一块总带着剩下的元素和进度1.0
+                        if len(chunk) >= limit:
+                            yield chunk, min(1.0, stream.bytes_read / total)
+                            chunk = []
+                            limit = chunk_size
+                stream.expect("]")
+                yield chunk, 1.0
+                return
+            if stream.peek() != ",":
+                break
+            stream.pos += 1
+        stream.expect("}")
+
+def iter_chunks(items, chunk_size, first_chunk=None):
+    """把已在内存中的列表按块切分，生成 (切片, 进度0~1)，空列表也生成一个空块"""
+    total = max(1, len(items))
+    start = 0
+    size = first_chunk or chunk_size
+    while True:
+        end = start + size
+        yield items[start:end], min(1.0, end / total)
+        if end >= len(items):
+            return
+        start = end
+        size = chunk_size
+
+class JsonDirBackend:
+    """默认后端：每个软件一个JSON文件，方便手动编辑和同步"""
+    kind = "json"
+
+    def __init__(self, data_dir, fsync=False):
+        self.data_dir = data_dir
+        # 写入后是否fsync，断电也不丢数据，但在慢盘上更耗时
+        self.fsync = fsync
+
+    def file_path(self, name):
+        return os.path.join(self.data_dir, f"{name}.json")
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def names_stamp(self):
+        return self._stat(self.data_dir)
+
+    def list_names(self):
+        names = []
+        if not os.path.isdir(self.data_dir):
+            return names
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    names.append(entry.name[:-5])
+        return names
+
+    def detail_stamp(self, name):
+        return self._stat(self.file_path(name))
+
+    def list_stamps(self):
+        stamps = {}
+        if not os.path.isdir(self.data_dir):
+            return stamps
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    stamps[entry.name[:-5]] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def watch_paths(self):
+        """目录本身（新增/删除/重命名）+ 每个JSON文件（原地修改）"""
+        if not os.path.isdir(self.data_dir):
+            return []
+        return [self.data_dir] + [self.file_path(name) for name in self.list_names()]
+
+    def load(self, name):
+        path = self.file_path(name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            shortcut_list = data.get("shortcut_list", [])
+            return shortcut_list if isinstance(shortcut_list, list) else []
+        except Exception as e:
+            print(f"读取数据失败: {path} {e}")
+            return []
+
+    def detail_size(self, name):
+        stamp = self.detail_stamp(name)
+        return stamp[1] if stamp is not None else 0
+
+    def iter_load(self, name, chunk_size, first_chunk=None):
+        """流式解析JSON文件，分块生成 (快捷键列表, 进度0~1)；文件损坏时抛出异常，由调用方处理"""
+        return iter_json_list(self.file_path(name), "shortcut_list", chunk_size, first_chunk)
+
+    def save(self, name, shortcut_list):
+        save_data = {
+            "software_name": name,
+            "shortcut_list": list(shortcut_list)
+        }
+        self._write_json(self.file_path(name), save_data)
+
+    def _write_json(self, path, save_data):
+        os.makedirs(self.data_dir, exist_ok=True)
+        # 先写临时文件再原子替换，写到一半崩溃也不会留下被截断的JSON
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(save_data, f, ensure_ascii=False, indent=2, default=to_json)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def save_many(self, items):
+        for name, shortcut_list in items:
+            self.save(name, shortcut_list)
+
+    def delete(self, name):
+        path = self.file_path(name)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+
+    def close(self):
+        pass
+
+# ===================== 日志后端【小改动追加写，超过阈值再压缩成快照】 =====================
+# 每个软件仍是一个 name.json 快照（多一个 generation 字段），保存时只把与上次的差异追加到 name.journal：
+#   第一行 {"base": 快照的generation}，之后每行一条操作
+#   ["set", 位置, 操作, 快捷键] / ["add", 位置, 操作, 快捷键] / ["del", 位置, 条数]
+# 读取时先读快照再依次重放日志；日志超过阈值时重写快照（新的generation）并删除日志。
+# base 与快照的 generation 不一致的日志是压缩后没来得及删除的，内容已经在快照里，直接忽略。
+# 只有以换行结尾的行才算写完整：最后一条写到一半断电时丢弃它，下次追加前先截掉。
+
+JOURNAL_SUFFIX = ".journal"
+# 日志达到这个大小（字节）时一定压缩
+JOURNAL_MAX_BYTES = 1024 * 1024
+# 日志超过快照大小的这个比例、且不小于 JOURNAL_MIN_BYTES 时压缩
+JOURNAL_RATIO = 0.5
+JOURNAL_MIN_BYTES = 4 * 1024
+# 在内存里保留最近多少个软件的当前数据，用来计算与新数据的差异
+JOURNAL_STATE_CACHE = 32
+
+def diff_ops(old, new):
+    """计算把 old 变成 new 的日志操作：去掉相同的开头和结尾，中间部分逐条替换，多出的新增或删除"""
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and (old[start] is new[start] or old[start] == new[start]):
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and (
+            old[end_old - 1] is new[end_new - 1] or old[end_old - 1] == new[end_new - 1]):
+        end_old -= 1
+        end_new -= 1
+    common = min(end_old, end_new) - start
+    ops = []
+    for pos in range(start, end_new):
+        item = new[pos]
+        ops.append(["set" if pos < start + common else "add", pos,
+                    str(item.get("操作", "")), str(item.get("快捷键", ""))])
+    if end_old - start > common:
+        ops.append(["del", start + common, end_old - start - common])
+    return ops
+
+def replay_op(shortcut_list, op):
+    """在快捷键列表上原地重放一条日志操作，记录无效（位置越界、格式不对）时抛出ValueError"""
+    try:
+        kind, pos = op[0], op[1]
+        if kind == "set" and 0 <= pos < len(shortcut_list):
+            shortcut_list[pos] = ShortcutRecord(str(op[2]), str(op[3]))
+        elif kind == "add" and 0 <= pos <= len(shortcut_list):
+            shortcut_list.insert(pos, ShortcutRecord(str(op[2]), str(op[3])))
+        elif kind == "del" and 0 <= pos and 0 < op[2] and pos + op[2] <= len(shortcut_list):
+            del shortcut_list[pos:pos + op[2]]
+        else:
+            raise ValueError
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise ValueError(f"无效的日志记录: {op!r}") from None
+
+def read_journal(path, generation):
+    """读取日志，返回 (表头结束位置, [(操作, 该行结束位置)])；日志不存在或不属于当前快照时返回 (0, [])。
+    遇到不完整或无法解析的行就停止，之后的内容视为写到一半的记录"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0, []
+    header_end = 0
+    records = []
+    end = 0
+    while True:
+        newline = data.find(b"\n", end)
+        if newline < 0:
+            break
+        try:
+            record = json.loads(data[end:newline])
+        except ValueError:
+            break
+        end = newline + 1
+        if not header_end:
+            if not isinstance(record, dict) or record.get("base") != generation:
+                return 0, []
+            header_end = end
+        else:
+            records.append((record, end))
+    if end < len(data):
+        print(f"日志末尾有不完整的记录，已忽略: {path}")
+    return header_end, records
+
+def needs_compaction(snapshot_size, journal_size):
+    return journal_size >= JOURNAL_MAX_BYTES or (
+        journal_size >= JOURNAL_MIN_BYTES and journal_size > snapshot_size * JOURNAL_RATIO)
+
+class JournalBackend(JsonDirBackend):
+    """JSON目录 + 追加日志：改一两条快捷键只追加几十字节，不必重写整个文件"""
+    kind = "journal"
+
+    def __init__(self, data_dir, fsync=False):
+        super().__init__(data_dir, fsync)
+        self._lock = threading.RLock()
+        # 软件名 -> (标记, generation, 当前快捷键列表, 日志有效长度)，最近使用的在后
+        self._states = OrderedDict()
+
+    def journal_path(self, name):
+        return os.path.join(self.data_dir, f"{name}{JOURNAL_SUFFIX}")
+
+    def detail_stamp(self, name):
+        snapshot = self._stat(self.file_path(name))
+        if snapshot is None:
+            return None
+        return snapshot + (self._stat(self.journal_path(name)),)
+
+    def _scan(self):
+        """一次遍历目录，返回 (快照标记, 日志标记)"""
+        snapshots, journals = {}, {}
+        if not os.path.isdir(self.data_dir):
+            return snapshots, journals
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    table, name = snapshots, entry.name[:-5]
+                elif entry.name.endswith(JOURNAL_SUFFIX):
+                    table, name = journals, entry.name[:-len(JOURNAL_SUFFIX)]
+                else:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                table[name] = (st.st_mtime_ns, st.st_size)
+        return snapshots, journals
+
+    def list_stamps(self):
+        snapshots, journals = self._scan()
+        return {name: stamp + (journals.get(name),) for name, stamp in snapshots.items()}
+
+    def watch_paths(self):
+        """目录 + 每个快照 + 已有的日志（追加写不会改变目录的修改时间）"""
+        if not os.path.isdir(self.data_dir):
+            return []
+        snapshots, journals = self._scan()
+        return ([self.data_dir] + [self.file_path(name) for name in snapshots]
+                + [self.journal_path(name) for name in journals if name in snapshots])
+
+    def _remember(self, name, state):
+        self._states[name] = state
+        self._states.move_to_end(name)
+        while len(self._states) > JOURNAL_STATE_CACHE:
+            self._states.popitem(last=False)
+
+    def _state(self, name):
+        """当前数据 (标记, generation, 快捷键列表, 日志有效长度)，软件不存在时返回None；调用方持有锁"""
+        stamp = self.detail_stamp(name)
+        state = self._states.get(name)
+        if state is not None and state[0] == stamp:
+            self._states.move_to_end(name)
+            return state
+        self._states.pop(name, None)
+        if stamp is None:
+            return None
+        path = self.file_path(name)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("格式错误")
+        generation = data.get("generation")
+        shortcut_list = to_records(data.get("shortcut_list", []))
+        journal_end = 0
+        if generation is not None:
+            journal_end, records = read_journal(self.journal_path(name), generation)
+            for record, end in records:
+                try:
+                    replay_op(shortcut_list, record)
+                except ValueError as e:
+                    print(f"{e}，忽略之后的日志: {path}")
+                    break
+                journal_end = end
+        state = (stamp, generation, shortcut_list, journal_end)
+        self._remember(name, state)
+        return state
+
+    def load(self, name):
+        with self._lock:
+            try:
+                state = self._state(name)
+            except Exception as e:
+                print(f"读取数据失败: {self.file_path(name)} {e}")
+                return []
+        return list(state[2]) if state is not None else []
+
+    def detail_size(self, name):
+        stamp = self.detail_stamp(name)
+        if stamp is None:
+            return 0
+        return stamp[1] + (stamp[2][1] if stamp[2] is not None else 0)
+
+    def iter_load(self, name, chunk_size, first_chunk=None):
+        """没有日志时直接流式解析快照；有日志时要先重放才知道结果，整体读出后再分块"""
+        if self._stat(self.journal_path(name)) is None:
+            return super().iter_load(name, chunk_size, first_chunk)
+        return self._iter_state(name, chunk_size, first_chunk)
+
+    def _iter_state(self, name, chunk_size, first_chunk):
+        with self._lock:
+            state = self._state(name)
+        if state is None:
+            raise FileNotFoundError(self.file_path(name))
+        yield from iter_chunks(state[2], chunk_size, first_chunk)
+
+    def save(self, name, shortcut_list):
+        shortcut_list = to_records(shortcut_list)
+        with self._lock:
+            try:
+                state = self._state(name)
+            except (OSError, ValueError) as e:
+                print(f"读取数据失败，改为重写快照: {self.file_path(name)} {e}")
+                state = None
+            if state is None or state[1] is None:
+                # 新软件、损坏的快照或JSON目录模式写的快照（没有generation）：直接写快照
+                self._compact(name, shortcut_list)
+                return
+            stamp, generation, old_list, journal_end = state
+            ops = diff_ops(old_list, shortcut_list)
+            if not ops:
+                return
+            lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8")
+            snapshot_size = stamp[1]
+            if len(lines) > snapshot_size * JOURNAL_RATIO or needs_compaction(snapshot_size, journal_end + len(lines)):
+                self._compact(name, shortcut_list)
+                return
+            journal_end = self._append(name, generation, journal_end, lines)
+            self._remember(name, (self.detail_stamp(name), generation, shortcut_list, journal_end))
+
+    def _append(self, name, generation, journal_end, lines):
+        """追加日志记录，先截掉有效长度之后的残留（写到一半的记录），返回新的有效长度"""
+        with open(self.journal_path(name), "r+b" if journal_end else "wb") as f:
+            if journal_end:
+                f.seek(journal_end)
+                f.truncate()
+            else:
+                f.write((json.dumps({"base": generation}) + "\n").encode("utf-8"))
+            f.write(lines)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def _compact(self, name, shortcut_list):
+        """重写快照（新的generation）并删除日志；删除失败时旧日志因generation不符会被忽略"""
+        previous = self._states.get(name)
+        generation = time.time_ns()
+        if previous is not None and previous[1] == generation:
+            generation += 1
+        save_data = {
+            "software_name": name,
+            "generation": generation,
+            "shortcut_list": list(shortcut_list)
+        }
+        self._write_json(self.file_path(name), save_data)
+        try:
+            os.remove(self.journal_path(name))
+        except FileNotFoundError:
+            pass
+        self._remember(name, (self.detail_stamp(name), generation, shortcut_list, 0))
+
+    def compact_all(self):
+        """把所有日志合并进快照，返回合并的软件数量（切换回其他存储后端前调用）"""
+        snapshots, journals = self._scan()
+        count = 0
+        with self._lock:
+            for name in journals:
+                try:
+                    state = self._state(name) if name in snapshots else None
+                except (OSError, ValueError) as e:
+                    print(f"合并日志失败: {self.journal_path(name)} {e}")
+                    continue
+                if state is not None and state[3]:
+                    self._compact(name, state[2])
+                    count += 1
+                else:
+                    # 没有对应快照或已经过期的日志
+                    try:
+                        os.remove(self.journal_path(name))
+                    except FileNotFoundError:
+                        pass
+        return count
+
+    def delete(self, name):
+        with self._lock:
+            self._states.pop(name, None)
+            existed = super().delete(name)
+            try:
+                os.remove(self.journal_path(name))
+            except FileNotFoundError:
+                pass
+            return existed
+
+class SqliteBackend:
+    """单文件后端：所有软件和快捷键存放在一个SQLite数据库里，带索引，批量写入走事务"""
+    kind = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS software (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        revision INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS shortcut (
+        software_id INTEGER NOT NULL REFERENCES software(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        operation TEXT NOT NULL,
+        keys TEXT NOT NULL,
+        PRIMARY KEY (software_id, position)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_shortcut_keys ON shortcut(keys);
+    CREATE INDEX IF NOT EXISTS idx_shortcut_operation ON shortcut(operation);
+    """
+
+    def __init__(self, db_path):
+        # 只有选用SQLite后端时才加载sqlite3
+        import sqlite3
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        # 本进程写入计数，配合 PRAGMA data_version（其他连接提交时变化）判断名称列表是否过期
+        self._local_version = 0
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+
+    def names_stamp(self):
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._local_version)
+
+    def list_names(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM software ORDER BY id")]
+
+    def detail_stamp(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT id, revision FROM software WHERE name = ?", (name,)).fetchone()
+            return tuple(row) if row is not None else None
+
+    def list_stamps(self):
+        with self._lock:
+            return {name: (sid, revision) for sid, name, revision in
+                    self._conn.execute("SELECT id, name, revision FROM software")}
+
+    def watch_paths(self):
+        paths = [self.db_path, f"{self.db_path}-wal"]
+        return [path for path in paths if os.path.exists(path)]
+
+    def load(self, name):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.operation, s.keys FROM shortcut s JOIN software w ON w.id = s.software_id "
+                "WHERE w.name = ? ORDER BY s.position", (name,)).fetchall()
+        return [ShortcutRecord(oper, key) for oper, key in rows]
+
+    # 估算读取量时每条快捷键按多少字节计算，与JSON文件大小大致相当
+    ROW_BYTES = 64
+
+    def detail_size(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM shortcut s JOIN software w ON w.id = s.software_id WHERE w.name = ?",
+                (name,)).fetchone()
+        return row[0] * self.ROW_BYTES
+
+    def iter_load(self, name, chunk_size, first_chunk=None):
+        """一次查询取出所有行（同一条语句保证数据一致），转换成记录的工作分块进行"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.operation, s.keys FROM shortcut s JOIN software w ON w.id = s.software_id "
+                "WHERE w.name = ? ORDER BY s.position", (name,)).fetchall()
+        for chunk, progress in iter_chunks(rows, chunk_size, first_chunk):
+            yield [ShortcutRecord(oper, key) for oper, key in chunk], progress
+
+    def _write(self, name, shortcut_list):
+        row = self._conn.execute("SELECT id FROM software WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            software_id = self._conn.execute("INSERT INTO software (name) VALUES (?)", (name,)).lastrowid
+        else:
+            software_id = row[0]
+            self._conn.execute("UPDATE software SET revision = revision + 1 WHERE id = ?", (software_id,))
+        self._conn.execute("DELETE FROM shortcut WHERE software_id = ?", (software_id,))
+        self._conn.executemany(
+            "INSERT INTO shortcut (software_id, position, operation, keys) VALUES (?, ?, ?, ?)",
+            ((software_id, pos, str(item.get("操作", "")), str(item.get("快捷键", "")))
+             for pos, item in enumerate(shortcut_list)))
+
+    def save(self, name, shortcut_list):
+        self.save_many([(name, shortcut_list)])
+
+    def save_many(self, items):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name, shortcut_list in items:
+                    self._write(name, shortcut_list)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._local_version += 1
+
+    def delete(self, name):
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM software WHERE name = ?", (name,))
+            self._local_version += 1
+            return cur.rowcount > 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def migrate_json_to_sqlite(data_dir, db_path):
+    """一次性迁移：把 data/*.json 全部导入SQLite数据库（单个事务），返回迁移的软件数量"""
+    source = JsonDirBackend(data_dir)
+    target = SqliteBackend(db_path)
+    try:
+        items = [(name, to_records(source.load(name))) for name in source.list_names()]
+        target.save_many(items)
+    finally:
+        target.close()
+    return len(items)
+
+# open_backend 认识的存储后端名称
+BACKEND_KINDS = ("json", "journal", "sqlite")
+
+def has_journals(data_dir):
+    """数据目录里有没有修改日志（日志模式留下的），遍历一遍目录，不读文件"""
+    try:
+        with os.scandir(data_dir) as it:
+            return any(entry.name.endswith(JOURNAL_SUFFIX) for entry in it)
+    except OSError:
+        return False
+
+def open_backend(kind, data_dir, db_path=None, fsync=False):
+    """按名称创建存储后端（json / journal / sqlite）；首次使用SQLite时自动从JSON目录迁移。
+    不认识的名称抛出ValueError，免得配置写错时看起来像是一个空的库"""
+    if kind not in BACKEND_KINDS:
+        raise ValueError(f"未知的存储后端：{kind}（可选 {' / '.join(BACKEND_KINDS)}）")
+    if kind == "journal":
+        return JournalBackend(data_dir, fsync=fsync)
+    # 从日志模式切换过来：先把日志合并进快照，JSON目录和SQLite迁移都只读快照；没有日志时不必构造日志后端
+    if has_journals(data_dir):
+        compacted = JournalBackend(data_dir, fsync=fsync).compact_all()
+        if compacted:
+            print(f"已将 {compacted} 个软件的修改日志合并进JSON文件")
+    if kind == "sqlite":
+        db_path = db_path or os.path.join(data_dir, "shortcuts.db")
+        if not os.path.exists(db_path) and JsonDirBackend(data_dir).list_names():
+            count = migrate_json_to_sqlite(data_dir, db_path)
+            print(f"已将 {count} 个软件从JSON目录迁移到 {db_path}")
+        return SqliteBackend(db_path)
+    return JsonDirBackend(data_dir, fsync=fsync)
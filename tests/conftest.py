@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# 模块都在仓库根目录下，不是包
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """DataManager 指向临时数据目录，用完写完并切回默认目录"""
+    path = str(tmp_path / "data")
+    os.makedirs(path)
+    DataManager.configure(data_dir=path, storage="json")
+    yield path
+    DataManager.flush()
+    DataManager.configure()
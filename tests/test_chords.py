@@ -0,0 +1,52 @@
+from chords import ChordIndex, format_sequence, parse_bindings, parse_chord, parse_sequence
+
+
+def shortcut(oper, key):
+    return {"操作": oper, "快捷键": key}
+
+
+def test_parse_chord_normalises():
+    code = parse_chord("Ctrl+C")
+    assert code is not None
+    assert parse_chord("ctrl+c") == code
+    assert parse_sequence(" CTRL + c ") == code
+    assert parse_chord("Ctrl-C") == code
+    assert parse_chord("shift+ctrl+a") == parse_chord("Ctrl+Shift+A")
+    assert parse_chord("Foo+A") is None
+
+
+def test_parse_sequence_and_bindings():
+    assert format_sequence(parse_sequence("ctrl+k ctrl+s")) == "Ctrl+K, Ctrl+S"
+    assert parse_bindings("Ctrl+C / Ctrl+Insert") == (parse_chord("Ctrl+C"), parse_chord("Ctrl+Insert"))
+    assert parse_bindings("随便写的") == ()
+
+
+def test_lookup():
+    index = ChordIndex()
+    index.update_software("VS Code", [shortcut("复制", "Ctrl+C")])
+    index.update_software("微信", [shortcut("复制", "ctrl+c")])
+    assert sorted(index.lookup(parse_chord("Ctrl+C"))) == [("VS Code", "复制", "Ctrl+C"), ("微信", "复制", "ctrl+c")]
+    index.remove_software("VS Code")
+    assert index.lookup(parse_chord("Ctrl+C")) == [("微信", "复制", "ctrl+c")]
+
+
+def test_conflicts():
+    index = ChordIndex()
+    index.update_software("VS Code", [shortcut("复制", "Ctrl+C"), shortcut("保存", "Ctrl+S")])
+    duplicates, shared = index.conflicts("微信", [
+        shortcut("截图", "Alt+A"),
+        shortcut("复制", "ctrl+c"),
+        shortcut("撤销", "Ctrl+Z"),
+        shortcut("重做", "ctrl+z"),
+    ])
+    assert duplicates == [(parse_chord("Ctrl+Z"), ["撤销", "重做"])]
+    assert shared == [(parse_chord("Ctrl+C"), "复制", [("VS Code", "复制")])]
+
+
+def test_conflicts_skip_saved_codes():
+    """已保存过的组合不再提示与其他软件共用"""
+    index = ChordIndex()
+    index.update_software("VS Code", [shortcut("复制", "Ctrl+C")])
+    index.update_software("微信", [shortcut("复制", "Ctrl+C")])
+    assert index.conflicts("微信", [shortcut("复制", "Ctrl+C")]) == ([], [])
+    assert index.conflicts("VS Code", [shortcut("复制", "Ctrl+C")]) == ([], [])
@@ -0,0 +1,40 @@
+import pytest
+
+from fuzzy import FuzzyNameMatcher
+
+NAMES = ["微信", "微博", "企业微信", "PyCharm", "Word", "Visual Studio Code"]
+
+
+@pytest.fixture
+def matcher():
+    matcher = FuzzyNameMatcher()
+    matcher.set_names(NAMES)
+    return matcher
+
+
+def test_pinyin_initials(matcher):
+    assert matcher.search("wx") == ["微信", "企业微信"]
+    assert matcher.search("qywx") == ["企业微信"]
+    assert matcher.search("wb") == ["微博"]
+
+
+def test_word_initials(matcher):
+    assert matcher.search("vsc") == ["Visual Studio Code"]
+
+
+def test_one_typo(matcher):
+    # 相邻两个字母写反算一处错误
+    assert matcher.search("pychram") == ["PyCharm"]
+    assert matcher.search("zzzz") == []
+
+
+def test_pinyin_tie_break(matcher):
+    """同档同分时按拼音排序（weibo < weixin），而不是按汉字编码（信 < 博）"""
+    assert matcher.search("微") == ["微博", "微信", "企业微信"]
+
+
+def test_add_remove(matcher):
+    matcher.remove("微博")
+    assert matcher.search("wb") == []
+    matcher.add("微博")
+    assert matcher.search("wb") == ["微博"]
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+from data_manager import DataManager
+
+
+def shortcuts(version):
+    return [{"操作": f"操作{i}", "快捷键": f"Ctrl+{version}"} for i in range(3)]
+
+
+def keys_on_disk(data_dir, name):
+    with open(os.path.join(data_dir, f"{name}.json"), "r", encoding="utf-8") as f:
+        return [item["快捷键"] for item in json.load(f)["shortcut_list"]]
+
+
+def edit_externally(data_dir, name, shortcut_list):
+    with open(os.path.join(data_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump({"software_name": name, "shortcut_list": shortcut_list}, f, ensure_ascii=False, indent=4)
+
+
+def test_undo_redo(data_dir):
+    DataManager.save_software("Soft", shortcuts("A"))
+    DataManager.save_software("Soft", shortcuts("B"))
+    DataManager.flush()
+    assert DataManager.undo() == "Soft"
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+A"] * 3
+    assert DataManager.redo() == "Soft"
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+B"] * 3
+
+
+def test_undo_after_external_change_keeps_it_recoverable(data_dir):
+    DataManager.save_software("Soft", shortcuts("A"))
+    DataManager.save_software("Soft", shortcuts("B"))
+    DataManager.flush()
+    # 首次检查只建立基准
+    DataManager.poll_changes()
+    edit_externally(data_dir, "Soft", shortcuts("Shift+X"))
+    assert DataManager.poll_changes() == ([], ["Soft"], [])
+    DataManager.flush()
+
+    # 第一次撤销的是外部改动，回到最后一次保存的版本
+    assert DataManager.undo() == "Soft"
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+B"] * 3
+    # 外部版本可以重做找回
+    assert DataManager.redo() == "Soft"
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+Shift+X"] * 3
+    # 再往前撤销才是原来的修改
+    DataManager.undo()
+    DataManager.undo()
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+A"] * 3
+
+
+def test_redo_after_external_change_does_not_overwrite_it(data_dir):
+    DataManager.save_software("Soft", shortcuts("A"))
+    DataManager.save_software("Soft", shortcuts("B"))
+    DataManager.flush()
+    DataManager.undo()
+    DataManager.flush()
+    DataManager.poll_changes()
+    edit_externally(data_dir, "Soft", shortcuts("Shift+X"))
+    assert DataManager.poll_changes() == ([], ["Soft"], [])
+    DataManager.flush()
+
+    assert DataManager.redo() is None
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+Shift+X"] * 3
+    DataManager.undo()
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+A"] * 3
+
+
+def test_restore_deleted(data_dir):
+    DataManager.save_software("Soft", shortcuts("A"))
+    DataManager.flush()
+    assert DataManager.delete_software("Soft")
+    DataManager.flush()
+    assert DataManager.deleted_software() == ["Soft"]
+    assert DataManager.restore_software("Soft")
+    DataManager.flush()
+    assert keys_on_disk(data_dir, "Soft") == ["Ctrl+A"] * 3
+
+
+def test_configure_stops_history_thread(data_dir):
+    """切换数据目录时结束记录线程，反复切换不会越积越多"""
+    def history_threads():
+        return [thread for thread in threading.enumerate() if thread.name.startswith("ShortcutHistory")]
+
+    for i in range(3):
+        DataManager.save_software("Soft", shortcuts(i))
+        history = DataManager.history()
+        DataManager.configure(data_dir=data_dir)
+        assert history.peek_undo() == "Soft"
+        assert history_threads() == []
@@ -0,0 +1,37 @@
+import os
+
+from data_manager import DataManager
+from snapshot import SNAPSHOT_FILENAME
+
+
+def test_search_index_skips_unreadable_software(data_dir, monkeypatch):
+    DataManager.save_software("VS Code", [{"操作": "复制", "快捷键": "Ctrl+C"}])
+    DataManager.save_software("坏文件", [{"操作": "复制", "快捷键": "Ctrl+Insert"}])
+    DataManager.flush()
+    DataManager.configure(data_dir=data_dir)
+    backend = DataManager.repository().backend
+    load = backend.load
+    calls = []
+
+    def failing_load(name):
+        calls.append(name)
+        if name == "坏文件":
+            raise OSError("读取失败")
+        return load(name)
+
+    monkeypatch.setattr(backend, "load", failing_load)
+    assert DataManager.search("复制") == [("VS Code", "复制", "Ctrl+C")]
+    # 索引已经建好，之后的搜索不再重新扫描
+    calls.clear()
+    DataManager.search("ctrl")
+    assert calls == []
+
+
+def test_search_does_not_write_snapshot(data_dir):
+    """命令行的查询只读：建索引后不写快照"""
+    DataManager.save_software("VS Code", [{"操作": "复制", "快捷键": "Ctrl+C"}])
+    DataManager.flush()
+    DataManager.configure(data_dir=data_dir)
+    assert DataManager.search("复制") == [("VS Code", "复制", "Ctrl+C")]
+    DataManager.flush()
+    assert not os.path.exists(os.path.join(data_dir, SNAPSHOT_FILENAME))
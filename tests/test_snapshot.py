@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from repository import ShortcutRepository
+from snapshot import SNAPSHOT_FILENAME, LibrarySnapshot
+from storage import JsonDirBackend
+
+VS_CODE = [{"操作": "复制", "快捷键": "Ctrl+C"}, {"操作": "命令面板", "快捷键": "Ctrl+Shift+P"}]
+WECHAT = [{"操作": "截图", "快捷键": "Alt+A"}]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / SNAPSHOT_FILENAME)
+    snapshot = LibrarySnapshot(path, "json")
+    assert snapshot.write([("VS Code", 1.0, VS_CODE), ("微信", 2.0, WECHAT)]) == 2
+    snapshot.close()
+    return path
+
+
+def patch_bytes(path, offset, data):
+    with open(path, "r+b") as f:
+        f.seek(offset, os.SEEK_END if offset < 0 else os.SEEK_SET)
+        f.write(data)
+
+
+def test_round_trip(path):
+    snapshot = LibrarySnapshot(path, "json")
+    try:
+        assert len(snapshot) == 2
+        assert snapshot.get("VS Code", 1.0) == VS_CODE
+        assert snapshot.get("微信", 2.0) == WECHAT
+        # 标记不一致、没有的软件都不返回
+        assert snapshot.get("VS Code", 1.5) is None
+        assert snapshot.get("Excel", 1.0) is None
+        assert snapshot.is_current({"VS Code": 1.0, "微信": 2.0})
+        assert not snapshot.is_current({"VS Code": 1.0})
+    finally:
+        snapshot.close()
+
+
+def test_rewrite_reuses_unchanged_entries(path):
+    snapshot = LibrarySnapshot(path, "json")
+    # 快捷键列表为None：沿用旧快照里的数据段
+    assert snapshot.write([("VS Code", 1.0, None), ("微信", 3.0, [])]) == 2
+    try:
+        assert snapshot.get("VS Code", 1.0) == VS_CODE
+        assert snapshot.get("微信", 3.0) == []
+    finally:
+        snapshot.close()
+
+
+def test_other_backend_ignored(path):
+    snapshot = LibrarySnapshot(path, "sqlite")
+    try:
+        assert len(snapshot) == 0
+        assert snapshot.get("VS Code", 1.0) is None
+    finally:
+        snapshot.close()
+
+
+def test_corrupt_entry_falls_back(path):
+    """数据段校验失败：只丢掉这一个软件，其他软件照常读取"""
+    # 最后写入的是微信的数据段
+    patch_bytes(path, -1, b"\xff")
+    snapshot = LibrarySnapshot(path, "json")
+    try:
+        assert snapshot.get("微信", 2.0) is None
+        assert not snapshot.has("微信", 2.0)
+        assert snapshot.get("VS Code", 1.0) == VS_CODE
+    finally:
+        snapshot.close()
+
+
+@pytest.mark.parametrize("offset, data", [(0, b"XXXX"), (4, b"\x63\x00"), (12, b"\x00\x00\x00\x00")])
+def test_corrupt_header_falls_back(path, offset, data):
+    """魔数、版本或索引校验不对时当作空快照"""
+    patch_bytes(path, offset, data)
+    snapshot = LibrarySnapshot(path, "json")
+    try:
+        assert len(snapshot) == 0
+        assert snapshot.get("VS Code", 1.0) is None
+        assert not snapshot.is_current({"VS Code": 1.0, "微信": 2.0})
+    finally:
+        snapshot.close()
+
+
+def test_truncated_file_falls_back(path):
+    with open(path, "r+b") as f:
+        f.truncate(5)
+    snapshot = LibrarySnapshot(path, "json")
+    try:
+        assert len(snapshot) == 0
+    finally:
+        snapshot.close()
+
+
+def test_repository_reads_files_when_snapshot_corrupt(tmp_path):
+    """快照损坏时仓库改为读取原文件，之后重写出可用的快照"""
+    data_dir = str(tmp_path)
+    path = os.path.join(data_dir, SNAPSHOT_FILENAME)
+    backend = JsonDirBackend(data_dir)
+    backend.save("VS Code", VS_CODE)
+    backend.save("微信", WECHAT)
+    repository = ShortcutRepository(backend, snapshot=LibrarySnapshot(path, "json"))
+    assert repository.save_snapshot() == 2
+    repository.close()
+
+    patch_bytes(path, 0, b"XXXX")
+    repository = ShortcutRepository(JsonDirBackend(data_dir), snapshot=LibrarySnapshot(path, "json"))
+    try:
+        assert dict(repository.iter_all()) == {"VS Code": VS_CODE, "微信": WECHAT}
+        assert repository.snapshot_stale()
+        assert repository.save_snapshot() == 2
+    finally:
+        repository.close()
+    snapshot = LibrarySnapshot(path, "json")
+    try:
+        assert snapshot.get("VS Code", JsonDirBackend(data_dir).detail_stamp("VS Code")) == VS_CODE
+    finally:
+        snapshot.close()
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+
+import pytest
+
+import storage
+from repository import ShortcutRepository
+from storage import BACKEND_KINDS, JsonDirBackend, JournalBackend, iter_json_list, open_backend
+
+BACKENDS = BACKEND_KINDS
+
+
+def shortcuts(*keys):
+    return [{"操作": f"操作{i}", "快捷键": key} for i, key in enumerate(keys)]
+
+
+def pairs(shortcut_list):
+    return [(item.get("操作"), item.get("快捷键")) for item in shortcut_list]
+
+
+def tick():
+    """文件系统的修改时间有精度限制，改动前稍等，确保标记能看出变化"""
+    time.sleep(0.02)
+
+
+@pytest.fixture(params=BACKENDS)
+def kind(request):
+    return request.param
+
+
+@pytest.fixture
+def backend(kind, tmp_path):
+    backend = open_backend(kind, str(tmp_path))
+    yield backend
+    backend.close()
+
+
+def test_save_list_load(backend):
+    assert backend.list_names() == []
+    assert backend.detail_stamp("VS Code") is None
+    backend.save("VS Code", shortcuts("Ctrl+P", "Ctrl+Shift+P"))
+    backend.save("微信", shortcuts("Alt+S"))
+    assert sorted(backend.list_names()) == ["VS Code", "微信"]
+    assert pairs(backend.load("VS Code")) == [("操作0", "Ctrl+P"), ("操作1", "Ctrl+Shift+P")]
+    assert pairs(backend.load("微信")) == [("操作0", "Alt+S")]
+    assert set(backend.list_stamps()) == {"VS Code", "微信"}
+
+
+def test_overwrite(backend):
+    backend.save("VS Code", shortcuts("Ctrl+P", "Ctrl+Shift+P", "F5"))
+    # 改一条、删一条（日志模式下只追加改动）
+    backend.save("VS Code", shortcuts("Ctrl+P", "Ctrl+Shift+F"))
+    assert pairs(backend.load("VS Code")) == [("操作0", "Ctrl+P"), ("操作1", "Ctrl+Shift+F")]
+    backend.save("VS Code", [])
+    assert backend.load("VS Code") == []
+    assert backend.list_names() == ["VS Code"]
+
+
+def test_delete(backend):
+    backend.save("VS Code", shortcuts("Ctrl+P"))
+    backend.save("VS Code", shortcuts("Ctrl+O"))
+    assert backend.delete("VS Code")
+    assert not backend.delete("VS Code")
+    assert backend.list_names() == []
+    assert backend.detail_stamp("VS Code") is None
+    assert backend.load("VS Code") == []
+
+
+def test_save_many(backend):
+    backend.save_many([(f"Soft{i}", shortcuts(f"Ctrl+{i}")) for i in range(5)])
+    assert sorted(backend.list_names()) == [f"Soft{i}" for i in range(5)]
+    assert pairs(backend.load("Soft3")) == [("操作0", "Ctrl+3")]
+
+
+def test_reopen_after_close(kind, tmp_path):
+    backend = open_backend(kind, str(tmp_path))
+    backend.save("VS Code", shortcuts("Ctrl+P", "F5"))
+    backend.save("VS Code", shortcuts("Ctrl+P", "F6"))
+    backend.close()
+    backend = open_backend(kind, str(tmp_path))
+    try:
+        assert backend.list_names() == ["VS Code"]
+        assert pairs(backend.load("VS Code")) == [("操作0", "Ctrl+P"), ("操作1", "F6")]
+    finally:
+        backend.close()
+
+
+def test_stamps_change(backend):
+    names_stamp = backend.names_stamp()
+    tick()
+    backend.save("VS Code", shortcuts("Ctrl+P"))
+    assert backend.names_stamp() != names_stamp
+    detail_stamp = backend.detail_stamp("VS Code")
+    assert detail_stamp is not None
+    # 没有改动时标记不变
+    assert backend.detail_stamp("VS Code") == detail_stamp
+    assert backend.list_stamps()["VS Code"] == detail_stamp
+
+    tick()
+    backend.save("VS Code", shortcuts("Ctrl+Shift+P"))
+    assert backend.detail_stamp("VS Code") != detail_stamp
+    names_stamp = backend.names_stamp()
+    tick()
+    backend.delete("VS Code")
+    assert backend.names_stamp() != names_stamp
+    assert backend.detail_stamp("VS Code") is None
+
+
+def test_iter_load(backend):
+    keys = [f"Ctrl+{i}" for i in range(25)]
+    backend.save("VS Code", shortcuts(*keys))
+    chunks = list(backend.iter_load("VS Code", 10, first_chunk=5))
+    assert [len(chunk) for chunk, _ in chunks][0] == 5
+    assert chunks[-1][1] == 1.0
+    assert [pair[1] for chunk, _ in chunks for pair in pairs(chunk)] == keys
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    data_dir = str(tmp_path)
+    source = JsonDirBackend(data_dir)
+    source.save("VS Code", shortcuts("Ctrl+P", "F5"))
+    source.save("微信", shortcuts("Alt+S"))
+    source.close()
+
+    backend = open_backend("sqlite", data_dir)
+    try:
+        assert sorted(backend.list_names()) == ["VS Code", "微信"]
+        assert pairs(backend.load("VS Code")) == [("操作0", "Ctrl+P"), ("操作1", "F5")]
+        assert pairs(backend.load("微信")) == [("操作0", "Alt+S")]
+    finally:
+        backend.close()
+    assert os.path.exists(os.path.join(data_dir, "shortcuts.db"))
+    # 已有数据库时不再重复迁移
+    JsonDirBackend(data_dir).save("Excel", shortcuts("F2"))
+    backend = open_backend("sqlite", data_dir)
+    try:
+        assert "Excel" not in backend.list_names()
+    finally:
+        backend.close()
+
+
+def test_journal_compacted_before_switching(tmp_path):
+    data_dir = str(tmp_path)
+    journal = JournalBackend(data_dir)
+    journal.save("VS Code", shortcuts("Ctrl+P", "F5"))
+    journal.save("VS Code", shortcuts("Ctrl+P", "F6"))
+    journal.close()
+
+    backend = open_backend("sqlite", data_dir)
+    try:
+        assert pairs(backend.load("VS Code")) == [("操作0", "Ctrl+P"), ("操作1", "F6")]
+    finally:
+        backend.close()
+
+
+def test_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        open_backend("jsno", str(tmp_path))
+
+
+@pytest.mark.parametrize("kind", ("json", "sqlite"))
+def test_no_compaction_without_journals(kind, tmp_path, monkeypatch):
+    """没有日志文件时，打开其他后端不构造日志后端、不合并"""
+    JsonDirBackend(str(tmp_path)).save("VS Code", shortcuts("Ctrl+P"))
+
+    def fail(self):
+        raise AssertionError("不应合并日志")
+
+    monkeypatch.setattr(JournalBackend, "compact_all", fail)
+    open_backend(kind, str(tmp_path)).close()
+
+
+def write_raw(data_dir, name, data):
+    with open(os.path.join(data_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def test_malformed_files(kind, tmp_path):
+    """手动改坏的文件：不是字典的条目跳过，shortcut_list 缺失或不是列表时当作空列表"""
+    data_dir = str(tmp_path)
+    write_raw(data_dir, "B", {"software_name": "B", "shortcut_list": [["复制", "Ctrl+C"], "oops", {"操作": "粘贴", "快捷键": "Ctrl+V"}]})
+    write_raw(data_dir, "C", {"software_name": "C", "shortcut_list": "oops"})
+    write_raw(data_dir, "D", {"software_name": "D"})
+    write_raw(data_dir, "E", [{"操作": "复制", "快捷键": "Ctrl+C"}])
+    repository = ShortcutRepository(open_backend(kind, data_dir))
+    try:
+        assert pairs(repository.get_detail("B")) == [("粘贴", "Ctrl+V")]
+        for name in ("C", "D", "E"):
+            assert repository.get_detail(name) == []
+        assert {name: pairs(shortcut_list) for name, shortcut_list in repository.iter_all()} == {
+            "B": [("粘贴", "Ctrl+V")], "C": [], "D": [], "E": []}
+        repository.invalidate()
+        assert [pair for chunk, _ in repository.iter_detail("B", 10) for pair in pairs(chunk)] == [("粘贴", "Ctrl+V")]
+    finally:
+        repository.close()
+
+
+@pytest.mark.parametrize("sizes", [[0], [1], [3], [3, 1], [3, 5], [3, 5, 1], [3, 5, 5]])
+@pytest.mark.parametrize("read_block", [7, storage.READ_BLOCK])
+def test_iter_json_list_chunks(tmp_path, monkeypatch, sizes, read_block):
+    """第一块3条、之后每块5条：条数刚好凑满时不多生成一个空块，最后一块的进度为1.0"""
+    monkeypatch.setattr(storage, "READ_BLOCK", read_block)
+    keys = [f"Ctrl+{i}" for i in range(sum(sizes))]
+    path = os.path.join(str(tmp_path), "VS Code.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"software_name": "VS Code", "shortcut_list": shortcuts(*keys), "tags": [1, 2]}, f, ensure_ascii=False)
+    chunks = list(iter_json_list(path, "shortcut_list", 5, first_chunk=3))
+    assert [len(chunk) for chunk, _ in chunks] == sizes
+    assert chunks[-1][1] == 1.0
+    assert all(0 <= progress <= 1.0 for _, progress in chunks)
+    assert [pair[1] for chunk, _ in chunks for pair in pairs(chunk)] == keys
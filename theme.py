@@ -0,0 +1,215 @@
+import os
+import json
+
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QColor, QPainter, QPainterPath
+
+# ===================== 主题【整个程序一份样式表 + 自绘圆角背景】 =====================
+# 控件只设置 objectName，颜色、圆角、内边距都写在 compile_stylesheet 生成的程序级样式表里，
+# 切换主题只需 app.setStyleSheet 一次，不用逐个控件重设样式。
+# 无边框半透明窗口的圆角背景由 RoundedSurface.paintEvent 用缓存的路径直接绘制，
+# 不再依赖样式表的 border-radius（每次重绘、拖动都要重新解析样式和合成）。
+
+# 主题配色：名称 -> (显示名称, 颜色表)
+THEMES = {
+    "dark": ("深色", {
+        "surface": "#1E293B",   # 悬浮窗/弹窗背景
+        "text": "#FFFFFF",      # 背景上的文字
+        "muted": "#94A3B8",     # 空状态等次要文字
+        "field": "#334155",     # 搜索框、快捷键行
+        "field_text": "#FFFFFF",
+        "item": "#3B82F6",      # 软件名称行
+        "item_text": "#FFFFFF",
+        "on_accent": "#FFFFFF", # 彩色按钮上的文字
+        "accent": "#8B5CF6",    # 收起
+        "add": "#F97316",       # 添加软件
+        "info": "#0EA5E9",      # 查看、返回
+        "warn": "#F59E0B",      # 编辑、更新
+        "danger": "#EF4444",    # 删除、退出
+        "success": "#22C55E",   # 新增
+        "save": "#27AE60",      # 保存
+        "hint": "#666666",      # 添加/编辑弹窗里的说明文字
+    }),
+    "light": ("浅色", {
+        "surface": "#F1F5F9",
+        "text": "#0F172A",
+        "muted": "#64748B",
+        "field": "#E2E8F0",
+        "field_text": "#0F172A",
+        "item": "#2563EB",
+        "item_text": "#FFFFFF",
+        "on_accent": "#FFFFFF",
+        "accent": "#7C3AED",
+        "add": "#EA580C",
+        "info": "#0284C7",
+        "warn": "#D97706",
+        "danger": "#DC2626",
+        "success": "#16A34A",
+        "save": "#15803D",
+        "hint": "#666666",
+    }),
+    "ocean": ("海蓝", {
+        "surface": "#0C2D48",
+        "text": "#E0F2FE",
+        "muted": "#7DA3BF",
+        "field": "#145374",
+        "field_text": "#E0F2FE",
+        "item": "#0891B2",
+        "item_text": "#FFFFFF",
+        "on_accent": "#FFFFFF",
+        "accent": "#14B8A6",
+        "add": "#F97316",
+        "info": "#0EA5E9",
+        "warn": "#F59E0B",
+        "danger": "#EF4444",
+        "success": "#22C55E",
+        "save": "#27AE60",
+        "hint": "#666666",
+    }),
+}
+DEFAULT_THEME = "dark"
+
+# 悬浮窗尺寸：名称 -> (显示名称, 宽, 高)
+SIZES = {
+    "small": ("小", 100, 200),
+    "medium": ("中", 130, 260),
+    "large": ("大", 160, 320),
+}
+DEFAULT_SIZE = "small"
+
+# 收起后的悬浮球尺寸
+COLLAPSED_SIZE = 30
+
+_STYLESHEET = """
+#collapseBtn {{ background:{accent}; color:{on_accent}; border-radius:5px; padding:3px; }}
+#collapseBtn[collapsed="true"] {{ background:{surface}; color:{text}; border-radius:15px; padding:0; }}
+#addSoftwareBtn {{ background:{add}; color:{on_accent}; border-radius:8px; padding:5px; }}
+#searchEdit {{ background:{field}; color:{field_text}; border-radius:5px; padding:2px; }}
+#exitBtn {{ background:{danger}; color:{on_accent}; border-radius:5px; padding:3px; }}
+#softList, #detailList {{ border:none; background:transparent; }}
+#emptyLabel {{ color:{muted}; }}
+#detailProgress {{ background:{field}; border:none; border-radius:2px; }}
+#detailProgress::chunk {{ background:{info}; border-radius:2px; }}
+#surfaceTitle {{ color:{text}; margin-bottom:10px; }}
+#detailWindow #surfaceTitle {{ margin-bottom:5px; }}
+#optionWindow QPushButton {{ color:{on_accent}; border-radius:6px; padding:6px; }}
+#detailWindow QPushButton {{ color:{on_accent}; border-radius:5px; padding:4px; }}
+#viewBtn, #backBtn {{ background:{info}; }}
+#editBtn {{ background:{warn}; }}
+#deleteSoftwareBtn {{ background:{danger}; }}
+#groupBtn {{ background:{accent}; }}
+#newShortcutBtn {{ background:{success}; }}
+#detailCollapseBtn {{ background:{accent}; }}
+#updateRowBtn {{ background:{warn}; color:{on_accent}; }}
+#deleteRowBtn {{ background:{danger}; color:{on_accent}; }}
+#saveAllBtn {{ background:{save}; color:{on_accent}; border-radius:6px; padding:6px; }}
+#hintLabel {{ color:{hint}; }}
+"""
+
+def compile_stylesheet(colors):
+    """把颜色表填进样式模板，得到整个程序共用的一份样式表"""
+    return _STYLESHEET.format(**colors)
+
+
+class ThemeManager:
+    """当前主题和悬浮窗尺寸；设置保存在程序目录的 settings.json"""
+    def __init__(self):
+        self.theme = DEFAULT_THEME
+        self.size = DEFAULT_SIZE
+        self.settings_path = None
+        self._stylesheets = {}  # 主题名 -> 编译好的样式表
+        self._colors = {}
+        self._load_colors()
+
+    def _load_colors(self):
+        # 自绘时频繁使用的颜色预先构造成QColor
+        self._colors = {key: QColor(value) for key, value in THEMES[self.theme][1].items()}
+
+    def color(self, key):
+        return self._colors[key]
+
+    def stylesheet(self):
+        stylesheet = self._stylesheets.get(self.theme)
+        if stylesheet is None:
+            stylesheet = self._stylesheets[self.theme] = compile_stylesheet(THEMES[self.theme][1])
+        return stylesheet
+
+    def window_size(self):
+        _, width, height = SIZES[self.size]
+        return width, height
+
+    # ===================== 设置读写 =====================
+    def load(self, settings_path):
+        self.settings_path = settings_path
+        try:
+            with open(settings_path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"读取设置失败: {e}")
+            return
+        if settings.get("theme") in THEMES:
+            self.theme = settings["theme"]
+        if settings.get("size") in SIZES:
+            self.size = settings["size"]
+        self._load_colors()
+
+    def save(self):
+        if self.settings_path is None:
+            return
+        temp_path = self.settings_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"theme": self.theme, "size": self.size}, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.settings_path)
+        except OSError as e:
+            print(f"保存设置失败: {e}")
+
+    # ===================== 应用 =====================
+    def apply(self, app):
+        """启动时调用一次：设置程序级样式表"""
+        app.setStyleSheet(self.stylesheet())
+
+    def set_theme(self, app, theme):
+        """切换主题：替换程序级样式表，自绘的背景和列表行重绘一次即可"""
+        if theme not in THEMES or theme == self.theme:
+            return
+        self.theme = theme
+        self._load_colors()
+        app.setStyleSheet(self.stylesheet())
+        for widget in app.topLevelWidgets():
+            widget.update()
+        self.save()
+
+    def set_size(self, size):
+        """切换悬浮窗尺寸，由调用方调整窗口"""
+        if size not in SIZES or size == self.size:
+            return False
+        self.size = size
+        self.save()
+        return True
+
+
+class RoundedSurface:
+    """混入类：无边框半透明窗口在paintEvent里绘制圆角背景，路径只在尺寸或圆角变化时重建"""
+    surface_radius = 10
+
+    def surface_path(self):
+        key = (self.width(), self.height(), self.surface_radius)
+        if getattr(self, "_surface_key", None) != key:
+            path = QPainterPath()
+            path.addRoundedRect(QRectF(self.rect()), self.surface_radius, self.surface_radius)
+            self._surface_key = key
+            self._surface_path = path
+        return self._surface_path
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillPath(self.surface_path(), THEME.color("surface"))
+        painter.end()
+        super().paintEvent(event)
+
+
+THEME = ThemeManager()
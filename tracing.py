@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+import traceback
+from collections import deque
+
+# ===================== 性能追踪【可选开启，Chrome Trace格式】 =====================
+# 开启后记录关键调用的耗时（span）和界面事件循环的卡顿，追加写入 trace/trace.json，
+# 用 chrome://tracing 或 https://ui.perfetto.dev 打开。文件按大小轮转为 trace.1.json、trace.2.json…
+# 按照 Trace Event 的 JSON Array 格式，文件末尾没有 "]"，两个查看器都支持。
+# 未开启时 span()/traced 只多一次属性判断。
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "stack")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.stack = self.tracer._span_stack()
+        self.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        self.stack.pop()
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        self.tracer._complete(self.name, self.start, duration, args)
+        return False
+
+
+class Tracer:
+    """收集span和卡顿事件，后台线程定期写入追踪文件，同时充当事件循环看门狗"""
+    FILE_NAME = "trace.json"
+    # 最多缓存多少条未写入的事件，写盘失败时丢弃最旧的
+    MAX_BUFFERED = 100000
+    # 后台线程写盘间隔（秒）
+    FLUSH_INTERVAL = 2.0
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_dir = None
+        # 事件循环被阻塞超过多少毫秒算卡顿
+        self.stall_ms = 200
+        # 界面线程心跳间隔（毫秒），由界面上的QTimer按这个间隔调用 heartbeat()
+        self.heartbeat_ms = 50
+        self.max_bytes = 5 * 1024 * 1024
+        self.backups = 3
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter()
+        self._wall0 = time.time()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._events = deque(maxlen=self.MAX_BUFFERED)
+        # 线程id -> 该线程当前打开的span名称栈，看门狗发现卡顿时读取界面线程的栈
+        self._stacks = {}
+        self._thread_names = {}
+        self._named_in_file = set()
+        self._main_ident = None
+        self._last_beat = None
+        self._stall_reported = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enable(self, trace_dir, stall_ms=None):
+        """在界面线程调用：开始记录，并启动看门狗线程；每次启动写入新的文件，旧文件轮转保留"""
+        if self.enabled:
+            return
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+        except OSError as e:
+            print(f"创建追踪目录失败: {e}")
+            return
+        self.trace_dir = trace_dir
+        if stall_ms is not None:
+            self.stall_ms = stall_ms
+        try:
+            self._rotate(new_session=True)
+        except OSError as e:
+            print(f"轮转追踪文件失败: {e}")
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self.enabled = True
+        self._thread = threading.Thread(target=self._watchdog, name="TraceWatchdog", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """停止看门狗并写出剩余事件，可重复调用"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self.flush()
+
+    # ===================== 记录 =====================
+    def span(self, name, **args):
+        """with span("名称"): ... 记录一段代码的耗时，args会出现在事件详情里"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def traced(self, func):
+        """装饰器：以函数的限定名（如 DataManager.search）记录每次调用的耗时"""
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            with _Span(self, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def heartbeat(self):
+        """界面线程定时调用；两次心跳间隔远超预期说明事件循环被阻塞，补记一条卡顿事件"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            last = self._last_beat
+            self._last_beat = now
+            self._stall_reported = False
+        blocked = now - last - self.heartbeat_ms / 1000
+        if blocked * 1000 >= self.stall_ms:
+            self._complete("event_loop_stall", last, now - last,
+                           {"blocked_ms": round(blocked * 1000, 1)}, cat="stall")
+
+    def _span_stack(self):
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            stack = self._stacks[ident] = []
+        return stack
+
+    def _ts(self, t):
+        return round((self._wall0 + t - self._t0) * 1e6, 1)
+
+    def _record(self, event, ident):
+        if ident not in self._thread_names:
+            name = next((t.name for t in threading.enumerate() if t.ident == ident), str(ident))
+            self._thread_names[ident] = "GUI" if ident == self._main_ident else name
+        with self._lock:
+            self._events.append(event)
+
+    def _complete(self, name, start, duration, args, cat="span"):
+        ident = threading.get_ident()
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._ts(start),
+                 "dur": round(duration * 1e6, 1), "pid": self._pid, "tid": ident}
+        if args:
+            event["args"] = args
+        self._record(event, ident)
+
+    # ===================== 看门狗 =====================
+    def _watchdog(self):
+        next_flush = time.perf_counter() + self.FLUSH_INTERVAL
+        while not self._stop.wait(self.stall_ms / 2000):
+            now = time.perf_counter()
+            with self._lock:
+                blocked = now - self._last_beat - self.heartbeat_ms / 1000
+                report = blocked * 1000 >= self.stall_ms and not self._stall_reported
+                if report:
+                    self._stall_reported = True
+            if report:
+                self._snapshot(now, blocked)
+            if now >= next_flush:
+                self.flush()
+                next_flush = now + self.FLUSH_INTERVAL
+
+    def _snapshot(self, now, blocked):
+        """卡顿仍在持续时抓取界面线程正在执行的span和Python调用栈"""
+        ident = self._main_ident
+        frame = sys._current_frames().get(ident)
+        stack = [line.rstrip() for line in traceback.format_stack(frame, limit=20)] if frame is not None else []
+        event = {"name": "event_loop_blocked", "cat": "stall", "ph": "i", "s": "t", "ts": self._ts(now),
+                 "pid": self._pid, "tid": ident,
+                 "args": {"blocked_ms": round(blocked * 1000, 1), "spans": list(self._stacks.get(ident, ())),
+                          "stack": stack}}
+        self._record(event, ident)
+
+    # ===================== 写入文件 =====================
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                events = list(self._events)
+                self._events.clear()
+            if not events or self.trace_dir is None:
+                return
+            try:
+                self._rotate(new_session=False)
+                path = os.path.join(self.trace_dir, self.FILE_NAME)
+                new_file = not os.path.exists(path)
+                with open(path, "a", encoding="utf-8") as f:
+                    if new_file:
+                        f.write("[\n")
+                        f.write(json.dumps({"name": "process_name", "ph": "M", "pid": self._pid,
+                                            "args": {"name": "ShortcutKeyHelper"}}) + ",\n")
+                    for event in events:
+                        ident = event["tid"]
+                        if ident not in self._named_in_file:
+                            self._named_in_file.add(ident)
+                            f.write(json.dumps({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": ident,
+                                                "args": {"name": self._thread_names.get(ident, str(ident))}},
+                                               ensure_ascii=False) + ",\n")
+                        f.write(json.dumps(event, ensure_ascii=False) + ",\n")
+            except OSError as e:
+                print(f"写入追踪文件失败: {e}")
+
+    def _rotate(self, new_session):
+        """新会话开始或当前文件超过大小上限时，trace.json -> trace.1.json -> … 依次后移"""
+        path = os.path.join(self.trace_dir, self.FILE_NAME)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if not new_session and size < self.max_bytes:
+            return
+        base, ext = os.path.splitext(path)
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{base}.{i}{ext}"
+            if os.path.exists(older):
+                os.replace(older, f"{base}.{i + 1}{ext}")
+        os.replace(path, f"{base}.1{ext}")
+        self._named_in_file.clear()
+
+
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
@@ -0,0 +1,133 @@
+import os
+import csv
+import json
+
+# ===================== 快捷键导入/导出【JSON Lines / CSV 流式读写】 =====================
+# 每条记录是一条快捷键：{"software": 软件名, "操作": 操作, "快捷键": 快捷键}
+# 导出逐个软件写出，导入逐条读取、按批校验，任何时候内存里只有一个软件或一批记录。
+
+FIELDS = ("software", "操作", "快捷键")
+# CSV表头里软件名这一列也接受这些写法
+SOFTWARE_ALIASES = ("software", "软件", "software_name")
+
+
+class TransferCancelled(Exception):
+    """用户取消了导入/导出"""
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"不支持的文件格式：{ext}（支持 .jsonl / .csv）")
+
+
+def export_library(path, names, load_detail, progress=None, is_cancelled=None):
+    """导出全部软件的快捷键，先写临时文件，完成后再替换目标文件；返回导出的记录数"""
+    fmt = detect_format(path)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    total = len(names)
+    try:
+        # CSV带BOM，Excel直接打开中文不乱码
+        encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+        with open(tmp_path, "w", encoding=encoding, newline="") as f:
+            writer = csv.writer(f) if fmt == "csv" else None
+            if writer is not None:
+                writer.writerow(FIELDS)
+            for i, name in enumerate(names):
+                if is_cancelled is not None and is_cancelled():
+                    raise TransferCancelled()
+                for item in load_detail(name):
+                    oper, key = item.get("操作", ""), item.get("快捷键", "")
+                    if writer is not None:
+                        writer.writerow((name, oper, key))
+                    else:
+                        f.write(json.dumps({"software": name, "操作": oper, "快捷键": key}, ensure_ascii=False))
+                        f.write("\n")
+                    count += 1
+                if progress is not None:
+                    progress(i + 1, total)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def _iter_raw_records(f, fmt):
+    """逐条产出 (行号, 原始记录)，解析失败的行产出 (行号, None)"""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            record = dict(row)
+            for alias in SOFTWARE_ALIASES:
+                if alias in record:
+                    record["software"] = record[alias]
+                    break
+            yield reader.line_num, record
+        return
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+
+
+def validate_record(record):
+    """校验一条记录，合法时返回 (软件名, {"操作", "快捷键"})，否则返回None"""
+    if not isinstance(record, dict):
+        return None
+    name, oper, key = (record.get(field) for field in FIELDS)
+    if not all(isinstance(value, str) and value.strip() for value in (name, oper, key)):
+        return None
+    return name.strip(), {"操作": oper.strip(), "快捷键": key.strip()}
+
+
+def import_library(path, on_batch, batch_size=1000, progress=None, is_cancelled=None):
+    """流式导入：每攒够batch_size条原始记录就校验一批，按软件分组后交给 on_batch({软件名: [快捷键]})，
+    on_batch 返回这一批实际导入的条数（与已有快捷键重复的不算）
+
+    返回 (导入条数, 跳过条数, 前几条错误的行号)；取消时已经交出的批次会保留。
+    """
+    fmt = detect_format(path)
+    total = os.path.getsize(path) or 1
+    imported = skipped = 0
+    bad_lines = []
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+    with open(path, "r", encoding=encoding, newline="") as f:
+        raw_batch = []
+
+        def flush_batch():
+            nonlocal imported, skipped
+            grouped = {}
+            for line_no, record in raw_batch:
+                valid = validate_record(record)
+                if valid is None:
+                    skipped += 1
+                    if len(bad_lines) < 10:
+                        bad_lines.append(line_no)
+                    continue
+                grouped.setdefault(valid[0], []).append(valid[1])
+            raw_batch.clear()
+            if grouped:
+                imported += on_batch(grouped)
+            if progress is not None:
+                progress(min(f.buffer.tell(), total), total)
+
+        for line_no, record in _iter_raw_records(f, fmt):
+            raw_batch.append((line_no, record))
+            if len(raw_batch) >= batch_size:
+                if is_cancelled is not None and is_cancelled():
+                    raise TransferCancelled()
+                flush_batch()
+        flush_batch()
+    return imported, skipped, bad_lines
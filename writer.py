@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+# ===================== 后台写入队列【合并重复保存，不阻塞界面线程】 =====================
+class WriteBehindQueue:
+    """后台线程写入：同一软件在写入前的多次保存只写最后一次，值为None表示删除"""
+
+    def __init__(self, backend, on_done=None):
+        self.backend = backend
+        # 每个软件写完后回调 on_done(软件名, 写入的值, 错误信息或None)，在后台线程中调用
+        self.on_done = on_done
+        self._pending = OrderedDict()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._thread = None
+
+    def submit(self, name, value):
+        self.submit_many([(name, value)])
+
+    def submit_many(self, items):
+        """一次提交多个软件，它们会落在同一批写入里（SQLite后端为同一个事务）"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("写入队列已关闭")
+            for name, value in items:
+                self._pending.pop(name, None)
+                self._pending[name] = value
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ShortcutWriter", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """等待所有已提交的写入完成，超时返回False"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        """写完剩余数据后停止后台线程"""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return flushed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch = self._pending
+                self._pending = OrderedDict()
+                self._busy = True
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        results = {}
+        saves = [(name, value) for name, value in batch.items() if value is not None]
+        try:
+            self.backend.save_many(saves)
+            for name, _ in saves:
+                results[name] = None
+        except Exception:
+            # 批量写入失败时逐个重试，避免一个坏文件拖累整批
+            for name, value in saves:
+                try:
+                    self.backend.save(name, value)
+                    results[name] = None
+                except Exception as e:
+                    results[name] = str(e)
+        for name, value in batch.items():
+            if value is None:
+                try:
+                    self.backend.delete(name)
+                    results[name] = None
+                except Exception as e:
+                    results[name] = str(e)
+        if self.on_done is not None:
+            for name, value in batch.items():
+                try:
+                    self.on_done(name, value, results[name])
+                except Exception as e:
+                    print(f"写入回调失败: {e}")